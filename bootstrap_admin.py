@@ -23,7 +23,7 @@ import sys
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from dotenv import load_dotenv
-from python_server.app import app
+from python_server.app import create_app
 from python_server.bootstrap import bootstrap_admin_user, setup_environment_example
 
 def main():
@@ -36,6 +36,7 @@ def main():
         return
     
     # Run bootstrap within app context
+    app = create_app()
     with app.app_context():
         print("SF Zoo Docent System - Admin User Bootstrap")
         print("=" * 50)
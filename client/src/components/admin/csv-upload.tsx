@@ -3,7 +3,6 @@ import { useToast } from "@/hooks/use-toast";
 import { Button } from "@/components/ui/button";
 import { Loader2, Upload, AlertCircle, CheckCircle } from "lucide-react";
 import { useMutation, useQueryClient } from "@tanstack/react-query";
-import { apiRequest } from "@/lib/queryClient";
 import { Alert, AlertDescription, AlertTitle } from "@/components/ui/alert";
 import {
   Accordion,
@@ -17,19 +16,77 @@ type CSVUploadResult = {
   errors: { line: number; email: string; error: string }[];
 };
 
+// One line of the NDJSON stream returned for a CSV upload
+type CSVImportProgress =
+  | { processed: number; success: number; errors: CSVUploadResult["errors"] }
+  | { done: true; processed: number; success: number; failed: number }
+  | { error: string };
+
+// Send the file as-is; the server parses and commits it in chunks and
+// streams back a progress line per chunk
+async function uploadCSV(file: File, onProgress: (processed: number) => void): Promise<CSVUploadResult> {
+  const response = await fetch("/api/users/csv", {
+    method: "POST",
+    headers: { "Content-Type": "text/csv" },
+    body: file,
+    credentials: "include",
+  });
+
+  if (!response.ok || !response.body) {
+    const text = await response.text();
+    let message = text || response.statusText;
+    try {
+      message = JSON.parse(text).error ?? message;
+    } catch {
+      // not JSON
+    }
+    throw new Error(message);
+  }
+
+  const result: CSVUploadResult = { success: 0, errors: [] };
+  const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffered = "";
+
+  const handleLine = (line: string) => {
+    if (!line.trim()) return;
+    const progress = JSON.parse(line) as CSVImportProgress;
+    if ("error" in progress) {
+      throw new Error(progress.error);
+    }
+    if (!("done" in progress)) {
+      result.success += progress.success;
+      result.errors.push(...progress.errors);
+    }
+    onProgress(progress.processed);
+  };
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffered += value;
+    const lines = buffered.split("\n");
+    buffered = lines.pop() ?? "";
+    lines.forEach(handleLine);
+  }
+  handleLine(buffered);
+
+  return result;
+}
+
 export function CSVUpload() {
   const [file, setFile] = useState<File | null>(null);
   const [parseErrors, setParseErrors] = useState<string[]>([]);
   const [processingResult, setProcessingResult] = useState<CSVUploadResult | null>(null);
+  const [processedRows, setProcessedRows] = useState(0);
   const fileInputRef = useRef<HTMLInputElement>(null);
   
   const { toast } = useToast();
   const queryClient = useQueryClient();
   
   const processCSVMutation = useMutation({
-    mutationFn: async (csvData: any[]) => {
-      const response = await apiRequest("POST", "/api/users/csv", csvData);
-      return response.json();
+    mutationFn: async (csvFile: File) => {
+      setProcessedRows(0);
+      return uploadCSV(csvFile, setProcessedRows);
     },
     onSuccess: (result: CSVUploadResult) => {
       setProcessingResult(result);
@@ -57,6 +114,7 @@ export function CSVUpload() {
       }
     },
     onError: (error: Error) => {
+      setParseErrors([error.message]);
       toast({
         title: "Error processing CSV",
         description: error.message,
@@ -74,90 +132,10 @@ export function CSVUpload() {
     }
   };
   
-  const parseCSV = (text: string): { data: any[]; errors: string[] } => {
-    const errors: string[] = [];
-    const data: any[] = [];
-    
-    try {
-      // Split by lines and check for header
-      const lines = text.split(/\r?\n/).filter(line => line.trim() !== "");
-      if (lines.length === 0) {
-        errors.push("CSV file is empty");
-        return { data, errors };
-      }
-      
-      // Parse header
-      const header = lines[0].split(",").map(h => h.trim());
-      const requiredFields = ["email", "firstName", "lastName", "role"];
-      
-      // Check if all required fields are present
-      const missingFields = requiredFields.filter(field => !header.includes(field));
-      if (missingFields.length > 0) {
-        errors.push(`CSV is missing required fields: ${missingFields.join(", ")}`);
-        return { data, errors };
-      }
-      
-      // Parse each row
-      for (let i = 1; i < lines.length; i++) {
-        const line = lines[i].trim();
-        if (!line) continue;
-        
-        const values = line.split(",").map(v => v.trim());
-        
-        // Check if row has correct number of columns
-        if (values.length !== header.length) {
-          errors.push(`Line ${i + 1}: Expected ${header.length} values, got ${values.length}`);
-          continue;
-        }
-        
-        // Create object from row
-        const rowData: any = {};
-        header.forEach((field, index) => {
-          rowData[field] = values[index];
-        });
-        
-        // Basic validation
-        if (!rowData.email || !rowData.email.includes("@")) {
-          errors.push(`Line ${i + 1}: Invalid email format`);
-          continue;
-        }
-        
-        if (!rowData.firstName || !rowData.lastName) {
-          errors.push(`Line ${i + 1}: Missing name fields`);
-          continue;
-        }
-        
-        if (!["new_docent", "seasoned_docent", "coordinator"].includes(rowData.role)) {
-          errors.push(`Line ${i + 1}: Invalid role. Must be 'new_docent', 'seasoned_docent', or 'coordinator'`);
-          continue;
-        }
-        
-        data.push(rowData);
-      }
-      
-      return { data, errors };
-    } catch (error) {
-      errors.push(`Error parsing CSV: ${error instanceof Error ? error.message : String(error)}`);
-      return { data, errors };
-    }
-  };
-  
   const handleUpload = () => {
     if (!file) return;
-    
-    const reader = new FileReader();
-    reader.onload = (event) => {
-      const text = event.target?.result as string;
-      const { data, errors } = parseCSV(text);
-      
-      setParseErrors(errors);
-      
-      if (errors.length === 0 && data.length > 0) {
-        processCSVMutation.mutate(data);
-      }
-    };
-    
-    reader.readAsText(file);
+    setParseErrors([]);
+    processCSVMutation.mutate(file);
   };
   
   return (
@@ -245,7 +223,7 @@ export function CSVUpload() {
         {processCSVMutation.isPending ? (
           <>
             <Loader2 className="mr-2 h-4 w-4 animate-spin" />
-            Processing...
+            {processedRows > 0 ? `Processed ${processedRows} rows...` : "Processing..."}
           </>
         ) : (
           <>
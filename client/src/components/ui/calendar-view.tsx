@@ -20,6 +20,7 @@ import { TagRequest } from "@shared/types";
 import { useQuery } from "@tanstack/react-query";
 import { apiRequest } from "@/lib/queryClient";
 import { useAuth } from "@/hooks/use-auth";
+import { useTagRequestStream } from "@/hooks/use-tag-request-stream";
 import { Skeleton } from "@/components/ui/skeleton";
 
 type Props = {
@@ -35,6 +36,7 @@ export function CalendarView({ onDaySelect, onTagSelect }: Props) {
   });
   const [currentDate, setCurrentDate] = useState(today);
   const { user } = useAuth();
+  useTagRequestStream(!!user);
   
   // Get the date range for display (previous week, current week, and 4 future weeks)
   const calendarStartDate = startOfWeek(currentDate, { weekStartsOn: 0 });
@@ -0,0 +1,21 @@
+import { useEffect } from "react";
+import { queryClient } from "@/lib/queryClient";
+
+const EVENTS = ["created", "claimed", "updated", "deleted", "removed", "reset"];
+
+// Refetch tag request lists when the server reports a change, instead of
+// polling. Refetches are cheap: unchanged lists come back as 304s.
+export function useTagRequestStream(enabled: boolean) {
+  useEffect(() => {
+    if (!enabled || typeof EventSource === "undefined") return;
+
+    const source = new EventSource("/api/tag-requests/stream", { withCredentials: true });
+    const refresh = () => {
+      queryClient.invalidateQueries({ queryKey: ["/api/tag-requests"] });
+      queryClient.invalidateQueries({ queryKey: ["/api/my-tag-requests"] });
+    };
+    EVENTS.forEach((name) => source.addEventListener(name, refresh));
+    // EventSource reconnects by itself (sending Last-Event-ID) after errors
+    return () => source.close();
+  }, [enabled]);
+}
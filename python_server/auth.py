@@ -0,0 +1,89 @@
+import time
+from flask import current_app, g, session
+from db_config import db
+from domain.users.user_model import User
+
+# Counter in table_versions bumped in the same commit as any role change or
+# user deletion. A role cached in a session is only trusted while the stamp
+# it was cached with still matches, in every process.
+ROLE_VERSION = 'user_roles'
+
+
+def invalidate_cached_roles():
+    """
+    Make every session's cached role stale once the current transaction
+    commits. The stamp is shared by all users: role changes are rare, and a
+    stale cache only costs each session one load of its user.
+    """
+    from table_versions import bump_on_commit  # Import locally
+    bump_on_commit(ROLE_VERSION)
+
+
+def _role_version():
+    # One primary-key read, at most once per request
+    if 'role_version' not in g:
+        from table_versions import current_versions  # Import locally
+        g.role_version = current_versions((ROLE_VERSION,))[0]
+    return g.role_version
+
+
+def load_current_user():
+    """
+    Return the logged-in User, loading it at most once per request.
+    The result (None when logged out or deleted) is kept on flask.g.
+    """
+    if 'current_user' not in g:
+        user_id = session.get('user_id')
+        if user_id is not None and current_app.config.get('AUTH_ROLE_CACHE_SECONDS', 0) > 0:
+            # Stamp first: a role change committed in between leaves the
+            # cache older than the role, never the other way round
+            _role_version()
+        g.current_user = db.session.get(User, user_id) if user_id is not None else None
+        if g.current_user is not None:
+            cache_role(g.current_user)
+    return g.current_user
+
+
+def cache_role(user):
+    """
+    Remember the user's role in the session when AUTH_ROLE_CACHE_SECONDS is
+    set. A cache entry that is still valid is left alone, so the session
+    isn't rewritten (and saved again) on every request.
+    """
+    ttl = current_app.config.get('AUTH_ROLE_CACHE_SECONDS', 0)
+    if ttl <= 0:
+        return
+    cached = session.get('role_cache')
+    if cached and cached['role'] == user.role and time.time() - cached['cached_at'] < ttl \
+            and cached['version'] == _role_version():
+        return
+    session['role_cache'] = {
+        'role': user.role,
+        'version': _role_version(),
+        'cached_at': time.time()
+    }
+
+
+def current_role():
+    """
+    Return the logged-in user's role, or None.
+
+    With AUTH_ROLE_CACHE_SECONDS > 0 the role is served from the session
+    while the cache is younger than that TTL and no role has changed since
+    it was cached. That costs one primary-key read of the role stamp
+    instead of loading the user, and role changes made through any process
+    take effect on the next request.
+    """
+    user_id = session.get('user_id')
+    if user_id is None:
+        return None
+
+    ttl = current_app.config.get('AUTH_ROLE_CACHE_SECONDS', 0)
+    cached = session.get('role_cache')
+    if ttl > 0 and cached and 'current_user' not in g:
+        fresh = time.time() - cached['cached_at'] < ttl
+        if fresh and cached['version'] == _role_version():
+            return cached['role']
+
+    user = load_current_user()
+    return user.role if user else None
@@ -0,0 +1,67 @@
+"""
+Secrets Manager access with a TTL cache.
+
+Nothing here touches AWS (or imports boto3) until a secret is first needed.
+In practice that is the first database connection a process opens, not import
+time. Values are re-read once older than the TTL, and can be invalidated early
+when they turn out to be stale, so a rotated password is picked up without a
+restart.
+"""
+import json
+import threading
+import time
+
+from sqlalchemy import event
+
+DEFAULT_SECRET_TTL = 300
+
+_client = None
+_cache = {}
+_lock = threading.Lock()
+
+
+def _secrets_client():
+    global _client
+    if _client is None:
+        import boto3
+        _client = boto3.client('secretsmanager')
+    return _client
+
+
+def get_secret(secret_id, ttl=DEFAULT_SECRET_TTL):
+    """Return the secret's JSON value, fetched at most once per `ttl` seconds"""
+    cached = _cache.get(secret_id)
+    if cached and time.monotonic() - cached[1] < ttl:
+        return cached[0]
+
+    with _lock:
+        cached = _cache.get(secret_id)
+        if cached and time.monotonic() - cached[1] < ttl:
+            return cached[0]
+        response = _secrets_client().get_secret_value(SecretId=secret_id)
+        value = json.loads(response['SecretString'])
+        _cache[secret_id] = (value, time.monotonic())
+        return value
+
+
+def invalidate_secret(secret_id):
+    _cache.pop(secret_id, None)
+
+
+def use_secret_credentials(engine, secret_id, ttl=DEFAULT_SECRET_TTL):
+    """
+    Fill in the username and password of every new connection `engine` opens
+    from the secret. If the cached password is rejected (it was rotated),
+    the secret is re-read and the connection tried once more.
+    """
+    @event.listens_for(engine, 'do_connect')
+    def connect(dialect, conn_rec, cargs, cparams):
+        credentials = get_secret(secret_id, ttl)
+        cparams.update(user=credentials['username'], password=credentials['password'])
+        try:
+            return dialect.connect(*cargs, **cparams)
+        except dialect.loaded_dbapi.OperationalError:
+            invalidate_secret(secret_id)
+            credentials = get_secret(secret_id, ttl)
+            cparams.update(user=credentials['username'], password=credentials['password'])
+            return dialect.connect(*cargs, **cparams)
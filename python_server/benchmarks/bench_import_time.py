@@ -0,0 +1,81 @@
+"""
+Cold start: how long a fresh interpreter takes to import the server and build
+the app, which every gunicorn worker boot, test run and bootstrap_admin.py
+invocation pays.
+
+Each measurement is a new process. The bare interpreter start-up is reported
+separately so the app's own share is visible, along with whether boto3 got
+imported and the slowest top-level imports (from python -X importtime).
+
+Usage:
+    python benchmarks/bench_import_time.py [--runs 10]
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = {
+    'interpreter': 'pass',
+    'import app': 'import app',
+    'create_app()': 'import app; app.create_app()',
+}
+
+PROBE = "; import sys; print('boto3' in sys.modules)"
+
+
+def environment():
+    env = dict(os.environ)
+    # Never reach for a real database or AWS while timing imports
+    env.setdefault('DATABASE_URL', 'sqlite://')
+    env.pop('DB_SECRET_ARN', None)
+    env['PASSWORD_HASH_WORKERS'] = '0'
+    return env
+
+
+def run(code, env):
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, '-c', code], cwd=SERVER_DIR, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return (time.perf_counter() - start) * 1000, output.strip().splitlines()[-1:] or ['']
+
+
+def slowest_imports(code, env, count):
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=SERVER_DIR, env=env,
+                            capture_output=True, text=True, check=True)
+    imports = []
+    for line in result.stderr.splitlines():
+        match = re.match(r'import time:\s+\d+ \|\s+(\d+) \|( +)(\S+)', line)
+        # Only modules imported directly by the server code (one level of indent)
+        if match and len(match.group(2)) <= 3:
+            imports.append((int(match.group(1)) / 1000, match.group(3)))
+    return sorted(imports, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--top', type=int, default=8, help='slowest imports to list')
+    args = parser.parse_args()
+    env = environment()
+
+    for label, code in TARGETS.items():
+        timings = []
+        for _ in range(args.runs):
+            elapsed, last_line = run(code + PROBE, env)
+            timings.append(elapsed)
+        print(f'{label:>14}: median {statistics.median(timings):7.1f} ms, best {min(timings):7.1f} ms, '
+              f'boto3 imported: {last_line[0]}')
+
+    print(f'\nSlowest imports for create_app():')
+    for cumulative_ms, module in slowest_imports(TARGETS['create_app()'], env, args.top):
+        print(f'  {cumulative_ms:7.1f} ms  {module}')
+
+
+if __name__ == '__main__':
+    main()
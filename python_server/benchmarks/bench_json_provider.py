@@ -0,0 +1,54 @@
+"""
+Serialization cost of GET /api/tag-requests with the stdlib and orjson encoders.
+
+Seeds a roster and tag history, loads tag requests with their docents
+embedded (as the endpoint does), and times building the response body with
+FastJSONProvider using orjson and with orjson disabled (the stdlib json
+module, which is what Flask's default provider uses).
+
+Usage:
+    python benchmarks/bench_json_provider.py [--tag-requests 10000]
+"""
+import argparse
+
+from common import create_bench_app, seed_database, time_call
+from db_config import db
+from domain.tags.tag_repository import TagRequestRepository
+import json_provider
+from json_provider import init_json
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tag-requests', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    if json_provider.orjson is None:
+        print('orjson not installed; nothing to compare')
+        return
+
+    app = create_bench_app()
+    init_json(app)
+    with app.app_context():
+        seed_database(tag_requests=args.tag_requests)
+        tags = TagRequestRepository.get_all_tag_requests()
+        median, best = time_call(lambda: [tag.to_dict() for tag in tags], repeat=args.repeat)
+        print(f'to_dict() x {len(tags)}: median {median:.1f} ms, best {best:.1f} ms')
+        rows = [tag.to_dict() for tag in tags]
+        db.session.remove()
+
+    orjson = json_provider.orjson
+    results = {}
+    with app.test_request_context():
+        for label, encoder in (('stdlib json', None), ('orjson', orjson)):
+            json_provider.orjson = encoder
+            body = app.json.response(rows).get_data()
+            median, best = time_call(lambda: app.json.response(rows), repeat=args.repeat)
+            results[label] = median
+            print(f'{label:>12}: median {median:7.1f} ms, best {best:7.1f} ms, {len(body):,} bytes')
+    json_provider.orjson = orjson
+    print(f'orjson speedup: {results["stdlib json"] / results["orjson"]:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+The seasoned docent board from SQL and from the in-memory open requests board.
+
+Seeds a roster and tag history, then times building one seasoned docent's
+GET /api/tag-requests body for a calendar window both ways: the
+`status = 'requested' OR seasoned_docent_id = ?` query with to_dict(), and
+OpenRequestBoard (open requests from memory, only the docent's own tags
+queried). The board's first load is timed separately.
+
+Usage:
+    python benchmarks/bench_open_board.py [--tags 100000]
+"""
+import argparse
+import time
+from datetime import date, timedelta
+
+from common import create_bench_app, seed_database, time_call
+from domain.tags.open_board import OpenRequestBoard
+from domain.tags.tag_service import TagRequestService
+from domain.users.user_model import User
+from db_config import db
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tags', type=int, default=100000, help='number of tag requests to seed')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    app = create_bench_app()
+    with app.app_context():
+        print(f'Seeding {args.tags} tag requests into {db.engine.url.render_as_string(hide_password=True)}')
+        _, seasoned_ids = seed_database(tag_requests=args.tags)
+        user = db.session.get(User, seasoned_ids[len(seasoned_ids) // 2])
+        # The calendar's six-week grid
+        start = date.today().replace(day=1).isoformat()
+        end = (date.today().replace(day=1) + timedelta(days=41)).isoformat()
+
+        def from_sql():
+            return [tag.to_dict() for tag in TagRequestService.get_tag_requests(user, start, end)]
+
+        board = OpenRequestBoard()
+        started = time.perf_counter()
+        board.open_between()
+        print(f'board first load: {(time.perf_counter() - started) * 1000:.1f} ms')
+
+        rows = len(from_sql())
+        assert rows == len(TagRequestService.get_seasoned_board(board, user, start, end))
+        for label, fn in (('SQL (OR query)', from_sql),
+                          ('open board', lambda: TagRequestService.get_seasoned_board(board, user, start, end))):
+            median, best = time_call(fn, repeat=args.repeat)
+            print(f'{label:>15}: median {median:7.2f} ms, best {best:7.2f} ms ({rows} rows)')
+
+
+if __name__ == '__main__':
+    main()
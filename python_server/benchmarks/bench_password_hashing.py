@@ -0,0 +1,80 @@
+"""
+Login throughput with password verification inline vs. in the process pool.
+
+Simulates a burst of concurrent logins (one thread per client, as the web
+server would run them) and, alongside it, a cheap request loop whose latency
+shows how much the burst starves everything else.
+
+Usage:
+    python benchmarks/bench_password_hashing.py [--clients 16] [--logins 20] [--rounds 29000]
+"""
+import argparse
+import os
+import statistics
+import threading
+import time
+
+import common  # noqa: F401  (puts the server modules on sys.path)
+from domain.users import password_hasher
+
+
+def cheap_request_latencies(stop):
+    # Stand-in for a request that needs a little Python CPU time
+    samples = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        sum(range(20000))
+        samples.append((time.perf_counter() - start) * 1000)
+        time.sleep(0.005)
+    return samples
+
+
+def run(label, clients, logins, password_hash):
+    stop = threading.Event()
+    latencies = []
+    probe = threading.Thread(target=lambda: latencies.extend(cheap_request_latencies(stop)))
+
+    def client():
+        for _ in range(logins):
+            assert password_hasher.verify_password('password123', password_hash)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    # Warm the pool up so process start-up isn't counted
+    password_hasher.verify_password('password123', password_hash)
+
+    probe.start()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    probe.join()
+
+    total = clients * logins
+    p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) >= 20 else max(latencies)
+    print(f'{label:>24}: {total / elapsed:7.1f} logins/s, '
+          f'cheap request median {statistics.median(latencies):.2f} ms, p95 {p95:.2f} ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--logins', type=int, default=20, help='logins per client')
+    parser.add_argument('--rounds', type=int, default=password_hasher.DEFAULT_ROUNDS)
+    args = parser.parse_args()
+
+    password_hasher.configure(rounds=args.rounds)
+    password_hash = password_hasher.hash_password('password123')
+    print(f'{args.clients} concurrent clients x {args.logins} logins, {args.rounds} PBKDF2 rounds')
+
+    run('inline', args.clients, args.logins, password_hash)
+    workers = os.cpu_count() or 1
+    password_hasher.configure(rounds=args.rounds, workers=workers)
+    run(f'process pool ({workers})', args.clients, args.logins, password_hash)
+    password_hasher.configure()
+
+
+if __name__ == '__main__':
+    main()
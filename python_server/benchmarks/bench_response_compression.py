@@ -0,0 +1,76 @@
+"""
+Bytes on the wire and compression CPU cost for the large API payloads.
+
+Seeds a roster and tag history, builds the JSON bodies the list endpoints
+return (serialized exactly as jsonify does), and compresses each one with gzip
+and brotli at several levels.
+
+Usage:
+    python benchmarks/bench_response_compression.py [--tag-requests 20000]
+"""
+import argparse
+import gzip
+
+from common import create_bench_app, seed_database, time_call
+from db_config import db
+from domain.tags.tag_model import TagRequest
+from domain.tags.tag_repository import TagRequestRepository
+from domain.users.user_model import User
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+CODECS = [
+    ('gzip 1', lambda data: gzip.compress(data, compresslevel=1, mtime=0)),
+    ('gzip 6', lambda data: gzip.compress(data, compresslevel=6, mtime=0)),
+    ('gzip 9', lambda data: gzip.compress(data, compresslevel=9, mtime=0)),
+]
+if brotli is not None:
+    CODECS += [
+        ('br 1', lambda data: brotli.compress(data, quality=1)),
+        ('br 4', lambda data: brotli.compress(data, quality=4)),
+        ('br 6', lambda data: brotli.compress(data, quality=6)),
+        # br 11 is for precompressed static files: ~400x slower than br 4 here
+    ]
+
+
+def payloads(app):
+    dumps = lambda obj: app.json.dumps(obj).encode()
+    tags = TagRequestRepository.get_all_tag_requests()
+    ordered = sorted(tags, key=lambda tag: (tag.date, tag.id))
+    return {
+        'GET /api/users': dumps([user.to_dict() for user in User.query.all()]),
+        'tag requests, page of 100': dumps([tag.to_dict() for tag in ordered[:100]]),
+        'tag requests, page of 500': dumps([tag.to_dict() for tag in ordered[:500]]),
+        f'GET /api/tag-requests ({len(tags)})': dumps([tag.to_dict() for tag in tags]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tag-requests', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    if brotli is None:
+        print('brotli not installed; gzip only')
+
+    app = create_bench_app()
+    with app.app_context():
+        seed_database(tag_requests=args.tag_requests)
+        bodies = payloads(app)
+        db.session.remove()
+
+    for label, body in bodies.items():
+        print(f'\n{label}: {len(body):,} bytes uncompressed')
+        print(f'  {"codec":>7} {"bytes":>11} {"ratio":>7} {"ms":>9} {"MB/s":>8}')
+        for name, codec in CODECS:
+            size = len(codec(body))
+            median, _ = time_call(lambda: codec(body), repeat=args.repeat)
+            throughput = len(body) / 1e6 / (median / 1000) if median else float('inf')
+            print(f'  {name:>7} {size:>11,} {len(body) / size:6.1f}x {median:9.2f} {throughput:8.1f}')
+
+
+if __name__ == '__main__':
+    main()
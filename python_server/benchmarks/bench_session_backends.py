@@ -0,0 +1,86 @@
+"""
+Per-request session overhead of each SESSION_TYPE.
+
+Logs a client in once, then times requests that only read the session and
+requests that modify it, against a handler that doesn't touch the session
+(Flask still opens it). Run against Postgres with BENCH_DATABASE_URL to see
+the SQL backend's real round trip; the default SQLite file is local, and its
+writes pay a file sync each.
+
+Usage:
+    python benchmarks/bench_session_backends.py [--requests 2000]
+"""
+import argparse
+import tempfile
+import time
+from datetime import timedelta
+
+from common import create_bench_app, time_call
+from flask import session
+from db_config import db
+from session_store import init_session
+
+BACKENDS = ['filesystem', 'sql', 'cookie']
+
+
+def build_app(backend):
+    app = create_bench_app({
+        'SESSION_TYPE': backend,
+        'SESSION_PERMANENT': True,
+        'PERMANENT_SESSION_LIFETIME': timedelta(days=7),
+        'SESSION_FILE_DIR': tempfile.mkdtemp(),
+        'SESSION_PRUNE_INTERVAL': 0
+    })
+    init_session(app)
+
+    @app.route('/login')
+    def login():
+        session['user_id'] = 1
+        session['role_cache'] = {'role': 'coordinator', 'version': 0, 'cached_at': time.time()}
+        return 'ok'
+
+    @app.route('/read')
+    def read():
+        return str(session.get('user_id'))
+
+    @app.route('/write')
+    def write():
+        session['role_cache'] = {'role': 'coordinator', 'version': 0, 'cached_at': time.time()}
+        return 'ok'
+
+    @app.route('/none')
+    def none():
+        return 'ok'
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    return app
+
+
+def per_request_ms(client, path, requests):
+    def run():
+        for _ in range(requests):
+            client.get(path)
+    median, _ = time_call(run, repeat=3)
+    return median / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f'{"backend":>12} {"untouched":>12} {"read":>12} {"write":>12}   (ms per request)')
+    for backend in BACKENDS:
+        app = build_app(backend)
+        client = app.test_client()
+        client.get('/login')
+        baseline = per_request_ms(client, '/none', args.requests)
+        read = per_request_ms(client, '/read', args.requests)
+        write = per_request_ms(client, '/write', args.requests)
+        print(f'{backend:>12} {baseline:12.3f} {read:12.3f} {write:12.3f}')
+
+
+if __name__ == '__main__':
+    main()
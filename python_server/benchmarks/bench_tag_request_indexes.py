@@ -0,0 +1,99 @@
+"""
+Compare query plans and timings for the tag_requests hot paths with and
+without the indexes declared on TagRequest.
+
+Usage:
+    python benchmarks/bench_tag_request_indexes.py [--tags 100000]
+
+Set BENCH_DATABASE_URL to a scratch Postgres database for production-like
+plans; by default a temporary SQLite file is used.
+"""
+import argparse
+from datetime import date, timedelta
+
+from common import create_bench_app, seed_database, time_call
+from sqlalchemy import text
+from db_config import db
+from domain.tags.tag_model import TagRequest
+
+HOT_QUERIES = {
+    'new docent month view': (
+        "SELECT * FROM tag_requests WHERE new_docent_id = :new_id "
+        "AND date BETWEEN :start AND :end"
+    ),
+    'duplicate check': (
+        "SELECT id FROM tag_requests WHERE date = :day AND time_slot = 'AM' "
+        "AND new_docent_id = :new_id LIMIT 1"
+    ),
+    'seasoned board month view': (
+        "SELECT * FROM tag_requests WHERE (status = 'requested' OR seasoned_docent_id = :seasoned_id) "
+        "AND date BETWEEN :start AND :end"
+    ),
+    'open requests page': (
+        "SELECT * FROM tag_requests WHERE status = 'requested' AND date >= :start "
+        "ORDER BY date, id LIMIT 100"
+    ),
+    'user delete reference check': (
+        "SELECT id FROM tag_requests WHERE new_docent_id = :new_id "
+        "OR seasoned_docent_id = :seasoned_id LIMIT 1"
+    ),
+    'coordinator calendar counts': (
+        "SELECT date, time_slot, COALESCE(status, 'requested'), COUNT(*) FROM tag_requests "
+        "WHERE date BETWEEN :start AND :end GROUP BY date, time_slot, COALESCE(status, 'requested')"
+    ),
+}
+
+
+def explain(sql, params):
+    if db.engine.dialect.name == 'postgresql':
+        rows = db.session.execute(text('EXPLAIN ANALYZE ' + sql), params)
+        return '\n'.join(row[0] for row in rows)
+    rows = db.session.execute(text('EXPLAIN QUERY PLAN ' + sql), params)
+    return '\n'.join(row[-1] for row in rows)
+
+
+def run_phase(label, params):
+    print(f'\n=== {label} ===')
+    for name, sql in HOT_QUERIES.items():
+        median, best = time_call(lambda: db.session.execute(text(sql), params).fetchall())
+        print(f'\n-- {name}: median {median:.2f} ms, best {best:.2f} ms')
+        print(explain(sql, params))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tags', type=int, default=100000, help='number of tag requests to seed')
+    args = parser.parse_args()
+
+    app = create_bench_app()
+    with app.app_context():
+        print(f'Seeding {args.tags} tag requests into {db.engine.url.render_as_string(hide_password=True)}')
+        new_ids, seasoned_ids = seed_database(tag_requests=args.tags)
+
+        today = date.today()
+        params = {
+            'new_id': new_ids[len(new_ids) // 2],
+            'seasoned_id': seasoned_ids[len(seasoned_ids) // 2],
+            'start': today.replace(day=1),
+            'end': today.replace(day=1) + timedelta(days=41),
+            'day': today + timedelta(days=7),
+        }
+
+        indexes = [index for index in TagRequest.__table__.indexes]
+        for index in indexes:
+            index.drop(db.engine)
+        db.session.execute(text('ANALYZE tag_requests'))
+        db.session.commit()
+        run_phase('before: primary key only', params)
+
+        for index in indexes:
+            index.create(db.engine)
+        db.session.execute(text('ANALYZE tag_requests'))
+        db.session.commit()
+        run_phase('after: ' + ', '.join(sorted(index.name for index in indexes)), params)
+
+        db.drop_all()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Shared helpers for the benchmark scripts in this directory.
+
+Benchmarks run against BENCH_DATABASE_URL (e.g. a scratch Postgres database)
+or, when unset, a throwaway SQLite file. They drop and recreate all tables,
+so never point them at a real database.
+"""
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+# Make the server modules importable when run as `python benchmarks/<script>.py`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy import insert
+from db_config import db
+from domain.users.user_model import User
+from domain.tags.tag_model import TagRequest
+
+# Seeded users never log in, so skip hashing one password per row
+SEED_PASSWORD_HASH = '$pbkdf2-sha256$29000$seed$seed'
+
+
+def create_bench_app(config=None):
+    """Create a bare Flask app bound to the benchmark database"""
+    app = Flask(__name__)
+    database_url = os.environ.get('BENCH_DATABASE_URL')
+    if not database_url:
+        database_url = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SECRET_KEY'] = 'bench-secret-key'
+    if config:
+        app.config.update(config)
+    db.init_app(app)
+    return app
+
+
+def seed_database(new_docents=2000, seasoned_docents=300, tag_requests=100000, open_fraction=0.1):
+    """
+    Recreate the schema and fill it with a roster and several years of tags.
+    Must be called inside an app context. Returns (new_ids, seasoned_ids).
+    """
+    db.drop_all()
+    db.create_all()
+    rng = random.Random(42)
+
+    users = []
+    for i in range(new_docents):
+        users.append(dict(email=f'new{i}@example.com', first_name='New', last_name=f'Docent{i}',
+                          phone='(415) 555-0100', role='new_docent', password=SEED_PASSWORD_HASH))
+    for i in range(seasoned_docents):
+        users.append(dict(email=f'seasoned{i}@example.com', first_name='Seasoned', last_name=f'Docent{i}',
+                          phone='(415) 555-0200', role='seasoned_docent', password=SEED_PASSWORD_HASH))
+    db.session.execute(insert(User), users)
+    db.session.commit()
+
+    new_ids = [row.id for row in db.session.query(User.id).filter_by(role='new_docent')]
+    seasoned_ids = [row.id for row in db.session.query(User.id).filter_by(role='seasoned_docent')]
+
+    # Roughly four years of history plus a few months ahead
+    first_day = date.today() - timedelta(days=4 * 365)
+    span = 4 * 365 + 120
+    now = datetime.utcnow()
+    batch = []
+    for _ in range(tag_requests):
+        is_open = rng.random() < open_fraction
+        batch.append(dict(
+            new_docent_id=rng.choice(new_ids),
+            seasoned_docent_id=None if is_open else rng.choice(seasoned_ids),
+            date=first_day + timedelta(days=rng.randrange(span)),
+            time_slot=rng.choice(('AM', 'PM')),
+            status='requested' if is_open else 'filled',
+            created_at=now,
+            updated_at=now,
+        ))
+        if len(batch) == 5000:
+            db.session.execute(insert(TagRequest), batch)
+            batch = []
+    if batch:
+        db.session.execute(insert(TagRequest), batch)
+    db.session.commit()
+
+    return new_ids, seasoned_ids
+
+
+def time_call(fn, repeat=20):
+    """Run fn `repeat` times and return (median, best) wall time in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), min(samples)
@@ -0,0 +1,97 @@
+"""
+Closed-loop HTTP load test against a running server.
+
+Each client thread keeps one keep-alive connection open and sends requests
+back to back for the given duration. Compare the development server with
+gunicorn on the same machine:
+
+    python run_python_server.py                       # port 5001
+    python benchmarks/load_test.py --url http://127.0.0.1:5001
+
+    gunicorn -c gunicorn.conf.py wsgi:app             # port 8000
+    python benchmarks/load_test.py --url http://127.0.0.1:8000
+
+Pass --email/--password to log in first and hit an authenticated endpoint,
+e.g. --path /api/tag-requests.
+
+Usage:
+    python benchmarks/load_test.py [--url URL] [--path /api/health] [--clients 32] [--duration 10]
+"""
+import argparse
+import http.client
+import json
+import statistics
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+def login_cookie(url, email, password):
+    parts = urlsplit(url)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+    conn.request('POST', '/api/login', body=json.dumps({'email': email, 'password': password}),
+                  headers={'Content-Type': 'application/json'})
+    response = conn.getresponse()
+    response.read()
+    if response.status != 200:
+        raise SystemExit(f'Login failed with HTTP {response.status}')
+    return response.getheader('Set-Cookie').split(';', 1)[0]
+
+
+def client(url, path, headers, deadline, latencies, errors):
+    parts = urlsplit(url)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            conn.request('GET', path, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 400:
+                errors.append(response.status)
+            else:
+                latencies.append((time.perf_counter() - start) * 1000)
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(type(e).__name__)
+            conn.close()
+            conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--path', default='/api/health')
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds')
+    parser.add_argument('--email')
+    parser.add_argument('--password')
+    args = parser.parse_args()
+
+    headers = {}
+    if args.email:
+        headers['Cookie'] = login_cookie(args.url, args.email, args.password)
+
+    latencies, errors = [], []
+    deadline = time.perf_counter() + args.duration
+    threads = [
+        threading.Thread(target=client, args=(args.url, args.path, headers, deadline, latencies, errors))
+        for _ in range(args.clients)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    if not latencies:
+        raise SystemExit(f'No successful requests ({len(errors)} errors)')
+    cuts = statistics.quantiles(latencies, n=100)
+    print(f'{args.url}{args.path}: {args.clients} clients for {elapsed:.1f}s')
+    print(f'  {len(latencies) / elapsed:8.1f} req/s, {len(errors)} errors')
+    print(f'  latency ms: p50 {cuts[49]:.1f}  p95 {cuts[94]:.1f}  p99 {cuts[98]:.1f}  max {max(latencies):.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Negotiated compression of API responses.
+
+JSON lists of users and tag requests repeat the same keys and embedded
+docents on every row, so they shrink several-fold. Responses smaller than
+COMPRESS_MIN_SIZE bytes are left alone, since compressing them costs more
+CPU than the bytes it saves. Brotli is used when the brotli package is
+installed and the client accepts it; otherwise gzip.
+
+Config:
+    COMPRESS_MIN_SIZE     bytes below which responses go out as is (default 1024)
+    COMPRESS_GZIP_LEVEL   1-9 (default 6)
+    COMPRESS_BR_QUALITY   0-11 (default 4; higher levels are meant for static files)
+"""
+import gzip
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always available
+    brotli = None
+
+from flask import request
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'text/plain', 'text/html', 'text/csv'}
+
+
+def choose_encoding():
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress(data, encoding, config):
+    if encoding == 'br':
+        return brotli.compress(data, quality=config.get('COMPRESS_BR_QUALITY', 4))
+    return gzip.compress(data, compresslevel=config.get('COMPRESS_GZIP_LEVEL', 6), mtime=0)
+
+
+def init_compression(app):
+    @app.after_request
+    def compress_response(response):
+        if (
+            response.direct_passthrough  # files and streams
+            or response.is_streamed
+            or response.status_code < 200
+            or response.status_code in (204, 304)
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        ):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        if response.content_length is not None and response.content_length < app.config.get('COMPRESS_MIN_SIZE', 1024):
+            return response
+
+        encoding = choose_encoding()
+        if encoding is None:
+            return response
+
+        response.set_data(compress(response.get_data(), encoding, app.config))
+        response.headers['Content-Encoding'] = encoding
+        # The compressed bytes are a different representation of the resource
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(f'{etag}-{encoding}', weak)
+        return response
@@ -0,0 +1,150 @@
+import os
+import random
+import threading
+import time
+from collections import deque
+from domain.email.rate_limiter import TokenBucket
+from utils import send_email, get_send_quota, logger, SEND_QUOTA_MAX_AGE, DAILY_QUOTA_EXCEEDED
+
+# SES errors worth retrying after a short pause
+TRANSIENT_ERROR_CODES = {
+    'Throttling',
+    'ThrottlingException',
+    'TooManyRequestsException',
+    'ServiceUnavailable',
+    'InternalFailure',
+    'RequestTimeout',
+}
+# SES errors that will fail the same way however often the email is retried
+PERMANENT_ERROR_CODES = {
+    'MessageRejected',
+    'MailFromDomainNotVerifiedException',
+    'InvalidParameterValue',
+}
+# Used until the real quota has been read; SES sandbox accounts allow 1/s
+DEFAULT_SEND_RATE = 1.0
+SEND_RATE_WINDOW_SECONDS = 60
+
+class EmailDispatcher:
+    """
+    Sends emails within the SES quota.
+
+    A token bucket paces sends to MaxSendRate (counted per recipient, as SES
+    does) divided by EMAIL_SENDERS, the number of processes draining the
+    outbox, so the whole deployment stays under the account limit. Throttled
+    and transient errors are retried a few times with full-jitter backoff
+    before the email is handed back to the outbox for a later attempt. This
+    is the only retry layer: the SES client itself makes a single attempt.
+    When the daily quota is spent the result is marked `deferred`, and the
+    outbox holds the email until the quota window has passed.
+    """
+
+    def __init__(self, send=send_email, quota=get_send_quota, sleep=time.sleep,
+                 clock=time.monotonic, inline_retries=2, backoff_base=0.5, backoff_cap=8.0):
+        self._send = send
+        self._quota = quota
+        self._sleep = sleep
+        self._clock = clock
+        self.inline_retries = inline_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.bucket = TokenBucket(DEFAULT_SEND_RATE, clock=clock, sleep=sleep)
+        self.daily_remaining = None
+        self._quota_checked_at = None
+        self._lock = threading.Lock()
+        self._sent_times = deque()
+        self.counters = {'sent': 0, 'failed': 0, 'deferred': 0, 'throttled': 0, 'retried': 0}
+
+    def refresh_quota(self):
+        """Re-read the SES quota and resize the bucket. Returns False if SES was unreachable."""
+        self._quota_checked_at = self._clock()
+        try:
+            quota = self._quota(max_age=0)
+        except Exception as e:
+            logger.error(f"SES send quota check failed: {e}")
+            return False
+
+        senders = max(int(os.getenv('EMAIL_SENDERS', '1')), 1)
+        self.bucket.set_rate(quota['MaxSendRate'] / senders)
+        if 'SentLast24Hours' in quota:
+            self.daily_remaining = quota['Max24HourSend'] - quota['SentLast24Hours']
+        logger.info(f"Email send rate set to {self.bucket.rate:.2f}/s, {self.daily_remaining} sends left today")
+        return True
+
+    def _quota_is_stale(self):
+        return self._quota_checked_at is None or self._clock() - self._quota_checked_at >= SEND_QUOTA_MAX_AGE
+
+    def backoff(self, attempt):
+        # Full jitter: sleep anywhere up to the exponential cap
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def _record(self, counter, amount=1):
+        with self._lock:
+            self.counters[counter] += amount
+            if counter == 'sent':
+                self._sent_times.append(self._clock())
+
+    def dispatch(self, recipients, email_content):
+        """
+        Send one email, pacing and retrying as needed. Returns send_email's
+        result dict, with `retryable` set on failures and `deferred` when the
+        daily quota is spent.
+        """
+        if self._quota_is_stale():
+            self.refresh_quota()
+
+        if self.daily_remaining is not None and self.daily_remaining < len(recipients):
+            self._record('deferred')
+            return {"success": False, "error": "Daily SES sending quota exhausted",
+                    "error_type": "QuotaExceeded", "error_code": DAILY_QUOTA_EXCEEDED,
+                    "retryable": True, "deferred": True}
+
+        for attempt in range(self.inline_retries + 1):
+            self.bucket.acquire(len(recipients))
+            result = self._send(recipients, email_content)
+
+            if result.get("success"):
+                self._record('sent')
+                if self.daily_remaining is not None:
+                    self.daily_remaining -= len(recipients)
+                return result
+
+            error_code = result.get("error_code")
+            if error_code == DAILY_QUOTA_EXCEEDED:
+                # A spent daily quota won't recover within a few seconds
+                self.daily_remaining = 0
+                self._record('throttled')
+                self._record('deferred')
+                return {**result, "retryable": True, "deferred": True}
+            if error_code not in TRANSIENT_ERROR_CODES:
+                break
+            self._record('throttled')
+            if attempt < self.inline_retries:
+                self._record('retried')
+                self._sleep(self.backoff(attempt))
+
+        self._record('failed')
+        result["retryable"] = result.get("error_code") not in PERMANENT_ERROR_CODES
+        return result
+
+    def send_rate(self):
+        """Emails sent per second over the last minute"""
+        with self._lock:
+            cutoff = self._clock() - SEND_RATE_WINDOW_SECONDS
+            while self._sent_times and self._sent_times[0] < cutoff:
+                self._sent_times.popleft()
+            return len(self._sent_times) / SEND_RATE_WINDOW_SECONDS
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+        return {
+            **counters,
+            'sendRate': self.send_rate(),
+            'maxSendRate': self.bucket.rate,
+            'dailyRemaining': self.daily_remaining
+        }
+
+
+# Shared by every outbox worker thread in this process
+email_dispatcher = EmailDispatcher()
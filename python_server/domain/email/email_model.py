@@ -0,0 +1,43 @@
+from db_config import db
+from datetime import datetime
+import json
+
+class OutboxEmail(db.Model):
+    """
+    An email waiting to be delivered by the outbox worker.
+
+    Rows are written in the same transaction as the change that triggers the
+    email (a tag claim, a reset token), so an email exists if and only if that
+    change committed. The message is rendered up front and stored whole.
+    """
+    __tablename__ = 'email_outbox'
+    __table_args__ = (
+        # The worker polls for due pending rows in id order
+        db.Index('ix_email_outbox_status_next_attempt', 'status', 'next_attempt_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)  # tag_confirmation, password_reset
+    recipients = db.Column(db.Text, nullable=False)  # JSON list of addresses
+    subject = db.Column(db.String(255), nullable=False)
+    text_body = db.Column(db.Text, nullable=False)
+    html_body = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending, sent, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_error = db.Column(db.Text, nullable=True)
+    message_id = db.Column(db.String(255), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # After this the email is useless (e.g. its reset link has expired) and is dropped unsent
+    expires_at = db.Column(db.DateTime, nullable=True)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    def get_recipients(self):
+        return json.loads(self.recipients)
+
+    def get_content(self):
+        return {
+            "subject": self.subject,
+            "text_body": self.text_body,
+            "html_body": self.html_body
+        }
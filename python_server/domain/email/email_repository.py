@@ -0,0 +1,102 @@
+from db_config import db
+from domain.email.email_model import OutboxEmail
+from datetime import datetime, timedelta
+from sqlalchemy import update
+import json
+
+class OutboxRepository:
+    @staticmethod
+    def add_email(kind, recipients, email_content, expires_at=None):
+        # Not committed here: the caller commits it with the change that triggered it
+        email = OutboxEmail(
+            kind=kind,
+            recipients=json.dumps(recipients),
+            subject=email_content["subject"],
+            text_body=email_content["text_body"],
+            html_body=email_content["html_body"],
+            status='pending',
+            attempts=0,
+            next_attempt_at=datetime.utcnow(),
+            expires_at=expires_at
+        )
+        db.session.add(email)
+        return email
+
+    @staticmethod
+    def claim_due_emails(limit, lease_seconds):
+        """
+        Lease up to `limit` due emails to this worker and commit.
+
+        Leasing pushes next_attempt_at forward instead of holding row locks
+        during the send; if the worker dies the lease lapses and another worker
+        picks the email up. SKIP LOCKED keeps concurrent workers on Postgres
+        from claiming the same rows. Emails that expire go first, soonest
+        expiry first.
+        """
+        now = datetime.utcnow()
+        emails = (
+            OutboxEmail.query
+            .filter(OutboxEmail.status == 'pending', OutboxEmail.next_attempt_at <= now)
+            .order_by(OutboxEmail.expires_at.asc().nulls_last(), OutboxEmail.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        for email in emails:
+            email.attempts += 1
+            email.next_attempt_at = now + timedelta(seconds=lease_seconds)
+            # Not a column: kept through the commit's expiry as the lease's
+            # token, since every later claim counts another attempt
+            email.leased_attempt = email.attempts
+        db.session.commit()
+        return emails
+
+    @staticmethod
+    def renew_lease(email, lease_seconds):
+        """
+        Extend this worker's lease on `email` right before sending it, so a
+        batch that runs long never outlives its leases. Returns False when the
+        lease already lapsed and another worker claimed the email (each claim
+        counts an attempt), in which case this worker must not send it.
+        """
+        renewed = db.session.execute(
+            update(OutboxEmail)
+            .where(OutboxEmail.id == email.id, OutboxEmail.status == 'pending',
+                   OutboxEmail.attempts == email.leased_attempt)
+            .values(next_attempt_at=datetime.utcnow() + timedelta(seconds=lease_seconds))
+            .execution_options(synchronize_session=False)
+        ).rowcount == 1
+        db.session.commit()
+        return renewed
+
+    @staticmethod
+    def mark_sent(email, message_id):
+        email.status = 'sent'
+        email.message_id = message_id
+        email.sent_at = datetime.utcnow()
+        email.last_error = None
+        db.session.commit()
+
+    @staticmethod
+    def mark_retry(email, error, retry_at):
+        email.last_error = error
+        email.next_attempt_at = retry_at
+        db.session.commit()
+
+    @staticmethod
+    def mark_deferred(email, error, retry_at):
+        # Not the email's fault: give back the attempt claim_due_emails counted
+        email.attempts -= 1
+        email.last_error = error
+        email.next_attempt_at = retry_at
+        db.session.commit()
+
+    @staticmethod
+    def mark_failed(email, error):
+        email.status = 'failed'
+        email.last_error = error
+        db.session.commit()
+
+    @staticmethod
+    def count_pending():
+        return OutboxEmail.query.filter_by(status='pending').count()
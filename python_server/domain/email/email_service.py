@@ -0,0 +1,96 @@
+from domain.email.email_repository import OutboxRepository
+from domain.email.email_dispatcher import email_dispatcher
+from utils import (
+    format_password_reset_email,
+    format_tag_scheduling_email,
+    password_reset_recipients,
+    tag_scheduling_recipients,
+    logger
+)
+from datetime import datetime, timedelta
+import random
+
+MAX_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 3600
+# How long a claimed email stays invisible to other workers while being sent
+LEASE_SECONDS = 120
+# SES counts the daily quota over a rolling 24 hours
+QUOTA_WINDOW = timedelta(hours=24)
+# Emails that expire don't wait out the whole window: quota frees up as the
+# rolling window moves, so they check back while they are still useful
+EXPIRING_QUOTA_DEFERRAL = timedelta(minutes=10)
+
+class EmailService:
+    @staticmethod
+    def queue_tag_confirmation(tag):
+        return OutboxRepository.add_email(
+            'tag_confirmation',
+            tag_scheduling_recipients(tag),
+            format_tag_scheduling_email(tag)
+        )
+
+    @staticmethod
+    def queue_password_reset(user, reset_link, expires_at=None):
+        # Not worth sending once the link's token has expired
+        return OutboxRepository.add_email(
+            'password_reset',
+            password_reset_recipients(user),
+            format_password_reset_email(user, reset_link),
+            expires_at=expires_at
+        )
+
+    @staticmethod
+    def retry_delay(attempts):
+        # Exponential backoff: 30s, 60s, 120s, ... capped at an hour
+        return timedelta(seconds=min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS))
+
+    @staticmethod
+    def deliver_due_emails(batch_size=20, send=None):
+        """
+        Send one batch of due outbox emails. Returns the number sent.
+        `send` takes (recipients, email_content) and returns send_email's result
+        dict; it defaults to the rate-limited dispatcher.
+        """
+        send = send or email_dispatcher.dispatch
+        sent = 0
+        for email in OutboxRepository.claim_due_emails(batch_size, LEASE_SECONDS):
+            if email.expires_at is not None and email.expires_at <= datetime.utcnow():
+                logger.warning(f"Dropping outbox email {email.id}: expired at {email.expires_at} before it could be sent")
+                OutboxRepository.mark_failed(email, "Expired before it could be sent")
+                continue
+            # Pacing and retries may have used up the lease claimed with the batch
+            if not OutboxRepository.renew_lease(email, LEASE_SECONDS):
+                logger.warning(f"Outbox email {email.id} was claimed by another worker; skipping it")
+                continue
+            result = send(email.get_recipients(), email.get_content())
+
+            if result.get("success"):
+                OutboxRepository.mark_sent(email, result.get("message_id"))
+                sent += 1
+            elif result.get("deferred"):
+                # Held until the quota window has passed, without using up an attempt
+                retry_at = datetime.utcnow() + QUOTA_WINDOW
+                if email.expires_at is not None:
+                    retry_at = min(retry_at, datetime.utcnow() + EXPIRING_QUOTA_DEFERRAL)
+                logger.warning(f"Outbox email {email.id} deferred until {retry_at}: {result.get('error')}")
+                OutboxRepository.mark_deferred(email, result.get("error"), retry_at)
+            elif result.get("retryable") is False or email.attempts >= MAX_ATTEMPTS:
+                logger.error(f"Giving up on outbox email {email.id} after {email.attempts} attempts: {result.get('error')}")
+                OutboxRepository.mark_failed(email, result.get("error"))
+            else:
+                # Jitter spreads retries from a throttled burst back out
+                delay = EmailService.retry_delay(email.attempts) * random.uniform(0.8, 1.2)
+                retry_at = datetime.utcnow() + delay
+                logger.warning(f"Outbox email {email.id} failed (attempt {email.attempts}), retrying at {retry_at}")
+                OutboxRepository.mark_retry(email, result.get("error"), retry_at)
+
+        return sent
+
+    @staticmethod
+    def get_stats():
+        # Counters are for this process; queue depth is shared through the table
+        return {
+            'queueDepth': OutboxRepository.count_pending(),
+            **email_dispatcher.stats()
+        }
@@ -0,0 +1,48 @@
+import threading
+import uuid
+
+
+class FakeSESClient:
+    """
+    In-memory stand-in for the boto3 SES client, used when EMAIL_BACKEND=fake.
+
+    Records every message instead of sending it so the outbox can be exercised
+    offline. Failures can be scripted with fail_next() to test retries.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.sent_messages = []
+        self._failures = []
+
+    def fail_next(self, code='Throttling', message='Maximum sending rate exceeded.', times=1):
+        """Make the next `times` send_email calls raise a ClientError with `code`"""
+        with self._lock:
+            self._failures.extend([(code, message)] * times)
+
+    def reset(self):
+        with self._lock:
+            self.sent_messages = []
+            self._failures = []
+
+    def get_send_quota(self):
+        return {'Max24HourSend': 50000.0, 'MaxSendRate': 14.0, 'SentLast24Hours': float(len(self.sent_messages))}
+
+    def send_email(self, Source, Destination, Message, **kwargs):
+        with self._lock:
+            if self._failures:
+                from botocore.exceptions import ClientError
+                code, message = self._failures.pop(0)
+                raise ClientError({'Error': {'Code': code, 'Message': message}}, 'SendEmail')
+            message_id = str(uuid.uuid4())
+            self.sent_messages.append({
+                'MessageId': message_id,
+                'Source': Source,
+                'Destination': Destination,
+                'Message': Message,
+            })
+        return {'MessageId': message_id}
+
+
+# Shared instance so tests and the worker observe the same outbox
+fake_ses_client = FakeSESClient()
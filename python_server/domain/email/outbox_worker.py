@@ -0,0 +1,62 @@
+import threading
+import time
+from domain.email.email_service import EmailService
+from domain.email.email_dispatcher import email_dispatcher
+from utils import logger, SEND_QUOTA_MAX_AGE
+
+class OutboxWorker(threading.Thread):
+    """
+    Background thread that drains the email outbox.
+
+    Run one per web process (start_outbox_worker) or as its own process
+    (run_outbox_worker.py); leasing in the repository makes it safe to run
+    several at once.
+    """
+
+    def __init__(self, app, poll_interval=2.0, batch_size=20):
+        super().__init__(name='email-outbox-worker', daemon=True)
+        self.app = app
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self._stop_event = threading.Event()
+        self._quota_checked_at = None
+
+    def drain_once(self):
+        with self.app.app_context():
+            return EmailService.deliver_due_emails(self.batch_size)
+
+    def check_send_quota(self):
+        # Periodic SES health probe, kept off the per-email path. It also
+        # resizes the dispatcher's rate limit; failures are logged and retried
+        # at the next interval.
+        now = time.monotonic()
+        if self._quota_checked_at is not None and now - self._quota_checked_at < SEND_QUOTA_MAX_AGE:
+            return
+        self._quota_checked_at = now
+        email_dispatcher.refresh_quota()
+
+    def run(self):
+        logger.info("Email outbox worker started")
+        while not self._stop_event.is_set():
+            self.check_send_quota()
+            try:
+                sent = self.drain_once()
+            except Exception as e:
+                logger.error(f"Email outbox worker error: {e}", exc_info=True)
+                sent = 0
+            # Keep draining while there is a backlog, otherwise poll
+            if sent < self.batch_size:
+                self._stop_event.wait(self.poll_interval)
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def start_outbox_worker(app):
+    worker = OutboxWorker(
+        app,
+        poll_interval=app.config.get('EMAIL_OUTBOX_POLL_INTERVAL', 2.0),
+        batch_size=app.config.get('EMAIL_OUTBOX_BATCH_SIZE', 20)
+    )
+    worker.start()
+    return worker
@@ -0,0 +1,50 @@
+import threading
+import time
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: refills at `rate` tokens per second up to
+    `capacity`. acquire() blocks until enough tokens are available.
+    """
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic, sleep=time.sleep):
+        self._lock = threading.Lock()
+        self._clock = clock
+        self._sleep = sleep
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(rate, 1))
+        self._tokens = self.capacity
+        self._updated_at = clock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def set_rate(self, rate, capacity=None):
+        with self._lock:
+            self._refill()
+            self.rate = float(rate)
+            self.capacity = float(capacity if capacity is not None else max(rate, 1))
+            self._tokens = min(self._tokens, self.capacity)
+
+    def try_acquire(self, tokens=1):
+        """Take `tokens` if available now. Returns 0 on success, else seconds to wait."""
+        with self._lock:
+            self._refill()
+            # A request larger than the bucket could never fit; let it through when full
+            needed = min(tokens, self.capacity)
+            if self._tokens >= needed:
+                self._tokens -= needed
+                return 0
+            return (needed - self._tokens) / self.rate
+
+    def acquire(self, tokens=1):
+        """Block until `tokens` have been taken. Returns the total time waited."""
+        waited = 0.0
+        while True:
+            wait = self.try_acquire(tokens)
+            if not wait:
+                return waited
+            self._sleep(wait)
+            waited += wait
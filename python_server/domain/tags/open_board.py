@@ -0,0 +1,195 @@
+"""
+In-process read model of the open tag requests, for the seasoned docent board.
+
+A seasoned docent sees every open request plus the tags they filled. In SQL
+that is an OR across two columns that no single index serves, run by every
+seasoned docent on every calendar load. Each process instead keeps the open
+requests in memory, serialized and keyed by date, so the board only queries
+the docent's own tags (through ix_tag_requests_seasoned_docent_date).
+
+The board is stamped with the table_versions shards of tag_requests and
+users it reflects, and every read compares the stamp with the database (one
+primary-key range query):
+ - A tag request write committed through this process is applied in place
+   when its commit moves its tag_requests shard exactly one step past the
+   board's stamp.
+ - Anything else leaves the stamps apart, and the next read rebuilds the
+   board from the database. That covers writes in another worker, user
+   changes (docents are embedded in each row), bulk statements, and local
+   commits finishing out of order.
+Writes reach the board through TagRequestRepository.record_event, which
+every tag request write already calls for the change feed.
+
+Config:
+    OPEN_BOARD_CACHE   serve seasoned docent lists from the board (default true)
+"""
+import bisect
+import threading
+from datetime import datetime
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect
+
+from db_config import db
+from domain.tags.tag_model import TagRequest
+from domain.tags.tag_repository import TagRequestRepository
+from table_versions import shard_versions
+
+BOARD_TABLES = ('tag_requests', 'users')
+
+
+class OpenRequestBoard:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Only one thread reloads the board at a time; the others wait for it
+        self._rebuild_lock = threading.Lock()
+        self._versions = None  # (tag_requests, users) shard versions reflected; None until built
+        self._rows = {}  # date -> {tag id: serialized row}
+        self._dates = []  # sorted keys of _rows
+        self._date_of = {}  # tag id -> date
+        self._docents = {}  # user id -> serialized docent, as embedded in the rows
+
+    @property
+    def built(self):
+        return self._versions is not None
+
+    def open_between(self, start=None, end=None):
+        """
+        [(date, row)] for the open requests in the window (both bounds
+        inclusive and optional), ordered by date and id.
+        """
+        # Read before the rows: a commit landing in between can only make the
+        # stamp older than the rows, which the next read corrects
+        versions = shard_versions(BOARD_TABLES)
+        with self._lock:
+            if self._versions == versions:
+                return self._between(start, end)
+        with self._rebuild_lock:
+            with self._lock:
+                if self._versions == versions:
+                    return self._between(start, end)
+            entries = [(tag.id, (tag.date, tag.to_dict())) for tag in TagRequestRepository.get_open_tag_requests()]
+            with self._lock:
+                self._rows, self._dates, self._date_of, self._docents = {}, [], {}, {}
+                for tag_id, entry in entries:
+                    self._put(tag_id, entry)
+                    self._docents.update(embedded_docents(entry[1]))
+                self._versions = versions
+                return self._between(start, end)
+
+    def snapshot(self, tag):
+        """
+        (date, serialized row) while `tag` is open, None once it is filled or
+        deleted. Called before the commit, with the write flushed, and built
+        from the flushed object: every column default is computed in Python,
+        so nothing is read back. Docents already on the board are reused
+        instead of loaded.
+        """
+        state = inspect(tag)
+        if state.deleted or state.was_deleted:
+            return None
+        if tag.status != 'requested':
+            return None
+        row = tag.to_dict(embed_users=False)
+        # A datetime assigned to the Date column reads back as its date
+        if isinstance(tag.date, datetime):
+            row['date'] = tag.date.date()
+        for name, attr in TagRequest.API_RELATIONSHIPS.items():
+            docent_id = getattr(tag, attr + '_id')
+            if docent_id is not None:
+                docent = self._docents.get(docent_id)
+                row[name] = docent if docent is not None else getattr(tag, attr).to_dict()
+        return row['date'], row
+
+    def apply(self, changes, committed_versions):
+        """
+        Take in a local commit: `changes` maps tag ids to their snapshot(),
+        `committed_versions` each bumped counter to its (shard, new version).
+        """
+        with self._lock:
+            if self._versions is None:
+                return
+            tag_shards, users_shards = self._versions
+            if set(committed_versions) != {'tag_requests'}:
+                # Users changed: rebuild on the next read
+                self._versions = None
+                return
+            shard, version = committed_versions['tag_requests']
+            if version != tag_shards[shard] + 1:
+                # Some other write to the same shard came first
+                self._versions = None
+                return
+            for tag_id, entry in changes.items():
+                self._put(tag_id, entry)
+                if entry is not None:
+                    self._docents.update(embedded_docents(entry[1]))
+            # Writes elsewhere moved other shards, which the next read notices
+            self._versions = (tag_shards[:shard] + (version,) + tag_shards[shard + 1:], users_shards)
+
+    def _put(self, tag_id, entry):
+        old_date = self._date_of.pop(tag_id, None)
+        if old_date is not None:
+            rows = self._rows[old_date]
+            del rows[tag_id]
+            if not rows:
+                del self._rows[old_date]
+                self._dates.pop(bisect.bisect_left(self._dates, old_date))
+        if entry is None:
+            return
+        day, row = entry
+        if day not in self._rows:
+            self._rows[day] = {}
+            bisect.insort(self._dates, day)
+        self._rows[day][tag_id] = row
+        self._date_of[tag_id] = day
+
+    def _between(self, start, end):
+        lo = 0 if start is None else bisect.bisect_left(self._dates, start)
+        hi = len(self._dates) if end is None else bisect.bisect_right(self._dates, end)
+        result = []
+        for day in self._dates[lo:hi]:
+            rows = self._rows[day]
+            result.extend((day, rows[tag_id]) for tag_id in sorted(rows))
+        return result
+
+
+def embedded_docents(row):
+    return {row[name]['id']: row[name] for name in TagRequest.API_RELATIONSHIPS if name in row}
+
+
+def init_open_board(app):
+    app.extensions['open_board'] = OpenRequestBoard()
+
+
+def get_open_board():
+    """This app's board, or None when OPEN_BOARD_CACHE is off"""
+    if not has_app_context() or not current_app.config.get('OPEN_BOARD_CACHE', True):
+        return None
+    return current_app.extensions.get('open_board')
+
+
+@event.listens_for(db.session, 'before_commit')
+def snapshot_written_tags(session):
+    written = session.info.pop('written_tags', None)
+    board = get_open_board()
+    # An unbuilt board loads everything on its first read anyway
+    if written and board is not None and board.built:
+        session.flush()
+        session.info['open_board_changes'] = {tag_id: board.snapshot(tag) for tag_id, tag in written.items()}
+
+
+@event.listens_for(db.session, 'after_commit')
+def apply_to_board(session):
+    changes = session.info.pop('open_board_changes', None)
+    board = get_open_board()
+    if changes is not None and board is not None:
+        board.apply(changes, session.info.get('committed_versions', {}))
+
+
+@event.listens_for(db.session, 'after_transaction_end')
+def forget_written_tags(session, transaction):
+    # Rolled back, or committed and applied; flushes end inner transactions
+    if transaction.parent is None:
+        session.info.pop('written_tags', None)
+        session.info.pop('open_board_changes', None)
@@ -0,0 +1,283 @@
+"""
+Change feed behind GET /api/tag-requests/stream (Server-Sent Events).
+
+Every write to a tag request adds a TagRequestEvent row in the same
+transaction (TagRequestRepository.record_event). Each web process runs one
+poller (start_tag_event_poller) that reads new rows by id and fans them out
+to the streams open in that process. Every worker therefore sees every
+worker's changes, and the database answers one indexed query per poll
+instead of a full list query per polling client. A commit in this process
+wakes the poller at once; changes from other processes arrive within
+SSE_POLL_INTERVAL seconds.
+
+Config:
+    SSE_MAX_STREAMS         open streams per process (default 8); each holds a request thread
+    SSE_POLL_INTERVAL       seconds between polls for other processes' events (default 1.0)
+    SSE_HEARTBEAT_SECONDS   comment sent on an idle stream to keep proxies from closing it (default 15)
+    SSE_MAX_SECONDS         a stream ends after this long and the browser reconnects (default 300)
+    SSE_EVENT_RETENTION_HOURS  how long events are kept for reconnecting clients (default 24)
+"""
+import queue
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from db_config import db
+from domain.tags.tag_repository import TagRequestRepository
+from utils import logger
+
+# Events replayed to a reconnecting client before it is told to refetch instead
+REPLAY_LIMIT = 500
+# Seconds an id missing from the sequence may still show up: ids are handed
+# out at insert but become visible at commit, which can happen out of order
+GAP_TIMEOUT = 10.0
+PRUNE_INTERVAL = 3600
+QUEUE_SIZE = 1000
+
+
+# The fields visible_to() reads
+TagState = namedtuple('TagState', 'new_docent_id seasoned_docent_id status')
+
+
+def visible_to(state, user_id, role):
+    """Whether a tag request in `state` is in the user's view (as in get_tag_requests)"""
+    if role == 'coordinator':
+        return True
+    if role == 'seasoned_docent':
+        return state.status == 'requested' or state.seasoned_docent_id == user_id
+    return state.new_docent_id == user_id
+
+
+def format_event(event_id, kind, data, dumps):
+    return f"id: {event_id}\nevent: {kind}\ndata: {dumps(data)}\n\n"
+
+
+class RenderedEvent:
+    """
+    A feed event serialized once and shared by every stream it goes to.
+    The payload is the tag request as it is now, which later changes may
+    have moved on from the event, so who gets it is decided by the current
+    row too. Users who could see the request as the event or the change
+    before it left it, but can't now, get `removed` instead.
+    """
+
+    def __init__(self, tag_event, tag, dumps):
+        # Copied off the rows: streams are fed after their session has closed
+        self.id = tag_event.id
+        self.kind = tag_event.kind
+        event_state = TagState(tag_event.new_docent_id, tag_event.seasoned_docent_id, tag_event.status)
+        self.earlier = [event_state]
+        if tag_event.previous_status is not None:
+            self.earlier.append(TagState(tag_event.previous_new_docent_id, tag_event.previous_seasoned_docent_id,
+                                         tag_event.previous_status))
+        if tag_event.kind == 'deleted':
+            # The state before the delete
+            self.current = event_state
+            self.visible = format_event(self.id, 'deleted', {'id': tag_event.tag_request_id}, dumps)
+        elif tag is None:
+            self.current = None  # deleted since; its own delete event follows
+            self.visible = None
+        else:
+            self.current = TagState(tag.new_docent_id, tag.seasoned_docent_id, tag.status or 'requested')
+            self.visible = format_event(self.id, tag_event.kind, {'id': tag.id, 'tagRequest': tag.to_dict()}, dumps)
+        self.removed = format_event(self.id, 'removed', {'id': tag_event.tag_request_id}, dumps)
+
+    def message_for(self, user_id, role):
+        if self.current is None:
+            return None
+        if visible_to(self.current, user_id, role):
+            return self.visible
+        # They may hold it from before; tell them to drop it
+        if any(visible_to(state, user_id, role) for state in self.earlier):
+            return self.removed
+        return None
+
+
+def render_events(tag_events, dumps):
+    tags = TagRequestRepository.get_tag_requests_by_ids(
+        {e.tag_request_id for e in tag_events if e.kind != 'deleted'}
+    )
+    by_id = {tag.id: tag for tag in tags}
+    return [RenderedEvent(e, by_id.get(e.tag_request_id), dumps) for e in tag_events]
+
+
+class Subscription:
+    def __init__(self, user_id, role):
+        self.user_id = user_id
+        self.role = role
+        self.queue = queue.Queue(QUEUE_SIZE)
+        # Set when the client fell too far behind; its stream ends and the
+        # browser reconnects, replaying from its Last-Event-ID
+        self.overflowed = False
+
+
+class TagEventBus:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = set()
+        self._wake = threading.Event()
+        # Every event id up to _floor has been delivered; ids above it in _seen too
+        self._floor = None
+        self._seen = set()
+        self._gap_since = None
+        self._pruned_at = None
+
+    def subscribe(self, user_id, role, max_streams):
+        """Register a stream, or return None when the process already has max_streams open"""
+        with self._lock:
+            if len(self._subscriptions) >= max_streams:
+                return None
+            if self._floor is None:
+                # Start from the newest event; older ones are only replayed on request
+                self._floor = TagRequestRepository.get_event_id_range()[1] or 0
+            subscription = Subscription(user_id, role)
+            self._subscriptions.add(subscription)
+        self._wake.set()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def wake(self):
+        self._wake.set()
+
+    def replay(self, after_id, user_id, role, dumps):
+        """
+        Messages for events after `after_id` (a client's Last-Event-ID), or
+        None when they are no longer all stored and the client must refetch.
+        """
+        oldest, newest = TagRequestRepository.get_event_id_range()
+        if newest is None or newest <= after_id:
+            return []
+        if oldest > after_id + 1:
+            return None  # some of them were pruned
+        tag_events = TagRequestRepository.get_events_after(after_id, limit=REPLAY_LIMIT + 1)
+        if len(tag_events) > REPLAY_LIMIT:
+            return None
+        rendered = render_events(tag_events, dumps)
+        return [(r.id, message) for r in rendered if (message := r.message_for(user_id, role))]
+
+    def poll_once(self, app):
+        """Deliver events committed since the last poll to the open streams"""
+        with self._lock:
+            if not self._subscriptions:
+                # Nobody listening: forget the position, the next subscriber sets it
+                self._floor = None
+                self._seen.clear()
+                self._gap_since = None
+                return 0
+            floor = self._floor
+
+        with app.app_context():
+            tag_events = [e for e in TagRequestRepository.get_events_after(floor) if e.id not in self._seen]
+            rendered = render_events(tag_events, app.json.dumps) if tag_events else []
+            self._prune(app)
+
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for r in rendered:
+            self._seen.add(r.id)
+            for subscription in subscriptions:
+                message = r.message_for(subscription.user_id, subscription.role)
+                if message is None or subscription.overflowed:
+                    continue
+                try:
+                    subscription.queue.put_nowait((r.id, message))
+                except queue.Full:
+                    subscription.overflowed = True
+        with self._lock:
+            if self._floor is not None:
+                self._advance_floor()
+        return len(rendered)
+
+    def _advance_floor(self):
+        while True:
+            while self._floor + 1 in self._seen:
+                self._floor += 1
+                self._seen.remove(self._floor)
+            if not self._seen:
+                self._gap_since = None
+                return
+            now = time.monotonic()
+            if self._gap_since is None:
+                self._gap_since = now
+            if now - self._gap_since < GAP_TIMEOUT:
+                return
+            # Nothing committed under the missing id in time: it was rolled back
+            self._floor = min(self._seen) - 1
+            self._gap_since = None
+
+    def _prune(self, app):
+        now = time.monotonic()
+        if self._pruned_at is not None and now - self._pruned_at < PRUNE_INTERVAL:
+            return
+        self._pruned_at = now
+        hours = app.config.get('SSE_EVENT_RETENTION_HOURS', 24)
+        TagRequestRepository.prune_events(datetime.utcnow() - timedelta(hours=hours))
+
+    def run(self, app):
+        interval = app.config.get('SSE_POLL_INTERVAL', 1.0)
+        while True:
+            try:
+                self.poll_once(app)
+            except Exception as e:
+                logger.error(f"Tag event poller error: {e}", exc_info=True)
+            with self._lock:
+                idle = not self._subscriptions
+            # With no streams open there is nothing to poll for until one subscribes
+            self._wake.wait(None if idle else interval)
+            self._wake.clear()
+
+
+tag_event_bus = TagEventBus()
+
+
+@event.listens_for(db.session, 'after_commit')
+def wake_on_commit(session):
+    if session.info.pop('tag_events_written', False):
+        tag_event_bus.wake()
+
+
+@event.listens_for(db.session, 'after_soft_rollback')
+def forget_on_rollback(session, previous_transaction):
+    session.info.pop('tag_events_written', None)
+
+
+def event_stream(subscription, backlog, heartbeat, max_seconds, retry_ms=3000):
+    """
+    Generator of SSE text for one client: the replayed backlog, then live
+    events until max_seconds pass, the client disconnects or falls behind.
+    """
+    try:
+        yield f"retry: {retry_ms}\n\n"
+        if backlog is None:
+            yield "event: reset\ndata: {}\n\n"
+            backlog = []
+        replayed = set()
+        for event_id, message in backlog:
+            replayed.add(event_id)
+            yield message
+        deadline = time.monotonic() + max_seconds
+        while not subscription.overflowed:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                event_id, message = subscription.queue.get(timeout=min(heartbeat, remaining))
+            except queue.Empty:
+                yield ": keepalive\n\n"
+                continue
+            if event_id not in replayed:
+                yield message
+    finally:
+        tag_event_bus.unsubscribe(subscription)
+
+
+def start_tag_event_poller(app):
+    thread = threading.Thread(target=tag_event_bus.run, args=(app,), name='tag-event-poller', daemon=True)
+    thread.start()
+    return thread
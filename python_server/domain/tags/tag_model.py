@@ -1,9 +1,30 @@
 from db_config import db
 from datetime import datetime
+from sqlalchemy import text
 from sqlalchemy.orm import relationship
+from fieldsets import sparse_dict
 
 class TagRequest(db.Model):
     __tablename__ = 'tag_requests'
+    __table_args__ = (
+        # Keyset pagination orders and seeks on (date, id)
+        db.Index('ix_tag_requests_date_id', 'date', 'id'),
+        # New docent listings and the duplicate check in create_tag_request
+        db.Index('ix_tag_requests_new_docent_date_slot', 'new_docent_id', 'date', 'time_slot'),
+        # Tags a seasoned docent has filled, and the user-delete reference check
+        db.Index('ix_tag_requests_seasoned_docent_date', 'seasoned_docent_id', 'date'),
+        # Calendar counts: GROUP BY (date, time_slot, status) over a date window,
+        # answered from the index alone
+        db.Index('ix_tag_requests_date_slot_status', 'date', 'time_slot', 'status'),
+        # Delta sync: rows changed since a client's last fetch
+        db.Index('ix_tag_requests_updated_at', 'updated_at'),
+        # Open requests on the seasoned docent board; only a small slice of the table
+        db.Index(
+            'ix_tag_requests_open_date', 'date', 'id',
+            postgresql_where=text("status = 'requested'"),
+            sqlite_where=text("status = 'requested'")
+        ),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     new_docent_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -19,19 +40,51 @@ class TagRequest(db.Model):
     new_docent = relationship('User', foreign_keys=[new_docent_id], back_populates='new_docent_tag_requests')
     seasoned_docent = relationship('User', foreign_keys=[seasoned_docent_id], back_populates='seasoned_docent_tag_requests')
     
-    def to_dict(self):
+    # API field name -> attribute, for ?fields= sparse fieldsets (see fieldsets.py)
+    API_FIELDS = {
+        'id': 'id',
+        'newDocentId': 'new_docent_id',
+        'seasonedDocentId': 'seasoned_docent_id',
+        'date': 'date',
+        'timeSlot': 'time_slot',
+        'status': 'status',
+        'notes': 'notes',
+        'createdAt': 'created_at',
+        'updatedAt': 'updated_at'
+    }
+    API_RELATIONSHIPS = {
+        'newDocent': 'new_docent',
+        'seasonedDocent': 'seasoned_docent'
+    }
+    
+    def to_dict(self, embed_users=True, fields=None):
+        # Only the selected fields are read when `fields` is given, since
+        # the others may not have been loaded
+        if fields is not None:
+            result = sparse_dict(self, fields)
+            if embed_users:
+                for name, attr in self.API_RELATIONSHIPS.items():
+                    docent = getattr(self, attr) if name in fields else None
+                    if docent:
+                        result[name] = docent.to_dict()
+            return result
+        
+        # Dates are left as date/datetime; the app's JSON provider writes them as ISO 8601
         result = {
             'id': self.id,
             'newDocentId': self.new_docent_id,
             'seasonedDocentId': self.seasoned_docent_id,
-            'date': self.date.isoformat(),
+            'date': self.date,
             'timeSlot': self.time_slot,
             'status': self.status,
             'notes': self.notes,
-            'createdAt': self.created_at.isoformat(),
-            'updatedAt': self.updated_at.isoformat()
+            'createdAt': self.created_at,
+            'updatedAt': self.updated_at
         }
         
+        if not embed_users:
+            return result
+        
         # Include the related users
         if self.new_docent:
             result['newDocent'] = self.new_docent.to_dict()
@@ -39,4 +92,51 @@ class TagRequest(db.Model):
         if self.seasoned_docent:
             result['seasonedDocent'] = self.seasoned_docent.to_dict()
             
-        return result
\ No newline at end of file
+        return result
+
+
+class TagRequestTombstone(db.Model):
+    """
+    The state a tag request left, so delta sync (?since=) can tell the
+    clients that could see it to drop it. Written when a tag request is
+    deleted or one of SCOPE_COLUMNS changes (tag_repository.py); the columns
+    hold the values from before, so the visibility scopes apply to them as to
+    TagRequest. Rows older than SYNC_TOMBSTONE_DAYS are pruned.
+    """
+    __tablename__ = 'tag_request_tombstones'
+
+    # The columns the visibility scopes and date windows read
+    SCOPE_COLUMNS = ('new_docent_id', 'seasoned_docent_id', 'status', 'date')
+
+    id = db.Column(db.Integer, primary_key=True)
+    # Not a foreign key, the row may be gone
+    tag_request_id = db.Column(db.Integer, nullable=False)
+    # NULL on tombstones written before the state was kept: reported to everyone
+    new_docent_id = db.Column(db.Integer, nullable=True)
+    seasoned_docent_id = db.Column(db.Integer, nullable=True)
+    status = db.Column(db.String(20), nullable=True)
+    date = db.Column(db.Date, nullable=True)
+    left_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+
+class TagRequestEvent(db.Model):
+    """
+    One change to a tag request, for the /api/tag-requests/stream feed
+    (domain/tags/tag_events.py). Written in the same transaction as the change.
+    The docent ids and status are the row's state after the change (before it,
+    for deletes), so streams can be scoped without loading the tag request;
+    the previous_ columns hold the state before the change (NULL for creates),
+    so a stream can tell whether the row just left the caller's view.
+    """
+    __tablename__ = 'tag_request_events'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    tag_request_id = db.Column(db.Integer, nullable=False)
+    kind = db.Column(db.String(20), nullable=False)  # created, claimed, updated, deleted
+    new_docent_id = db.Column(db.Integer, nullable=False)
+    seasoned_docent_id = db.Column(db.Integer, nullable=True)
+    status = db.Column(db.String(20), nullable=False)
+    previous_new_docent_id = db.Column(db.Integer, nullable=True)
+    previous_seasoned_docent_id = db.Column(db.Integer, nullable=True)
+    previous_status = db.Column(db.String(20), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
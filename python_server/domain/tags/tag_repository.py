@@ -1,25 +1,288 @@
 from db_config import db
-from domain.tags.tag_model import TagRequest
-from sqlalchemy import or_
+from domain.tags.tag_model import TagRequest, TagRequestEvent, TagRequestTombstone
+from datetime import datetime
+from sqlalchemy import and_, delete, event, false, func, inspect, not_, or_, select, update
+from fieldsets import load_options
 
 class TagRequestRepository:
     @staticmethod
-    def get_all_tag_requests():
-        return TagRequest.query.all()
+    def _query_with_docents(fields=None):
+        # to_dict() embeds both docents, so load them up front. selectinload
+        # issues one IN query per relationship with de-duplicated user ids,
+        # keeping the query count constant no matter how many rows match.
+        # With a sparse fieldset only the selected columns and docents are
+        # loaded; date is kept for the keyset pagination cursor.
+        return TagRequest.query.options(*load_options(TagRequest, fields, always=('date',)))
 
     @staticmethod
-    def get_tag_requests_by_user(user_id):
-        return TagRequest.query.filter_by(new_docent_id=user_id).all()
+    def _filter_by_date(query, start=None, end=None):
+        return query.filter(*TagRequestRepository._date_window(start, end))
 
     @staticmethod
-    def get_tag_requests_by_seasoned_docent(user_id):
-        return TagRequest.query.filter(
-            or_(
-                TagRequest.status == 'requested',
-                TagRequest.seasoned_docent_id == user_id
+    def _date_window(start=None, end=None, model=TagRequest):
+        # Either bound may be omitted; both are inclusive
+        conditions = []
+        if start:
+            conditions.append(model.date >= start)
+        if end:
+            conditions.append(model.date <= end)
+        return conditions
+
+    # Visibility scopes, as SQL conditions, shared by the listings and delta
+    # sync. `model` is TagRequest or TagRequestTombstone (the state a row left).
+    @staticmethod
+    def requested_by(user_id, model=TagRequest):
+        return model.new_docent_id == user_id
+
+    @staticmethod
+    def open_or_filled_by(user_id, model=TagRequest):
+        return or_(
+            model.status == 'requested',
+            model.seasoned_docent_id == user_id
+        )
+
+    @staticmethod
+    def _fetch(query, page=None):
+        # Without a page request the whole result is returned as a list;
+        # with one, a Page keyed on (date, id) is returned instead
+        if page is None:
+            return query.all()
+        return page.fetch(query, (TagRequest.date, TagRequest.id))
+
+    @staticmethod
+    def get_all_tag_requests(start=None, end=None, page=None, fields=None):
+        query = TagRequestRepository._query_with_docents(fields)
+        query = TagRequestRepository._filter_by_date(query, start, end)
+        return TagRequestRepository._fetch(query, page)
+
+    @staticmethod
+    def get_tag_requests_by_user(user_id, start=None, end=None, page=None, fields=None):
+        query = TagRequestRepository._query_with_docents(fields).filter(TagRequestRepository.requested_by(user_id))
+        query = TagRequestRepository._filter_by_date(query, start, end)
+        return TagRequestRepository._fetch(query, page)
+
+    @staticmethod
+    def get_tag_requests_by_seasoned_docent(user_id, start=None, end=None, page=None, fields=None):
+        query = TagRequestRepository._query_with_docents(fields).filter(
+            TagRequestRepository.open_or_filled_by(user_id)
+        )
+        query = TagRequestRepository._filter_by_date(query, start, end)
+        return TagRequestRepository._fetch(query, page)
+
+    @staticmethod
+    def get_tag_requests_filled_by(user_id, page=None, fields=None, start=None, end=None):
+        query = TagRequestRepository._query_with_docents(fields).filter_by(seasoned_docent_id=user_id)
+        query = TagRequestRepository._filter_by_date(query, start, end)
+        return TagRequestRepository._fetch(query, page)
+
+    @staticmethod
+    def get_open_tag_requests():
+        # Every open request, for building the open requests board (open_board.py)
+        return TagRequestRepository._query_with_docents().filter(TagRequest.status == 'requested').all()
+
+    @staticmethod
+    def count_by_day_and_slot(scope=None, start=None, end=None):
+        """
+        (date, time_slot, status, count) for every combination with at least
+        one tag request visible through `scope` in the window, in one GROUP BY.
+        """
+        conditions = TagRequestRepository._date_window(start, end)
+        if scope is not None:
+            conditions.insert(0, scope)
+        status = func.coalesce(TagRequest.status, 'requested')
+        query = (
+            select(TagRequest.date, TagRequest.time_slot, status, func.count())
+            .where(*conditions)
+            .group_by(TagRequest.date, TagRequest.time_slot, status)
+            .order_by(TagRequest.date, TagRequest.time_slot)
+        )
+        return db.session.execute(query).all()
+
+    @staticmethod
+    def get_changes_since(since, scope=None, start=None, end=None, fields=None):
+        """
+        Delta sync: tag requests updated after `since` that are visible
+        through `scope` and the date window, and the ids to drop from a
+        client's copy. `scope(model)` builds the visibility condition for
+        TagRequest or TagRequestTombstone, None (or no scope) for everything.
+        Dropped are rows that left a state visible to the caller since then
+        (per their tombstones) and are now deleted or no longer visible,
+        e.g. an open request another docent filled. With
+        `since` None every visible row is returned and nothing is dropped.
+        Returns (rows, removed_ids).
+        """
+        def visible(model):
+            conditions = TagRequestRepository._date_window(start, end, model)
+            condition = scope(model) if scope is not None else None
+            if condition is not None:
+                conditions.insert(0, condition)
+            return conditions
+
+        conditions = visible(TagRequest)
+        query = TagRequestRepository._query_with_docents(fields).filter(*conditions)
+        if since is None:
+            return query.order_by(TagRequest.updated_at, TagRequest.id).all(), []
+
+        changed = TagRequest.updated_at > since
+        rows = query.filter(changed).order_by(TagRequest.updated_at, TagRequest.id).all()
+
+        left = [TagRequestTombstone.left_at > since]
+        was_visible = visible(TagRequestTombstone)
+        if was_visible:
+            left.append(or_(TagRequestTombstone.new_docent_id.is_(None), and_(*was_visible)))
+        gone = TagRequest.id.is_(None)
+        if conditions:
+            # coalesce: a NULL comparison means "not visible", not "unknown"
+            gone = or_(gone, not_(func.coalesce(and_(*conditions), false())))
+        removed = list(db.session.scalars(
+            select(TagRequestTombstone.tag_request_id)
+            .outerjoin(TagRequest, TagRequest.id == TagRequestTombstone.tag_request_id)
+            .where(*left, gone)
+            .distinct()
+            .order_by(TagRequestTombstone.tag_request_id)
+        ))
+        return rows, removed
+
+    @staticmethod
+    def delete_tag_request(tag, prune_before=None):
+        """
+        Delete `tag`, which leaves a tombstone for delta sync (see
+        record_tombstones); tombstones older than `prune_before` are removed
+        in the same go. The caller commits.
+        """
+        TagRequestRepository.record_event('deleted', tag)
+        db.session.delete(tag)
+        if prune_before is not None:
+            db.session.execute(
+                delete(TagRequestTombstone)
+                .where(TagRequestTombstone.left_at < prune_before)
+                .execution_options(synchronize_session=False)
             )
-        ).all()
 
     @staticmethod
-    def filter_tag_requests_by_date(start, end):
-        return TagRequest.query.filter(TagRequest.date.between(start, end)).all()
\ No newline at end of file
+    def record_event(kind, tag):
+        """
+        Add `kind` happening to `tag` to the change feed; the caller commits.
+        Call it after changing `tag` and before flushing, so the values it
+        had before the change are still known.
+        """
+        if kind == 'created':
+            previous = (None, None, None)
+        elif kind == 'claimed':
+            # The claim's UPDATE only matches open requests, and an open
+            # request is seen the same whichever seasoned docent it names
+            previous = (tag.new_docent_id, None, 'requested')
+        else:
+            previous = (
+                TagRequestRepository._value_before(tag, 'new_docent_id'),
+                TagRequestRepository._value_before(tag, 'seasoned_docent_id'),
+                TagRequestRepository._value_before(tag, 'status') or 'requested'
+            )
+        if tag.id is None:
+            db.session.flush()
+        db.session.add(TagRequestEvent(
+            tag_request_id=tag.id,
+            kind=kind,
+            new_docent_id=tag.new_docent_id,
+            seasoned_docent_id=tag.seasoned_docent_id,
+            status=tag.status or 'requested',
+            previous_new_docent_id=previous[0],
+            previous_seasoned_docent_id=previous[1],
+            previous_status=previous[2]
+        ))
+        # Lets the event bus in this process deliver it as soon as it commits
+        db.session.info['tag_events_written'] = True
+        # and the open requests board take the change in without a rebuild
+        db.session.info.setdefault('written_tags', {})[tag.id] = tag
+
+    @staticmethod
+    def _value_before(tag, key):
+        # The loaded value of `key`, before any change not yet flushed
+        before = inspect(tag).attrs[key].history.non_added()
+        return before[0] if before else getattr(tag, key)
+
+    @staticmethod
+    def get_events_after(event_id, limit=None):
+        query = select(TagRequestEvent).where(TagRequestEvent.id > event_id).order_by(TagRequestEvent.id)
+        if limit is not None:
+            query = query.limit(limit)
+        return db.session.scalars(query).all()
+
+    @staticmethod
+    def get_event_id_range():
+        """(oldest, newest) event id still stored, (None, None) when there are none"""
+        return tuple(db.session.execute(select(func.min(TagRequestEvent.id), func.max(TagRequestEvent.id))).one())
+
+    @staticmethod
+    def prune_events(before):
+        db.session.execute(
+            delete(TagRequestEvent)
+            .where(TagRequestEvent.created_at < before)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+
+    @staticmethod
+    def get_tag_requests_by_ids(ids):
+        if not ids:
+            return []
+        return TagRequestRepository._query_with_docents().filter(TagRequest.id.in_(ids)).all()
+
+    @staticmethod
+    def claim_tag_request(tag_id, seasoned_docent_id, today):
+        """
+        Fill an open tag request with a single conditional UPDATE.
+        Returns True only for the caller whose UPDATE matched the row, so two
+        docents accepting at the same moment cannot both win. The caller
+        commits, so follow-up writes (the confirmation email) share the
+        transaction.
+        """
+        claimed = db.session.execute(
+            update(TagRequest)
+            .where(
+                TagRequest.id == tag_id,
+                TagRequest.status == 'requested',
+                TagRequest.date >= today
+            )
+            .values(
+                status='filled',
+                seasoned_docent_id=seasoned_docent_id,
+                updated_at=datetime.utcnow()
+            )
+            .returning(TagRequest.new_docent_id, TagRequest.date)
+            .execution_options(synchronize_session=False)
+        ).first()
+        if claimed is None:
+            return False
+        # The statement bypasses the flush, so leave the open state's
+        # tombstone here. Every seasoned docent sees an open request, so the
+        # seasoned docent it named (if any) doesn't matter.
+        db.session.add(TagRequestTombstone(
+            tag_request_id=tag_id, new_docent_id=claimed.new_docent_id,
+            seasoned_docent_id=None, status='requested', date=claimed.date
+        ))
+        return True
+
+
+@event.listens_for(db.session, 'before_flush')
+def record_tombstones(session, flush_context, instances):
+    """
+    Leave a tombstone with the state of every tag request being deleted or
+    changing a column the visibility scopes read, loaded in one query from
+    the rows as they stand before the flush. Bulk statements bypass this and
+    leave their own (claim_tag_request).
+    """
+    ids = {tag.id for tag in session.deleted if isinstance(tag, TagRequest)}
+    ids.update(
+        tag.id for tag in session.dirty
+        if isinstance(tag, TagRequest) and tag.id is not None and any(
+            inspect(tag).attrs[key].history.has_changes() for key in TagRequestTombstone.SCOPE_COLUMNS
+        )
+    )
+    if not ids:
+        return
+    columns = [getattr(TagRequest, key) for key in TagRequestTombstone.SCOPE_COLUMNS]
+    with session.no_autoflush:
+        previous = session.execute(select(TagRequest.id, *columns).where(TagRequest.id.in_(ids))).all()
+    for row in previous:
+        session.add(TagRequestTombstone(tag_request_id=row.id, **dict(zip(TagRequestTombstone.SCOPE_COLUMNS, row[1:]))))
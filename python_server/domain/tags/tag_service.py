@@ -1,26 +1,150 @@
 # python_server/domain/tags/service.py
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from domain.tags.tag_model import TagRequest
 from domain.tags.tag_repository import TagRequestRepository
+from pagination import Page
+
+class SyncWindowExpired(ValueError):
+    """`since` predates the tombstones still kept; the client must refetch everything"""
+
+# Column order of the calendar count matrix; other values found are appended
+CALENDAR_SLOTS = ['AM', 'PM']
+CALENDAR_STATUSES = ['requested', 'filled']
+MAX_CALENDAR_DAYS = 366
 
 class TagRequestService:
     @staticmethod
-    def get_tag_requests(user, start_date=None, end_date=None):
-        # Filter by date range if provided
-        if start_date and end_date:
-            start = datetime.fromisoformat(start_date.split('T')[0])
-            end = datetime.fromisoformat(end_date.split('T')[0])
-            tag_requests = TagRequestRepository.filter_tag_requests_by_date(start, end)
-        else:
-            tag_requests = []
+    def parse_date(value):
+        # Clients send full ISO timestamps; only the calendar date matters
+        if not value:
+            return None
+        return datetime.fromisoformat(value.split('T')[0]).date()
+
+    @staticmethod
+    def get_tag_requests(user, start_date=None, end_date=None, page=None, fields=None):
+        # The date window is applied in SQL together with the role scope
+        start = TagRequestService.parse_date(start_date)
+        end = TagRequestService.parse_date(end_date)
 
         # Coordinators can see all tag requests
         if user.role == 'coordinator':
-            tag_requests = TagRequestRepository.get_all_tag_requests()
+            tag_requests = TagRequestRepository.get_all_tag_requests(start, end, page=page, fields=fields)
         # Seasoned docents see their own tags and open requests
         elif user.role == 'seasoned_docent':
-            tag_requests = TagRequestRepository.get_tag_requests_by_seasoned_docent(user.id)
+            tag_requests = TagRequestRepository.get_tag_requests_by_seasoned_docent(user.id, start, end, page=page, fields=fields)
         # New docents only see their own requests
         else:
-            tag_requests = TagRequestRepository.get_tag_requests_by_user(user.id)
+            tag_requests = TagRequestRepository.get_tag_requests_by_user(user.id, start, end, page=page, fields=fields)
+
+        return tag_requests
+
+    @staticmethod
+    def get_seasoned_board(board, user, start_date=None, end_date=None, fields=None):
+        """
+        get_tag_requests for a seasoned docent, already serialized: open
+        requests come from the in-memory `board` (open_board.py), and only
+        the docent's own tags are queried. Ordered by date and id.
+        """
+        start = TagRequestService.parse_date(start_date)
+        end = TagRequestService.parse_date(end_date)
+
+        rows = {}
+        for day, row in board.open_between(start, end):
+            if fields is not None:
+                row = {name: value for name, value in row.items() if name in fields}
+            rows[row['id']] = (day, row)
+        for tag in TagRequestRepository.get_tag_requests_filled_by(user.id, fields=fields, start=start, end=end):
+            rows.setdefault(tag.id, (tag.date, tag.to_dict(fields=fields)))
+        return [row for _, row in sorted(rows.values(), key=lambda item: (item[0], item[1]['id']))]
+
+    @staticmethod
+    def parse_since(value):
+        # Naive timestamps are UTC, like updated_at; an empty value means "from the start"
+        if not value:
+            return None
+        try:
+            since = datetime.fromisoformat(value)
+        except ValueError:
+            raise ValueError("since must be an ISO 8601 timestamp")
+        if since.tzinfo is not None:
+            since = since.astimezone(timezone.utc).replace(tzinfo=None)
+        return since
+
+    @staticmethod
+    def get_changes(user, since, start_date=None, end_date=None, fields=None,
+                    retention=timedelta(days=30), overlap=timedelta(seconds=5)):
+        """
+        Delta sync for get_tag_requests' view of the data. Returns
+        (rows, removed_ids, next_since): rows to upsert, ids to drop, and the
+        value to send as `since` next time.
+
+        The next cursor trails the clock by `overlap`, because updated_at is
+        stamped before the writing transaction commits. Rows changed within
+        that window are sent again on the next sync, which is harmless for
+        upserts and keeps late commits from being skipped.
+        """
+        now = datetime.utcnow()
+        start = TagRequestService.parse_date(start_date)
+        end = TagRequestService.parse_date(end_date)
+        since = TagRequestService.parse_since(since)
+        if since is not None and since < now - retention:
+            raise SyncWindowExpired("since is older than the deletion history kept; fetch the full list again")
+
+        scope = partial(TagRequestService.visibility_scope, user)
+        rows, removed = TagRequestRepository.get_changes_since(since, scope, start, end, fields)
+        next_since = now - overlap if since is None else max(since, now - overlap)
+        return rows, removed, next_since
+
+    @staticmethod
+    def visibility_scope(user, model=TagRequest):
+        # The SQL condition matching get_tag_requests' role rules; None for everything
+        if user.role == 'coordinator':
+            return None
+        if user.role == 'seasoned_docent':
+            return TagRequestRepository.open_or_filled_by(user.id, model)
+        return TagRequestRepository.requested_by(user.id, model)
 
-        return tag_requests
\ No newline at end of file
+    @staticmethod
+    def get_calendar_counts(user, start_date, end_date):
+        """
+        Tag request counts per day, slot and status over a date window, within
+        the user's view. Only days with tag requests are listed:
+        {"days": {"2025-07-04": {"AM": [requested, filled], "PM": [...]}}, ...}
+        with the cell order given by "slots" and "statuses".
+        """
+        start = TagRequestService.parse_date(start_date)
+        end = TagRequestService.parse_date(end_date)
+        if start is None or end is None:
+            raise ValueError("startDate and endDate are required")
+        if end < start:
+            raise ValueError("endDate must not be before startDate")
+        if (end - start).days >= MAX_CALENDAR_DAYS:
+            raise ValueError(f"The date window is limited to {MAX_CALENDAR_DAYS} days")
+
+        rows = TagRequestRepository.count_by_day_and_slot(TagRequestService.visibility_scope(user), start, end)
+
+        slots = CALENDAR_SLOTS + sorted({row[1] for row in rows} - set(CALENDAR_SLOTS))
+        statuses = CALENDAR_STATUSES + sorted({row[2] for row in rows} - set(CALENDAR_STATUSES))
+        column = {status: i for i, status in enumerate(statuses)}
+        days = {}
+        for day, slot, status, count in rows:
+            cells = days.setdefault(day.isoformat(), {s: [0] * len(statuses) for s in slots})
+            cells[slot][column[status]] = count
+
+        return {
+            'startDate': start,
+            'endDate': end,
+            'slots': slots,
+            'statuses': statuses,
+            'days': days
+        }
+
+    @staticmethod
+    def get_my_tag_requests(user, page=None, fields=None):
+        # New docents see the requests they made, seasoned docents the tags they filled
+        if user.role == 'new_docent':
+            return TagRequestRepository.get_tag_requests_by_user(user.id, page=page, fields=fields)
+        if user.role == 'seasoned_docent':
+            return TagRequestRepository.get_tag_requests_filled_by(user.id, page=page, fields=fields)
+        return [] if page is None else Page([], None)
@@ -0,0 +1,86 @@
+"""
+PBKDF2 password hashing, optionally run in a bounded process pool.
+
+Hashing is deliberately CPU-heavy. Running it in worker processes keeps a
+burst of logins from pinning the web workers' CPU time; a semaphore caps the
+number of jobs in flight so a flood of logins queues here instead of growing
+the pool's backlog without bound. Until configure() is called with workers,
+hashing runs inline (as in tests and scripts).
+"""
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from passlib.hash import pbkdf2_sha256
+
+DEFAULT_ROUNDS = pbkdf2_sha256.default_rounds
+# Stored for accounts that must set a password through a reset link.
+# No hash starts with '!', so nothing ever verifies against it.
+UNUSABLE_PASSWORD = '!'
+
+_rounds = DEFAULT_ROUNDS
+_executor = None
+_slots = None
+_lock = threading.Lock()
+
+
+def _hash(password, rounds):
+    return pbkdf2_sha256.using(rounds=rounds).hash(password)
+
+
+def _verify(password, password_hash):
+    return pbkdf2_sha256.verify(password, password_hash)
+
+
+def configure(rounds=None, workers=0, max_pending=None):
+    """
+    Set the PBKDF2 rounds for new hashes and the size of the worker pool.
+    workers=0 hashes inline in the calling thread.
+    """
+    global _rounds, _executor, _slots
+    with _lock:
+        _rounds = rounds or DEFAULT_ROUNDS
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+            _executor = None
+        if workers:
+            # spawn, not fork: the web server is multi-threaded
+            _executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            _slots = threading.BoundedSemaphore(max_pending or workers * 4)
+        else:
+            _slots = None
+
+
+def configure_from_app(app):
+    configure(
+        rounds=app.config.get('PASSWORD_HASH_ROUNDS'),
+        workers=app.config.get('PASSWORD_HASH_WORKERS', 0)
+    )
+
+
+def _run(fn, *args):
+    executor, slots = _executor, _slots
+    if executor is None:
+        return fn(*args)
+    with slots:
+        return executor.submit(fn, *args).result()
+
+
+def hash_password(password):
+    return _run(_hash, password, _rounds)
+
+
+def is_usable(password_hash):
+    return bool(password_hash) and not password_hash.startswith(UNUSABLE_PASSWORD)
+
+
+def verify_password(password, password_hash):
+    if not is_usable(password_hash):
+        return False
+    return _run(_verify, password, password_hash)
+
+
+def needs_rehash(password_hash):
+    """True when the hash was made with different parameters than we use now"""
+    if not is_usable(password_hash):
+        return False
+    return pbkdf2_sha256.using(rounds=_rounds).needs_update(password_hash)
@@ -1,7 +1,8 @@
 from db_config import db
 from datetime import datetime
-from passlib.hash import pbkdf2_sha256
+from domain.users import password_hasher
 from sqlalchemy.orm import relationship
+from fieldsets import sparse_dict
 from enum import Enum
 
 class UserRole(Enum):
@@ -39,12 +40,28 @@ class User(db.Model):
     
     @staticmethod
     def hash_password(password):
-        return pbkdf2_sha256.hash(password)
+        return password_hasher.hash_password(password)
     
     def verify_password(self, password):
-        return pbkdf2_sha256.verify(password, self.password)
+        return password_hasher.verify_password(password, self.password)
+
+    def password_needs_rehash(self):
+        return password_hasher.needs_rehash(self.password)
+    
+    # API field name -> attribute, for ?fields= sparse fieldsets (see fieldsets.py)
+    API_FIELDS = {
+        'id': 'id',
+        'email': 'email',
+        'firstName': 'first_name',
+        'lastName': 'last_name',
+        'phone': 'phone',
+        'role': 'role'
+    }
+    API_RELATIONSHIPS = {}
     
-    def to_dict(self):
+    def to_dict(self, fields=None):
+        if fields is not None:
+            return sparse_dict(self, fields)
         return {
             'id': self.id,
             'email': self.email,
@@ -1,7 +1,14 @@
 from db_config import db
 from domain.users.user_model import User, PasswordResetToken
+from domain.users.password_hasher import UNUSABLE_PASSWORD
+from fieldsets import load_options
+from datetime import datetime
+from sqlalchemy import func, insert, select
 import secrets
 
+# Rows per multi-row INSERT, and emails per IN (...) lookup
+BULK_BATCH_SIZE = 500
+
 class UserRepository:
     @staticmethod
     def get_user_by_email(email):
@@ -12,6 +19,13 @@ class UserRepository:
     def get_user_by_id(user_id):
         return User.query.get(user_id)
 
+    @staticmethod
+    def get_all_users(page=None, fields=None):
+        query = User.query.options(*load_options(User, fields))
+        if page is None:
+            return query.all()
+        return page.fetch(query, (User.id,))
+
     @staticmethod
     def create_user(email, password, first_name, last_name, phone, role):
         new_user = User(
@@ -42,7 +56,6 @@ class UserRepository:
             expires_at=expires_at
         )
         db.session.add(reset_token)
-        db.session.commit()
         return reset_token
 
     @staticmethod
@@ -62,4 +75,32 @@ class UserRepository:
         )
         db.session.add(new_user)
         db.session.commit()
-        return new_user
\ No newline at end of file
+        return new_user
+
+    @staticmethod
+    def get_existing_emails(emails):
+        """Return the subset of `emails` (lowercase) that already belong to a user, ignoring case"""
+        emails = list(emails)
+        existing = set()
+        for start in range(0, len(emails), BULK_BATCH_SIZE):
+            chunk = emails[start:start + BULK_BATCH_SIZE]
+            lowered = func.lower(User.email)
+            existing.update(db.session.scalars(select(lowered).where(lowered.in_(chunk))))
+        return existing
+
+    @staticmethod
+    def bulk_create_locked_users(rows):
+        """
+        Insert users with an unusable password in batched multi-row INSERTs,
+        all in one transaction. Each row needs email, first_name, last_name,
+        phone and role. They set a password through the reset flow.
+        """
+        now = datetime.utcnow()
+        values = [
+            {**row, 'password': UNUSABLE_PASSWORD, 'failed_login_attempts': 0, 'created_at': now}
+            for row in rows
+        ]
+        for start in range(0, len(values), BULK_BATCH_SIZE):
+            db.session.execute(insert(User), values[start:start + BULK_BATCH_SIZE])
+        db.session.commit()
+        return len(values)
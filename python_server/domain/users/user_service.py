@@ -1,10 +1,18 @@
 from domain.users.user_repository import UserRepository
 from domain.users.user_model import User, UserRole
-from utils import send_password_reset_email
+from domain.email.email_service import EmailService
+from auth import invalidate_cached_roles
+from db_config import db
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime, timedelta
+from itertools import islice
 import secrets
+import csv
+import io
 import os
 
+CSV_REQUIRED_COLUMNS = ['email', 'firstName', 'lastName', 'role']
+
 class UserService:
     @staticmethod
     def register_user(data):
@@ -48,6 +56,11 @@ class UserService:
         # Reset failed login attempts on successful login
         user.failed_login_attempts = 0
         user.account_locked_until = None
+
+        # Upgrade hashes made with older parameters while we have the plaintext
+        if user.password_needs_rehash():
+            user.password = User.hash_password(data['password'])
+
         UserRepository.update_user(user)
         
         return user.to_dict(), 200
@@ -68,7 +81,9 @@ class UserService:
             UserRepository.create_password_reset_token(user.id, token, expires_at)
             reset_link = f"{os.getenv('DOMAIN')}/reset-password?token={token}"
 
-            send_password_reset_email(user, reset_link)
+            # The token and its email commit together; the outbox worker sends it
+            EmailService.queue_password_reset(user, reset_link, expires_at)
+            UserRepository.update_user(user)
 
     @staticmethod
     def reset_password(token, new_password):
@@ -89,17 +104,26 @@ class UserService:
         return {"success": True}
 
     @staticmethod
-    def create_user(data):
+    def validate_new_user(data):
+        """Return an error message for a coordinator-created user, or None"""
         # Validate required fields
         required_fields = ['email', 'firstName', 'lastName', 'role']
         for field in required_fields:
             if field not in data or not data[field]:
-                return {"error": f"Missing required field: {field}"}, 400
+                return f"Missing required field: {field}"
 
         # Validate role
         if not UserRole.is_valid(data['role']):
             valid_roles = ', '.join(UserRole.get_valid_roles())
-            return {"error": f"Invalid role '{data['role']}'. Valid roles are: {valid_roles}"}, 400
+            return f"Invalid role '{data['role']}'. Valid roles are: {valid_roles}"
+
+        return None
+
+    @staticmethod
+    def create_user(data):
+        error = UserService.validate_new_user(data)
+        if error:
+            return {"error": error}, 400
 
         # Check if user already exists
         existing_user = UserRepository.get_user_by_email(data['email'])
@@ -116,6 +140,131 @@ class UserService:
         
         return new_user.to_dict(), 201
 
+    @staticmethod
+    def bulk_create_users(rows):
+        """
+        Import a roster in one transaction. Returns
+        {"success": n, "errors": [{line, email, error}]}, where line is the
+        1-based row number.
+        """
+        success, errors = UserService._import_rows([(i + 1, data) for i, data in enumerate(rows)])
+        return {"success": success, "errors": errors}
+
+    @staticmethod
+    def _import_rows(rows):
+        """
+        Validate and insert (line, data) pairs in one transaction. Rows are
+        validated up front, existing emails are looked up in one query and
+        the valid rows are inserted in batches. Returns (created, errors).
+        """
+        errors = []
+        valid = []
+        for line, data in rows:
+            data, error = UserService._normalize_row(data)
+            if not error:
+                error = UserService.validate_new_user(data)
+            if error:
+                errors.append({"line": line, "email": (data or {}).get('email') or 'unknown', "error": error})
+            else:
+                valid.append((line, data))
+
+        # Emails are compared case-insensitively, but stored as given
+        existing = UserRepository.get_existing_emails({data['email'].lower() for _, data in valid})
+        new_users = []
+        for line, data in valid:
+            # Earlier rows in the same file count as registered too
+            key = data['email'].lower()
+            if key in existing:
+                errors.append({"line": line, "email": data['email'], "error": f"Email {data['email']} already registered"})
+                continue
+            existing.add(key)
+            new_users.append((line, {
+                'email': data['email'],
+                'first_name': data['firstName'],
+                'last_name': data['lastName'],
+                'phone': data.get('phone') or None,
+                'role': data['role']
+            }))
+
+        if new_users:
+            try:
+                UserRepository.bulk_create_locked_users([user for _, user in new_users])
+            except IntegrityError:
+                # Another import registered one of these emails after the lookup
+                # above; the batch is rolled back as a whole, so every row fails
+                db.session.rollback()
+                errors.extend(
+                    {"line": line, "email": user['email'], "error": "Not imported: another import added one of this batch's emails, retry this row"}
+                    for line, user in new_users
+                )
+                new_users = []
+
+        errors.sort(key=lambda error: error['line'])
+        return len(new_users), errors
+
+    @staticmethod
+    def _normalize_row(data):
+        """
+        Return (row, error): the roster fields of `data` as stripped strings,
+        or an error message for a row that isn't an object or has a value
+        that isn't text or a number (e.g. a list in a JSON upload).
+        """
+        if not isinstance(data, dict):
+            return None, "Invalid row"
+        row = {}
+        error = None
+        for field in CSV_REQUIRED_COLUMNS + ['phone']:
+            value = data.get(field)
+            if value is None:
+                continue
+            if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+                error = error or f"Invalid value for {field}"
+                continue
+            row[field] = str(value).strip()
+        return row, error
+
+    @staticmethod
+    def open_csv_roster(stream):
+        """
+        Wrap a binary CSV stream in a csv.DictReader. The header row must name
+        the email, firstName, lastName and role columns (phone is optional).
+        Raises ValueError when a required column is missing.
+        """
+        if not isinstance(stream, io.BufferedIOBase):
+            stream = io.BufferedReader(stream)
+        reader = csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+        columns = [column.strip() for column in reader.fieldnames or []]
+        missing = [column for column in CSV_REQUIRED_COLUMNS if column not in columns]
+        if missing:
+            raise ValueError(f"CSV is missing required columns: {', '.join(missing)}")
+        reader.fieldnames = columns
+        return reader
+
+    @staticmethod
+    def import_csv_roster(reader, chunk_size=500):
+        """
+        Import rows from open_csv_roster() a chunk at a time, committing each
+        chunk before reading the next, so memory stays bounded by chunk_size.
+        Yields a progress dict per chunk and then a summary. Errors carry the
+        file's line number (the header is line 1).
+        """
+        processed = created = failed = 0
+        while True:
+            # line_num is read after each row is parsed, so quoted newlines are counted
+            chunk = [
+                (reader.line_num, {key: value.strip() for key, value in row.items() if key and value is not None})
+                for row in islice(reader, chunk_size)
+            ]
+            if not chunk:
+                break
+            chunk_created, chunk_errors = UserService._import_rows(chunk)
+            processed += len(chunk)
+            created += chunk_created
+            failed += len(chunk_errors)
+            yield {"processed": processed, "success": chunk_created, "errors": chunk_errors}
+
+        yield {"done": True, "processed": processed, "success": created, "failed": failed}
+
     @staticmethod
     def update_user_details(user_id, data):
         user = UserRepository.get_user_by_id(user_id)
@@ -138,11 +287,15 @@ class UserService:
         if 'phone' in data:
             user.phone = data['phone']
             
+        role_changed = 'role' in data and data['role'] != user.role
         if 'role' in data:
             user.role = data['role']
             
         if 'password' in data and data['password']:
             user.password = User.hash_password(data['password'])
         
+        if role_changed:
+            # Sessions holding the old role must re-read it; stamped in the same commit
+            invalidate_cached_roles()
         UserRepository.update_user(user) # This just commits the session
         return user.to_dict(), 200
\ No newline at end of file
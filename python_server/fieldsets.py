@@ -0,0 +1,59 @@
+"""
+Sparse fieldsets for list endpoints.
+
+`?fields=date,timeSlot,status` limits each row to the named API fields (the
+id is always included). Models declare which API field maps to which column
+in API_FIELDS and which embedded object maps to which relationship in
+API_RELATIONSHIPS, and the repositories load only the selected columns and
+relationships, so unrequested data is never fetched, hydrated or encoded.
+"""
+from sqlalchemy.orm import load_only, selectinload
+
+
+def parse_fields(args, model):
+    """
+    Return the field names requested in `args` as a frozenset, or None when
+    the caller didn't ask for a sparse fieldset.
+    Raises ValueError for an empty list or a field the model doesn't expose.
+    """
+    raw = args.get('fields')
+    if raw is None:
+        return None
+
+    names = {name.strip() for name in raw.split(',') if name.strip()}
+    if not names:
+        raise ValueError("fields must name at least one field")
+    unknown = sorted(names - set(model.API_FIELDS) - set(model.API_RELATIONSHIPS))
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return frozenset(names | {'id'})
+
+
+def selected_relationships(model, fields):
+    """Relationship attribute names to load for `fields` (all of them when None)"""
+    return [attr for name, attr in model.API_RELATIONSHIPS.items() if fields is None or name in fields]
+
+
+def load_options(model, fields, always=()):
+    """
+    Query options loading the columns and relationships `fields` needs.
+    `always` names columns the query itself relies on (e.g. the keyset
+    pagination order) so reading them afterwards doesn't lazy load.
+    """
+    relationships = selected_relationships(model, fields)
+    options = [selectinload(getattr(model, attr)) for attr in relationships]
+    if fields is None:
+        return options
+
+    columns = {model.API_FIELDS[name] for name in fields if name in model.API_FIELDS}
+    columns.update(always)
+    # Many-to-one relationships are loaded through the foreign key on the row
+    for attr in relationships:
+        columns.update(column.key for column in getattr(model, attr).property.local_columns)
+    options.append(load_only(*(getattr(model, column) for column in sorted(columns))))
+    return options
+
+
+def sparse_dict(obj, fields):
+    """The selected column fields of `obj`, in API_FIELDS order"""
+    return {name: getattr(obj, attr) for name, attr in type(obj).API_FIELDS.items() if name in fields}
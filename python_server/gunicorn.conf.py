@@ -0,0 +1,78 @@
+"""
+Gunicorn settings for the production server, driven by environment variables:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+GUNICORN_WORKERS    worker processes (default 2 x CPUs + 1; WEB_CONCURRENCY also works)
+GUNICORN_THREADS    request threads per worker (default 4 + SSE_MAX_STREAMS)
+GUNICORN_PRELOAD    import the app once in the master before forking (default true)
+GUNICORN_KEEPALIVE  seconds to hold idle keep-alive connections (default 75)
+GUNICORN_TIMEOUT    seconds before a silent worker is killed and restarted (default 30)
+GUNICORN_GRACEFUL_TIMEOUT  seconds workers get to finish requests on restart (default 30)
+GUNICORN_MAX_REQUESTS      recycle a worker after this many requests (default 0 = never)
+PORT                port to bind on all interfaces (default 8000, where the EB nginx proxy sends traffic)
+PASSWORD_HASH_WORKERS  hashing processes per worker (default CPUs / workers, at least 1)
+DB_CREATE_SCHEMA    create missing tables in the master before workers start (default true)
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', '8000')}")
+workers = int(os.environ.get('GUNICORN_WORKERS', os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1)))
+# Threads keep a worker responsive while a request waits on the database or SES.
+# Each open /api/tag-requests/stream holds one for its lifetime (mostly asleep),
+# so SSE_MAX_STREAMS threads are added on top of those serving requests.
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4 + int(os.environ.get('SSE_MAX_STREAMS', '8'))))
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() in ('1', 'true', 'yes')
+# Longer than the load balancer's 60s idle timeout, so it never reuses a connection we just closed
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', '75'))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '0'))
+max_requests_jitter = max_requests // 10
+
+accesslog = '-'
+errorlog = '-'
+
+# Every worker drains the outbox (see post_fork), so split the SES send rate between them
+if os.environ.get('EMAIL_OUTBOX_WORKER', 'thread') == 'thread':
+    os.environ.setdefault('EMAIL_SENDERS', str(workers))
+
+# Every worker starts its own password-hash pool; share the CPUs between them
+# so the deployment as a whole hashes on at most one process per CPU
+os.environ.setdefault('PASSWORD_HASH_WORKERS', str(max(multiprocessing.cpu_count() // workers, 1)))
+
+
+def on_starting(server):
+    # Runs once in the master, so tables added by new models (email_outbox,
+    # sessions, ...) exist before any worker writes to them
+    if os.environ.get('DB_CREATE_SCHEMA', 'true').lower() not in ('1', 'true', 'yes'):
+        return
+    from wsgi import app
+    from app import init_schema
+    from db_config import db
+
+    init_schema(app)
+    # The master serves no requests; don't hold its connections open
+    with app.app_context():
+        db.engine.dispose()
+
+
+def post_fork(server, worker):
+    # Connection pools, process pools and threads don't survive fork, so each
+    # worker starts its own rather than sharing the (preloaded) master's
+    from wsgi import app
+    from db_config import db
+    from domain.users import password_hasher
+
+    with app.app_context():
+        db.engine.dispose(close=False)
+    password_hasher.configure_from_app(app)
+
+    from domain.tags.tag_events import start_tag_event_poller
+    start_tag_event_poller(app)
+
+    if os.environ.get('EMAIL_OUTBOX_WORKER', 'thread') == 'thread':
+        from domain.email.outbox_worker import start_outbox_worker
+        start_outbox_worker(app)
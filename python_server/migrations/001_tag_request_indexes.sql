@@ -0,0 +1,26 @@
+-- Indexes for the tag_requests hot paths.
+--
+-- db.create_all() only creates indexes together with a new table, so existing
+-- databases need this script. CONCURRENTLY avoids locking out writes while the
+-- indexes build; it cannot run inside a transaction, so apply with autocommit:
+--
+--     psql "$DATABASE_URL" -f migrations/001_tag_request_indexes.sql
+
+-- Keyset pagination seek/order on (date, id)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tag_requests_date_id
+    ON tag_requests (date, id);
+
+-- New docent listings and the (date, time_slot, new_docent_id) duplicate check
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tag_requests_new_docent_date_slot
+    ON tag_requests (new_docent_id, date, time_slot);
+
+-- Tags filled by a seasoned docent, and the reference check before deleting a user
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tag_requests_seasoned_docent_date
+    ON tag_requests (seasoned_docent_id, date);
+
+-- Open requests for the seasoned docent board
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tag_requests_open_date
+    ON tag_requests (date, id)
+    WHERE status = 'requested';
+
+ANALYZE tag_requests;
@@ -0,0 +1,17 @@
+-- Server-side session table for SESSION_TYPE=sql.
+--
+-- The schema step (gunicorn's on_starting hook, `flask --app wsgi init-db`)
+-- creates it with db.create_all(); this script is for databases managed by
+-- hand. Expired rows are deleted by the app every SESSION_PRUNE_INTERVAL
+-- seconds using the expires_at index.
+--
+--     psql "$DATABASE_URL" -f migrations/002_sessions.sql
+
+CREATE TABLE IF NOT EXISTS sessions (
+    id VARCHAR(64) PRIMARY KEY,
+    data TEXT NOT NULL,
+    expires_at TIMESTAMP NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS ix_sessions_expires_at
+    ON sessions (expires_at);
@@ -0,0 +1,17 @@
+-- Change counters behind the ETags of the list endpoints (table_versions.py).
+--
+-- The schema step (gunicorn's on_starting hook, `flask --app wsgi init-db`)
+-- creates and seeds the table; this script is for databases managed by hand.
+-- Every commit that writes tag_requests or users must find its row here, so
+-- apply it before deploying the new code.
+--
+--     psql "$DATABASE_URL" -f migrations/003_table_versions.sql
+
+CREATE TABLE IF NOT EXISTS table_versions (
+    name VARCHAR(64) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT INTO table_versions (name, version)
+VALUES ('tag_requests', 0), ('users', 0)
+ON CONFLICT (name) DO NOTHING;
@@ -0,0 +1,20 @@
+-- Delta sync (?since=) on /api/tag-requests: an index for "changed since"
+-- and the tombstones left by deleted tag requests.
+--
+-- The schema step (gunicorn's on_starting hook, `flask --app wsgi init-db`)
+-- creates the tombstone table but not the index on the existing tag_requests
+-- table. CONCURRENTLY cannot run inside a transaction, so apply with
+-- autocommit:
+--
+--     psql "$DATABASE_URL" -f migrations/004_delta_sync.sql
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tag_requests_updated_at
+    ON tag_requests (updated_at);
+
+CREATE TABLE IF NOT EXISTS tag_request_tombstones (
+    id INTEGER PRIMARY KEY,
+    deleted_at TIMESTAMP NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS ix_tag_request_tombstones_deleted_at
+    ON tag_request_tombstones (deleted_at);
@@ -0,0 +1,21 @@
+-- Change feed for /api/tag-requests/stream (domain/tags/tag_events.py).
+--
+-- The schema step (gunicorn's on_starting hook, `flask --app wsgi init-db`)
+-- creates it with db.create_all(); this script is for databases managed by
+-- hand. Pollers read it by id; rows older than SSE_EVENT_RETENTION_HOURS
+-- are deleted using the created_at index.
+--
+--     psql "$DATABASE_URL" -f migrations/005_tag_request_events.sql
+
+CREATE TABLE IF NOT EXISTS tag_request_events (
+    id SERIAL PRIMARY KEY,
+    tag_request_id INTEGER NOT NULL,
+    kind VARCHAR(20) NOT NULL,
+    new_docent_id INTEGER NOT NULL,
+    seasoned_docent_id INTEGER,
+    status VARCHAR(20) NOT NULL,
+    created_at TIMESTAMP NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS ix_tag_request_events_created_at
+    ON tag_request_events (created_at);
@@ -0,0 +1,10 @@
+-- GET /api/tag-requests/calendar counts tag requests per (date, time_slot,
+-- status). This index covers the GROUP BY, so the counts for a month come
+-- from an index-only scan instead of reading every row in the window.
+--
+-- CONCURRENTLY cannot run inside a transaction, so apply with autocommit:
+--
+--     psql "$DATABASE_URL" -f migrations/006_calendar_index.sql
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tag_requests_date_slot_status
+    ON tag_requests (date, time_slot, status);
@@ -0,0 +1,9 @@
+-- Stamp for roles cached in sessions (AUTH_ROLE_CACHE_SECONDS, auth.py).
+-- Role changes and user deletions bump it in the same commit, and every
+-- process compares cached roles against it. Apply before deploying the new code.
+--
+--     psql "$DATABASE_URL" -f migrations/007_role_version.sql
+
+INSERT INTO table_versions (name, version)
+VALUES ('user_roles', 0)
+ON CONFLICT (name) DO NOTHING;
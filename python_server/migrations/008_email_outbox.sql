@@ -0,0 +1,28 @@
+-- Queue of confirmation and password reset emails (domain/email/email_model.py),
+-- drained by the outbox worker. Claims and password resets write to it, so
+-- apply before deploying the new code.
+--
+-- The schema step (gunicorn's on_starting hook, `flask --app wsgi init-db`)
+-- creates it with db.create_all(); this script is for databases managed by
+-- hand or served with DB_CREATE_SCHEMA=false.
+--
+--     psql "$DATABASE_URL" -f migrations/008_email_outbox.sql
+
+CREATE TABLE IF NOT EXISTS email_outbox (
+    id SERIAL PRIMARY KEY,
+    kind VARCHAR(50) NOT NULL,
+    recipients TEXT NOT NULL,
+    subject VARCHAR(255) NOT NULL,
+    text_body TEXT NOT NULL,
+    html_body TEXT NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMP NOT NULL DEFAULT (NOW() AT TIME ZONE 'utc'),
+    last_error TEXT,
+    message_id VARCHAR(255),
+    created_at TIMESTAMP,
+    sent_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS ix_email_outbox_status_next_attempt
+    ON email_outbox (status, next_attempt_at);
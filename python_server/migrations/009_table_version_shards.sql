@@ -0,0 +1,21 @@
+-- Split each table_versions counter over 8 rows (VERSION_SHARDS in
+-- table_versions.py), so concurrent commits bump different rows instead of
+-- queueing on one lock. The existing row becomes shard 0 and keeps its
+-- count, so versions (the sum of the shards) only move forward. Apply before
+-- deploying the new code, which reports missing rows as errors.
+--
+--     psql "$DATABASE_URL" -f migrations/009_table_version_shards.sql
+
+BEGIN;
+
+ALTER TABLE table_versions ADD COLUMN IF NOT EXISTS shard SMALLINT NOT NULL DEFAULT 0;
+ALTER TABLE table_versions DROP CONSTRAINT IF EXISTS table_versions_pkey;
+ALTER TABLE table_versions ADD PRIMARY KEY (name, shard);
+
+INSERT INTO table_versions (name, shard, version)
+SELECT names.name, shards.shard, 0
+FROM (VALUES ('tag_requests'), ('users'), ('user_roles')) AS names (name)
+CROSS JOIN generate_series(0, 7) AS shards (shard)
+ON CONFLICT (name, shard) DO NOTHING;
+
+COMMIT;
@@ -0,0 +1,24 @@
+-- Tombstones keep the state a tag request left (docents, status, date), so
+-- delta sync only tells the callers who could see it. Besides deletions they
+-- are now written when a change can hide a row (claims, coordinator edits),
+-- so one tag request can have several and the tag request id moves out of
+-- the primary key. Existing tombstones have no state and are still reported
+-- to everyone. Apply once, together with the deploy: earlier code writes
+-- the old shape.
+--
+--     psql "$DATABASE_URL" -f migrations/010_scoped_tombstones.sql
+
+BEGIN;
+
+ALTER TABLE tag_request_tombstones DROP CONSTRAINT tag_request_tombstones_pkey;
+ALTER TABLE tag_request_tombstones RENAME COLUMN id TO tag_request_id;
+ALTER TABLE tag_request_tombstones ADD COLUMN id SERIAL PRIMARY KEY;
+ALTER TABLE tag_request_tombstones RENAME COLUMN deleted_at TO left_at;
+ALTER INDEX ix_tag_request_tombstones_deleted_at RENAME TO ix_tag_request_tombstones_left_at;
+ALTER TABLE tag_request_tombstones
+    ADD COLUMN new_docent_id INTEGER,
+    ADD COLUMN seasoned_docent_id INTEGER,
+    ADD COLUMN status VARCHAR(20),
+    ADD COLUMN date DATE;
+
+COMMIT;
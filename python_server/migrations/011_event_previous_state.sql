@@ -0,0 +1,10 @@
+-- The state a tag request had before each change-feed event, so streams only
+-- send `removed` to users who could see the request until that change.
+-- Events written before this change have none and send no `removed`.
+--
+--     psql "$DATABASE_URL" -f migrations/011_event_previous_state.sql
+
+ALTER TABLE tag_request_events
+    ADD COLUMN IF NOT EXISTS previous_new_docent_id INTEGER,
+    ADD COLUMN IF NOT EXISTS previous_seasoned_docent_id INTEGER,
+    ADD COLUMN IF NOT EXISTS previous_status VARCHAR(20);
@@ -0,0 +1,7 @@
+-- Expiry for outbox emails that are useless once a deadline passes (password
+-- reset links). The worker drops them unsent after it, sends them ahead of
+-- other mail, and retries them sooner while the daily quota is spent.
+--
+--     psql "$DATABASE_URL" -f migrations/012_outbox_expiry.sql
+
+ALTER TABLE email_outbox ADD COLUMN IF NOT EXISTS expires_at TIMESTAMP;
@@ -0,0 +1,97 @@
+import base64
+import json
+from datetime import date
+from flask import current_app
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(values):
+    """Encode the sort key of the last row on a page as an opaque token"""
+    raw = json.dumps([v.isoformat() if isinstance(v, date) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, columns):
+    """Decode a token from encode_cursor back into values typed for `columns`"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError
+        decoded = []
+        for column, value in zip(columns, values):
+            if column.type.python_type is date:
+                value = date.fromisoformat(value)
+            elif not isinstance(value, column.type.python_type):
+                raise ValueError
+            decoded.append(value)
+        return decoded
+    except (ValueError, TypeError, json.JSONDecodeError):
+        raise ValueError("Invalid cursor")
+
+
+class Page:
+    def __init__(self, items, next_cursor):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    def to_dict(self, serialize):
+        return {
+            'items': [serialize(item) for item in self.items],
+            'next': self.next_cursor
+        }
+
+
+class PageRequest:
+    """
+    A request for one page of a keyset-paginated listing.
+
+    Rows are ordered by a unique tuple of columns (e.g. date, id) and the
+    cursor holds the last tuple already returned, so each page is an index
+    range scan whose cost does not depend on how deep into the list it is.
+    """
+
+    def __init__(self, limit, cursor=None):
+        self.limit = limit
+        self.cursor = cursor
+
+    @classmethod
+    def from_args(cls, args):
+        """
+        Build a page request from query string args, or return None when the
+        caller didn't ask for pagination (no `limit` and no `cursor`).
+        Raises ValueError for a malformed limit.
+        """
+        if 'limit' not in args and 'cursor' not in args:
+            return None
+
+        max_size = current_app.config.get('PAGE_SIZE_MAX', MAX_PAGE_SIZE)
+        default_size = current_app.config.get('PAGE_SIZE_DEFAULT', DEFAULT_PAGE_SIZE)
+        try:
+            limit = int(args.get('limit', default_size))
+        except ValueError:
+            raise ValueError("limit must be an integer")
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+
+        return cls(min(limit, max_size), args.get('cursor') or None)
+
+    def fetch(self, query, order_columns):
+        """Run `query` for this page, ordered by `order_columns`"""
+        if self.cursor:
+            after = decode_cursor(self.cursor, order_columns)
+            query = query.filter(tuple_(*order_columns) > tuple_(*after))
+
+        # Fetch one extra row to learn whether another page follows
+        rows = query.order_by(*order_columns).limit(self.limit + 1).all()
+        items = rows[:self.limit]
+
+        next_cursor = None
+        if len(rows) > self.limit:
+            last = items[-1]
+            next_cursor = encode_cursor([getattr(last, column.key) for column in order_columns])
+
+        return Page(items, next_cursor)
@@ -0,0 +1,52 @@
+"""
+Write .gz (and, when the brotli package is installed, .br) copies of the
+frontend build next to the originals, for static_assets to serve to clients
+that accept them. Run after `npm run build`:
+
+    python python_server/precompress_assets.py [dist/public]
+"""
+import gzip
+import os
+import sys
+
+try:
+    import brotli
+except ImportError:  # optional; gzip alone still helps
+    brotli = None
+
+COMPRESSIBLE = ('.js', '.css', '.html', '.svg', '.json', '.txt', '.map', '.ico', '.webmanifest')
+# Small files gain little and cost a header's worth of bytes
+MIN_SIZE = 1024
+DEFAULT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'dist', 'public')
+
+
+def write_if_smaller(path, data, original_size):
+    if len(data) < original_size:
+        with open(path, 'wb') as f:
+            f.write(data)
+        return True
+    return False
+
+
+def precompress(root):
+    written = 0
+    for directory, _, names in os.walk(root):
+        for name in names:
+            if not name.endswith(COMPRESSIBLE):
+                continue
+            path = os.path.join(directory, name)
+            with open(path, 'rb') as f:
+                data = f.read()
+            if len(data) < MIN_SIZE:
+                continue
+            # mtime=0 keeps the output identical between builds of the same input
+            written += write_if_smaller(path + '.gz', gzip.compress(data, compresslevel=9, mtime=0), len(data))
+            if brotli is not None:
+                written += write_if_smaller(path + '.br', brotli.compress(data, quality=11), len(data))
+    return written
+
+
+if __name__ == '__main__':
+    root = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_ROOT
+    count = precompress(root)
+    print(f'Wrote {count} precompressed files under {root}' + ('' if brotli else ' (brotli not installed, gzip only)'))
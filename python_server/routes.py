@@ -1,14 +1,24 @@
-from flask import jsonify, request, session
+from flask import Response, g, jsonify, request, session, stream_with_context
 from db_config import db
 from domain.users.user_model import User
 from domain.tags.tag_model import TagRequest
-from utils import send_email_confirmation
+from domain.email.email_service import EmailService
 from datetime import datetime, timedelta, date
 import secrets
 import logging
+import csv
+import json
 from functools import wraps
 from sqlalchemy import or_, and_
+from sqlalchemy.exc import SQLAlchemyError
 from domain.users.user_service import UserService
+from domain.users.user_repository import UserRepository
+from domain.tags.tag_repository import TagRequestRepository
+from pagination import Page, PageRequest
+from fieldsets import parse_fields, selected_relationships
+from auth import load_current_user, current_role, invalidate_cached_roles
+from table_versions import versioned_etag
+from domain.tags.open_board import init_open_board, get_open_board
 
 # Authentication decorator
 def login_required(f):
@@ -27,17 +37,77 @@ def role_required(roles):
             if 'user_id' not in session:
                 return jsonify({"error": "Unauthorized"}), 401
             
-            user_id = session.get('user_id')
-            user = User.query.get(user_id)
+            # Served from the request's user (or the session role cache) rather than a fresh query
+            role = current_role()
             
-            if not user or user.role not in roles:
+            if role not in roles:
                 return jsonify({"error": "Forbidden"}), 403
                 
             return f(*args, **kwargs)
         return decorated_function
     return decorator
 
+# Serialize a list result, or a {items, next} envelope for a paginated one
+def list_response(result, serialize):
+    if isinstance(result, Page):
+        return jsonify(result.to_dict(serialize))
+    return jsonify([serialize(item) for item in result])
+
+# Tag request lists take ?shape=normalized to send each docent once in a
+# `users` map (keyed by id) instead of embedding it in every row
+LIST_SHAPES = ('embedded', 'normalized')
+
+def list_shape(args):
+    shape = args.get('shape', 'embedded')
+    if shape not in LIST_SHAPES:
+        raise ValueError(f"shape must be one of: {', '.join(LIST_SHAPES)}")
+    return shape
+
+def normalize_tag_requests(tag_requests, fields=None):
+    # With a sparse fieldset, `users` only holds the docents it selects
+    relationships = selected_relationships(TagRequest, fields)
+    items = []
+    users = {}
+    for tag in tag_requests:
+        items.append(tag.to_dict(embed_users=False, fields=fields))
+        for attr in relationships:
+            docent = getattr(tag, attr)
+            if docent is not None and docent.id not in users:
+                users[docent.id] = docent.to_dict()
+    return {'items': items, 'users': users}
+
+def tag_list_response(result, shape, fields=None):
+    if shape != 'normalized':
+        return list_response(result, lambda tag: tag.to_dict(fields=fields))
+    if isinstance(result, Page):
+        body = normalize_tag_requests(result.items, fields)
+        body['next'] = result.next_cursor
+        return jsonify(body)
+    return jsonify(normalize_tag_requests(result, fields))
+
+# ?since= delta sync: upserts in `items`, ids to drop in `deleted`, and the
+# cursor to send as `since` next time. Clients apply `deleted` first.
+def tag_changes_response(changes, shape, fields=None):
+    rows, removed, next_since = changes
+    if shape == 'normalized':
+        body = normalize_tag_requests(rows, fields)
+    else:
+        body = {'items': [tag.to_dict(fields=fields) for tag in rows]}
+    body['deleted'] = removed
+    body['since'] = next_since
+    return jsonify(body)
+
 def register_routes(app):
+    # Open requests for the seasoned docent board, kept in memory per app
+    init_open_board(app)
+
+    # flask.g belongs to the app context, which can outlive a single request
+    # (e.g. in tests), so start every request without a cached user
+    @app.before_request
+    def reset_current_user():
+        g.pop('current_user', None)
+        g.pop('role_version', None)
+
     # Auth routes
     @app.route('/api/login', methods=['POST'])
     def login():
@@ -49,6 +119,7 @@ def register_routes(app):
         
         # Store user ID in session
         session['user_id'] = user_data['id']
+        session.pop('role_cache', None)
         
         return jsonify(user_data), status_code
     
@@ -60,8 +131,9 @@ def register_routes(app):
     @app.route('/api/user', methods=['GET'])
     @login_required
     def get_current_user():
-        user_id = session.get('user_id')
-        user = User.query.get(user_id)
+        user = load_current_user()
+        if not user:
+            return jsonify({"error": "Unauthorized"}), 401
         return jsonify(user.to_dict())
     
     # Password reset routes
@@ -86,9 +158,15 @@ def register_routes(app):
     @app.route('/api/users', methods=['GET'])
     @login_required
     @role_required(['coordinator'])
+    @versioned_etag('users')
     def get_all_users():
-        users = User.query.all()
-        return jsonify([user.to_dict() for user in users])
+        try:
+            page = PageRequest.from_args(request.args)
+            fields = parse_fields(request.args, User)
+            users = UserRepository.get_all_users(page, fields)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return list_response(users, lambda user: user.to_dict(fields=fields))
 
     @app.route('/api/users', methods=['POST'])
     @login_required
@@ -131,6 +209,7 @@ def register_routes(app):
             }), 400
 
         db.session.delete(user)
+        invalidate_cached_roles()
         db.session.commit()
 
         return jsonify({"success": True})
@@ -139,63 +218,161 @@ def register_routes(app):
     @login_required
     @role_required(['coordinator'])
     def bulk_create_users():
+        # A CSV body (raw or as a multipart "file" field) is imported a chunk at
+        # a time, with progress streamed back as one JSON object per line
+        if request.mimetype in ('text/csv', 'multipart/form-data'):
+            return import_users_csv()
+
         data = request.json
-        results = {
-            "success": 0,
-            "errors": []
-        }
-        
-        for i, user_data in enumerate(data):
-            try:
-                # Process each user via the service layer
-                user_result, status_code = UserService.create_user(user_data)
-                
-                if 'error' in user_result:
-                    results["errors"].append({
-                        "line": i + 1,
-                        "email": user_data.get('email', 'unknown'),
-                        "error": user_result['error']
-                    })
-                    continue
-                
-                results["success"] += 1
-                
-            except Exception as e:
-                results["errors"].append({
-                    "line": i + 1,
-                    "email": user_data.get('email', 'unknown'),
-                    "error": str(e)
-                })
-        
-        return jsonify(results)
+        if not isinstance(data, list):
+            return jsonify({"error": "Expected a list of users"}), 400
+
+        return jsonify(UserService.bulk_create_users(data))
     
+    def import_users_csv():
+        if request.mimetype == 'multipart/form-data':
+            upload = request.files.get('file')
+            if upload is None:
+                return jsonify({"error": "Missing CSV file"}), 400
+            stream = upload.stream
+        else:
+            stream = request.stream
+
+        try:
+            reader = UserService.open_csv_roster(stream)
+        except (ValueError, UnicodeDecodeError) as e:
+            return jsonify({"error": str(e)}), 400
+
+        chunk_size = app.config.get('USER_IMPORT_CHUNK_SIZE', 500)
+
+        def generate():
+            try:
+                for progress in UserService.import_csv_roster(reader, chunk_size):
+                    yield json.dumps(progress) + '\n'
+            except (csv.Error, UnicodeDecodeError) as e:
+                # Chunks already reported stay committed
+                db.session.rollback()
+                yield json.dumps({"error": f"Could not read CSV: {e}"}) + '\n'
+            except SQLAlchemyError:
+                db.session.rollback()
+                logging.exception("User import failed")
+                yield json.dumps({"error": "Import failed, rows after the last progress line were not imported"}) + '\n'
+
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
     # Tag request routes
     @app.route('/api/tag-requests', methods=['GET'])
     @login_required
+    @versioned_etag('tag_requests', 'users')
     def get_tag_requests():
-        from domain.tags.tag_service import TagRequestService  # Import locally
-        user_id = session.get('user_id')
-        user = User.query.get(user_id)
+        from domain.tags.tag_service import TagRequestService, SyncWindowExpired  # Import locally
+        user = load_current_user()
         
         start_date = request.args.get('startDate')
         end_date = request.args.get('endDate')
         
-        tag_requests = TagRequestService.get_tag_requests(user, start_date, end_date)
+        try:
+            page = PageRequest.from_args(request.args)
+            shape = list_shape(request.args)
+            fields = parse_fields(request.args, TagRequest)
+            if 'since' in request.args:
+                if page is not None:
+                    raise ValueError("since cannot be combined with limit or cursor")
+                return tag_changes_response(
+                    TagRequestService.get_changes(
+                        user, request.args['since'], start_date, end_date, fields,
+                        retention=timedelta(days=app.config.get('SYNC_TOMBSTONE_DAYS', 30)),
+                        overlap=timedelta(seconds=app.config.get('SYNC_OVERLAP_SECONDS', 5))
+                    ),
+                    shape, fields
+                )
+            board = get_open_board()
+            if board is not None and user.role == 'seasoned_docent' and page is None and shape == 'embedded':
+                return jsonify(TagRequestService.get_seasoned_board(board, user, start_date, end_date, fields))
+            tag_requests = TagRequestService.get_tag_requests(user, start_date, end_date, page, fields)
+        except SyncWindowExpired as e:
+            return jsonify({"error": str(e)}), 410
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         
-        return jsonify([tag.to_dict() for tag in tag_requests])
+        return tag_list_response(tag_requests, shape, fields)
     
     @app.route('/api/my-tag-requests', methods=['GET'])
     @login_required
+    @versioned_etag('tag_requests', 'users')
     def get_my_tag_requests():
-        user_id = session.get('user_id')
-        user = User.query.get(user_id)
+        from domain.tags.tag_service import TagRequestService  # Import locally
+        user = load_current_user()
         
-        if user.role == 'new_docent':
-            tag_requests = TagRequest.query.filter_by(new_docent_id=user_id).all()
-        elif user.role == 'seasoned_docent':
-            tag_requests = TagRequest.query.filter_by(seasoned_docent_id=user_id).all()
+        try:
+            page = PageRequest.from_args(request.args)
+            shape = list_shape(request.args)
+            fields = parse_fields(request.args, TagRequest)
+            tag_requests = TagRequestService.get_my_tag_requests(user, page, fields)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        return tag_list_response(tag_requests, shape, fields)
+    
+    @app.route('/api/tag-requests/calendar', methods=['GET'])
+    @login_required
+    @versioned_etag('tag_requests')
+    def get_tag_request_calendar():
+        from domain.tags.tag_service import TagRequestService  # Import locally
+        user = load_current_user()
+        
+        try:
+            counts = TagRequestService.get_calendar_counts(user, request.args.get('startDate'), request.args.get('endDate'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         
-        return jsonify([tag.to_dict() for tag in tag_requests])
+        return jsonify(counts)
+    
+    @app.route('/api/tag-requests/stream', methods=['GET'])
+    @login_required
+    def stream_tag_requests():
+        # Server-Sent Events: created/claimed/updated/deleted events for the
+        # tag requests the caller can see, plus `removed` when one leaves a
+        # seasoned docent's view. A reconnecting browser sends Last-Event-ID
+        # and gets what it missed, or a `reset` event telling it to refetch.
+        from domain.tags.tag_events import tag_event_bus, event_stream  # Import locally
+        user = load_current_user()
+        
+        last_event_id = request.headers.get('Last-Event-ID') or request.args.get('lastEventId')
+        try:
+            last_event_id = int(last_event_id) if last_event_id else None
+        except ValueError:
+            return jsonify({"error": "Last-Event-ID must be an event id"}), 400
+        
+        subscription = tag_event_bus.subscribe(user.id, user.role, app.config.get('SSE_MAX_STREAMS', 8))
+        if subscription is None:
+            # Clients fall back to refetching the list; EventSource retries on its own
+            return jsonify({"error": "Too many open streams, try again later"}), 503
+        # Subscribed before the replay so nothing committed in between is
+        # missed; event_stream drops what arrives twice
+        try:
+            backlog = []
+            if last_event_id is not None:
+                backlog = tag_event_bus.replay(last_event_id, user.id, user.role, app.json.dumps)
+            # The stream only waits on a queue; don't hold a database connection for it
+            db.session.close()
+        except Exception:
+            # No stream will run to release the slot
+            tag_event_bus.unsubscribe(subscription)
+            raise
+        
+        response = Response(
+            event_stream(
+                subscription, backlog,
+                heartbeat=app.config.get('SSE_HEARTBEAT_SECONDS', 15),
+                max_seconds=app.config.get('SSE_MAX_SECONDS', 300)
+            ),
+            mimetype='text/event-stream'
+        )
+        response.headers['Cache-Control'] = 'no-cache'
+        # Stop nginx from buffering the stream
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
     
     @app.route('/api/tag-requests', methods=['POST'])
     @login_required
@@ -228,6 +405,7 @@ def register_routes(app):
         )
         
         db.session.add(new_tag)
+        TagRequestRepository.record_event('created', new_tag)
         db.session.commit()
         
         return jsonify(new_tag.to_dict()), 201
@@ -236,22 +414,24 @@ def register_routes(app):
     @login_required
     def update_tag_request(tag_id):
         user_id = session.get('user_id')
-        user = User.query.get(user_id)
+        user = load_current_user()
         tag = TagRequest.query.get_or_404(tag_id)
         data = request.json
         
         # Seasoned docents can claim a tag
         if user.role == 'seasoned_docent' and 'status' in data and data['status'] == 'filled':
-            if tag.status == 'filled':
-                return jsonify({"error": "This tag request is no longer available"}), 400
-            if tag.date < date.today():
+            if not TagRequestRepository.claim_tag_request(tag_id, user_id, date.today()):
+                db.session.rollback()
+                db.session.refresh(tag)
+                if tag.status != 'requested':
+                    return jsonify({"error": "This tag request is no longer available"}), 400
                 return jsonify({"error": "Cannot accept request for past date"}), 400
 
-            tag.seasoned_docent_id = user_id
-            tag.status = 'filled'
-            logging.info(f"Sending email confirmation for tag {tag.id}")
-            print(f"calling send_email_confirmation for tag {tag.id}")
-            send_email_confirmation(tag)
+            # Queue the confirmation in the claim's transaction; the outbox worker sends it
+            db.session.refresh(tag)
+            TagRequestRepository.record_event('claimed', tag)
+            logging.info(f"Queueing email confirmation for tag {tag.id}")
+            EmailService.queue_tag_confirmation(tag)
 
         
         # Coordinators can update any tag
@@ -273,15 +453,16 @@ def register_routes(app):
             
             if 'notes' in data:
                 tag.notes = data['notes']
+            
+            TagRequestRepository.record_event('updated', tag)
         
         else:
             return jsonify({"error": "not authorized"}), 403
         
         db.session.commit()
         
-        # If a tag was filled, in a real app we would send email notifications
         if tag.status == 'filled' and tag.new_docent and tag.seasoned_docent:
-            print(f"Tag request filled: New docent {tag.new_docent.first_name} {tag.new_docent.last_name} will tag along with {tag.seasoned_docent.first_name} {tag.seasoned_docent.last_name} on {tag.date} ({tag.time_slot})")
+            logging.info(f"Tag request filled: New docent {tag.new_docent.first_name} {tag.new_docent.last_name} will tag along with {tag.seasoned_docent.first_name} {tag.seasoned_docent.last_name} on {tag.date} ({tag.time_slot})")
         
         return jsonify(tag.to_dict())
     
@@ -289,7 +470,7 @@ def register_routes(app):
     @login_required
     def delete_tag_request(tag_id):
         user_id = session.get('user_id')
-        user = User.query.get(user_id)
+        user = load_current_user()
         tag = TagRequest.query.get_or_404(tag_id)
 
         if user.role != 'coordinator': # coordinators can delete any tag request
@@ -298,9 +479,10 @@ def register_routes(app):
             if tag.status != 'requested':
                 return jsonify({"error": "Cannot delete a tag request that is filled"}), 409
 
-        # Perform the deletion
+        # Perform the deletion, leaving a tombstone for delta sync clients
         try:
-            db.session.delete(tag)
+            prune_before = datetime.utcnow() - timedelta(days=app.config.get('SYNC_TOMBSTONE_DAYS', 30))
+            TagRequestRepository.delete_tag_request(tag, prune_before)
             db.session.commit()
         except Exception as e:
             db.session.rollback()
@@ -309,6 +491,12 @@ def register_routes(app):
         logging.info(f"User {user_id} deleted tag request {tag_id}")
         return jsonify({"success": True})
     
+    @app.route('/api/email-stats', methods=['GET'])
+    @login_required
+    @role_required(['coordinator'])
+    def get_email_stats():
+        return jsonify(EmailService.get_stats())
+    
     # Health check endpoint for load balancer
     @app.route('/api/health', methods=['GET'])
     def health_check():
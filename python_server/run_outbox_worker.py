@@ -0,0 +1,15 @@
+from app import create_app, init_schema
+from domain.email.outbox_worker import OutboxWorker
+
+# Standalone email outbox worker. Run alongside the web server with
+# EMAIL_OUTBOX_WORKER=off so web processes don't also drain the outbox.
+if __name__ == "__main__":
+    app = create_app()
+    init_schema(app)
+
+    worker = OutboxWorker(
+        app,
+        poll_interval=app.config.get('EMAIL_OUTBOX_POLL_INTERVAL', 2.0),
+        batch_size=app.config.get('EMAIL_OUTBOX_BATCH_SIZE', 20)
+    )
+    worker.run()
@@ -1,7 +1,18 @@
-from app import app, db
+import os
+from app import create_app, init_schema
 
+# Development server. Production runs wsgi.py under gunicorn (see gunicorn.conf.py).
 if __name__ == "__main__":
-    with app.app_context():
-        db.create_all()
+    app = create_app()
+    init_schema(app)
+
+    # Feed the /api/tag-requests/stream connections
+    from domain.tags.tag_events import start_tag_event_poller
+    start_tag_event_poller(app)
+
+    # Drain queued emails in-process unless a separate run_outbox_worker.py is running
+    if os.environ.get("EMAIL_OUTBOX_WORKER", "thread") == "thread":
+        from domain.email.outbox_worker import start_outbox_worker
+        start_outbox_worker(app)
     
-    app.run(host="0.0.0.0", port=5001, debug=True)
\ No newline at end of file
+    app.run(host="0.0.0.0", port=5001, debug=True)
@@ -0,0 +1,208 @@
+"""
+Session storage backends, selected by the SESSION_TYPE config value:
+
+- "sql": session data in the `sessions` table of the app database, so every
+  instance behind the load balancer shares it. Only the session id travels in
+  the cookie. Expired rows are pruned every SESSION_PRUNE_INTERVAL seconds.
+- "cookie": Flask's stateless signed cookie. No storage at all, but the data
+  is readable (not writable) by the client and can't be revoked server-side.
+- anything else (e.g. "filesystem") is handed to Flask-Session.
+"""
+import secrets
+import threading
+import time
+from datetime import datetime
+
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SecureCookieSession, SecureCookieSessionInterface, SessionInterface, SessionMixin
+from itsdangerous import BadSignature, Signer
+from sqlalchemy import delete, insert, select, update
+from werkzeug.datastructures import CallbackDict
+
+from db_config import db
+
+SESSION_ID_BYTES = 32
+DEFAULT_PRUNE_INTERVAL = 3600
+
+
+class SessionRecord(db.Model):
+    __tablename__ = 'sessions'
+
+    id = db.Column(db.String(64), primary_key=True)
+    data = db.Column(db.Text, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+
+class DefaultPermanenceMixin:
+    """
+    Sessions are permanent unless SESSION_PERMANENT is False, without having
+    to store a `_permanent` key in every (otherwise empty) session.
+    """
+    permanent_default = True
+
+    @property
+    def permanent(self):
+        return self.get('_permanent', self.permanent_default)
+
+    @permanent.setter
+    def permanent(self, value):
+        self['_permanent'] = bool(value)
+
+
+class SqlSession(DefaultPermanenceMixin, CallbackDict, SessionMixin):
+    def __init__(self, initial=None, sid=None, new=False, expires_at=None):
+        def on_update(self):
+            self.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.expires_at = expires_at
+        self.modified = False
+
+
+class SqlSessionInterface(SessionInterface):
+    """
+    Server-side sessions in the app database.
+
+    Reads and writes go through db.session, so a request checks out one
+    pooled connection rather than a second one for its session. The read
+    opens the request's transaction. A write comes after the view has
+    returned: work the view left uncommitted would be discarded at teardown
+    anyway, so it is rolled back first and the session row is committed on
+    its own. An unmodified session is only rewritten once less than half of
+    its lifetime is left, so most requests cost one indexed read.
+    """
+    serializer = TaggedJSONSerializer()
+
+    def __init__(self, app):
+        self.prune_interval = app.config.get('SESSION_PRUNE_INTERVAL', DEFAULT_PRUNE_INTERVAL)
+        self._next_prune = 0
+        self._prune_lock = threading.Lock()
+
+    def _signer(self, app):
+        return Signer(app.secret_key, salt='sql-session')
+
+    def open_session(self, app, request):
+        self._maybe_prune()
+        session = self._load(app, request)
+        session.permanent_default = app.config.get('SESSION_PERMANENT', True)
+        return session
+
+    def _load(self, app, request):
+        cookie = request.cookies.get(self.get_cookie_name(app))
+        if cookie:
+            try:
+                sid = self._signer(app).unsign(cookie).decode()
+            except BadSignature:
+                sid = None
+            if sid:
+                row = db.session.execute(
+                    select(SessionRecord.data, SessionRecord.expires_at)
+                    .where(SessionRecord.id == sid, SessionRecord.expires_at > datetime.utcnow())
+                ).first()
+                if row is not None:
+                    return SqlSession(self.serializer.loads(row.data), sid=sid, expires_at=row.expires_at)
+
+        return SqlSession(sid=secrets.token_urlsafe(SESSION_ID_BYTES), new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if not session:
+            if session.modified:
+                # Emptied (e.g. logout): drop the row and the cookie
+                self._write(delete(SessionRecord).where(SessionRecord.id == session.sid))
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        expires = self.get_expiration_time(app, session)
+        storage_expires = expires or datetime.utcnow() + app.permanent_session_lifetime
+        if not (session.modified or self._needs_refresh(app, session)):
+            return
+
+        data = self.serializer.dumps(dict(session))
+        self._write(
+            update(SessionRecord)
+            .where(SessionRecord.id == session.sid)
+            .values(data=data, expires_at=storage_expires),
+            insert(SessionRecord).values(id=session.sid, data=data, expires_at=storage_expires)
+        )
+
+        response.set_cookie(
+            name,
+            self._signer(app).sign(session.sid).decode(),
+            expires=expires,
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app)
+        )
+
+    def _write(self, statement, fallback=None):
+        """Commit `statement` (or `fallback`, if it matched no row) in a transaction of its own"""
+        db.session.rollback()
+        try:
+            if db.session.execute(statement).rowcount == 0 and fallback is not None:
+                db.session.execute(fallback)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def _needs_refresh(self, app, session):
+        if not (session.permanent and app.config.get('SESSION_REFRESH_EACH_REQUEST', True)):
+            return False
+        if session.expires_at is None:
+            return True
+        remaining = session.expires_at - datetime.utcnow()
+        return remaining < app.permanent_session_lifetime / 2
+
+    def _maybe_prune(self):
+        if not self.prune_interval or time.monotonic() < self._next_prune:
+            return
+        if not self._prune_lock.acquire(blocking=False):
+            return
+        try:
+            self._next_prune = time.monotonic() + self.prune_interval
+            prune_expired_sessions()
+        finally:
+            self._prune_lock.release()
+
+
+class CookieSession(DefaultPermanenceMixin, SecureCookieSession):
+    pass
+
+
+class CookieSessionInterface(SecureCookieSessionInterface):
+    """Flask's signed cookie session, honouring SESSION_PERMANENT"""
+    session_class = CookieSession
+
+    def open_session(self, app, request):
+        session = super().open_session(app, request)
+        if session is not None:
+            session.permanent_default = app.config.get('SESSION_PERMANENT', True)
+        return session
+
+
+def prune_expired_sessions():
+    """Delete expired rows from the sessions table. Returns the number removed."""
+    with db.engine.begin() as conn:
+        result = conn.execute(delete(SessionRecord).where(SessionRecord.expires_at <= datetime.utcnow()))
+    return result.rowcount
+
+
+def init_session(app):
+    """Install the session backend named by SESSION_TYPE"""
+    session_type = app.config.get('SESSION_TYPE', 'filesystem')
+    if session_type == 'sql':
+        app.session_interface = SqlSessionInterface(app)
+    elif session_type == 'cookie':
+        app.session_interface = CookieSessionInterface()
+    else:
+        # Only the filesystem (and other Flask-Session) backends need it
+        from flask_session import Session
+        Session(app)
@@ -0,0 +1,110 @@
+"""
+Serving the built frontend (dist/public) from an in-memory manifest.
+
+The manifest is built once at startup: every file's content type, ETag and
+any precompressed .br/.gz siblings (see precompress_assets.py). Requests are
+answered from it without touching the filesystem to find files. Vite's
+content-hashed bundles under assets/ are cached by browsers for a year as
+immutable; everything else (index.html, icons) is revalidated by ETag.
+Unknown paths get index.html so client-side routes work.
+"""
+import hashlib
+import mimetypes
+import os
+
+from flask import abort, request, send_file
+
+IMMUTABLE_PREFIX = 'assets/'
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+# Content-Encoding -> file suffix, in order of preference
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+
+class StaticFile:
+    def __init__(self, path, mimetype, etag, variants):
+        self.path = path
+        self.mimetype = mimetype
+        self.etag = etag
+        # [(encoding, path)] for the precompressed copies that exist
+        self.variants = variants
+
+
+class StaticManifest:
+    def __init__(self, root):
+        self.root = root
+        self.files = {}
+        if root and os.path.isdir(root):
+            self._scan()
+
+    def _scan(self):
+        for directory, _, names in os.walk(self.root):
+            present = set(names)
+            for name in names:
+                if name.endswith(tuple(suffix for _, suffix in ENCODINGS)):
+                    continue
+                full_path = os.path.join(directory, name)
+                url_path = os.path.relpath(full_path, self.root).replace(os.sep, '/')
+                mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+                variants = [
+                    (encoding, full_path + suffix)
+                    for encoding, suffix in ENCODINGS
+                    if name + suffix in present
+                ]
+                self.files[url_path] = StaticFile(full_path, mimetype, _file_etag(full_path), variants)
+
+    def get(self, path):
+        return self.files.get(path)
+
+
+def _file_etag(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(65536), b''):
+            digest.update(block)
+    return digest.hexdigest()[:20]
+
+
+def send_static(static_file, immutable):
+    path, encoding, etag = static_file.path, None, static_file.etag
+    for candidate, variant_path in static_file.variants:
+        if request.accept_encodings[candidate]:
+            path, encoding, etag = variant_path, candidate, f'{static_file.etag}-{candidate}'
+            break
+
+    # Without a max_age, send_file marks the response no-cache: always revalidate
+    response = send_file(
+        path,
+        mimetype=static_file.mimetype,
+        etag=etag,
+        conditional=True,
+        max_age=IMMUTABLE_MAX_AGE if immutable else None
+    )
+    if immutable:
+        response.cache_control.immutable = True
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    if static_file.variants:
+        response.vary.add('Accept-Encoding')
+    return response
+
+
+def init_static(app, root):
+    """Serve the frontend build in `root` for every path no other route claims"""
+    manifest = StaticManifest(root)
+    app.extensions['static_manifest'] = manifest
+
+    @app.route('/', defaults={'path': ''})
+    @app.route('/<path:path>')
+    def serve(path):
+        static_file = manifest.get(path)
+        if static_file is not None:
+            return send_static(static_file, immutable=path.startswith(IMMUTABLE_PREFIX))
+
+        # A missing bundle is a 404, not the app shell served as JavaScript
+        if path.startswith(IMMUTABLE_PREFIX):
+            abort(404)
+
+        index = manifest.get('index.html')
+        if index is None:
+            abort(404)
+        return send_static(index, immutable=False)
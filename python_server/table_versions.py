@@ -0,0 +1,187 @@
+"""
+Per-table version stamps and the ETags built from them.
+
+Every transaction that inserts, updates or deletes rows of a tracked table
+bumps that table's counter in `table_versions` as part of its commit, so the
+stamp changes exactly when committed data does, in every process sharing the
+database. Each counter is split over VERSION_SHARDS rows and a commit bumps
+one of them at random, so concurrent writers rarely wait on the same row
+lock; a table's version is the sum of its shards. List endpoints combine the stamps of the tables they read with the
+caller's role and user id and the query string into a weak ETag. A request
+whose If-None-Match still matches gets a 304 after one primary-key read of
+the counters, without running the list query or serializing anything.
+
+Writes are picked up from ORM flushes and from ORM-enabled insert()/update()/
+delete() statements run through db.session. SQL sent around the session
+(raw connections, other programs) must bump the counter itself.
+
+Counters that aren't tables (COUNTERS) are bumped with bump_on_commit(), e.g.
+`user_roles`, which auth.py compares against the role cached in sessions.
+"""
+import hashlib
+import random
+from functools import wraps
+
+from flask import current_app, make_response, request, session
+from sqlalchemy import event, inspect, select, update
+
+from auth import current_role
+from db_config import db
+
+TRACKED_TABLES = ('tag_requests', 'users')
+# Bumped explicitly by the code making the change
+COUNTERS = ('user_roles',)
+# Rows per counter (changing it needs a migration adding or merging rows)
+VERSION_SHARDS = 8
+
+# The compression hook appends -<encoding> to the ETag of a compressed body
+ENCODING_SUFFIXES = ('', '-br', '-gzip')
+
+
+class MissingVersionRow(RuntimeError):
+    pass
+
+
+class TableVersion(db.Model):
+    __tablename__ = 'table_versions'
+
+    name = db.Column(db.String(64), primary_key=True)
+    shard = db.Column(db.SmallInteger, primary_key=True, default=0)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+
+
+@event.listens_for(TableVersion.__table__, 'after_create')
+def seed_versions(target, connection, **kw):
+    connection.execute(target.insert(), [{'name': name, 'shard': shard, 'version': 0}
+                                         for name in TRACKED_TABLES + COUNTERS for shard in range(VERSION_SHARDS)])
+
+
+def _missing_rows(names):
+    return MissingVersionRow(
+        f"table_versions has no rows for {', '.join(names)}; apply migrations/003_table_versions.sql "
+        f"and 009_table_version_shards.sql (or 007_role_version.sql for user_roles)"
+    )
+
+
+def _changed_tables(session):
+    return session.info.setdefault('changed_tables', set())
+
+
+def bump_on_commit(name):
+    """Bump counter `name` when the current transaction commits"""
+    _changed_tables(db.session).add(name)
+
+
+@event.listens_for(db.session, 'after_flush')
+def collect_flushed_tables(session, flush_context):
+    changed = _changed_tables(session)
+    for obj in session.new | session.deleted:
+        changed.add(inspect(obj).mapper.persist_selectable.name)
+    for obj in session.dirty:
+        # Adding to a relationship collection marks the other side dirty too
+        if session.is_modified(obj, include_collections=False):
+            changed.add(inspect(obj).mapper.persist_selectable.name)
+
+
+@event.listens_for(db.session, 'do_orm_execute')
+def collect_statement_tables(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _changed_tables(orm_execute_state.session).add(orm_execute_state.statement.table.name)
+
+
+@event.listens_for(db.session, 'before_commit')
+def bump_versions(session):
+    # Flush first so changes still pending are counted. Bumping once, at
+    # commit, holds the counter row locks only for the end of the transaction.
+    session.flush()
+    changed = sorted(_changed_tables(session).intersection(TRACKED_TABLES + COUNTERS))
+    if changed:
+        # One shard for every counter of the commit, so locks are still taken
+        # in name order
+        shard = random.randrange(VERSION_SHARDS)
+        bumped = dict(session.execute(
+            update(TableVersion)
+            .where(TableVersion.name.in_(changed), TableVersion.shard == shard)
+            .values(version=TableVersion.version + 1)
+            .returning(TableVersion.name, TableVersion.version)
+            .execution_options(synchronize_session=False)
+        ).all())
+        if len(bumped) != len(changed):
+            # Committing without the bump would leave clients on stale 304s
+            raise _missing_rows(sorted(set(changed) - set(bumped)))
+        # The (shard, version) this commit creates per counter, for after_commit
+        # listeners (the open requests board applies its own writes with them)
+        session.info['committed_versions'] = {name: (shard, version) for name, version in bumped.items()}
+
+
+@event.listens_for(db.session, 'after_transaction_end')
+def forget_changed_tables(session, transaction):
+    # Flushes and savepoints run in inner transactions; wait for the outermost
+    if transaction.parent is None:
+        session.info.pop('changed_tables', None)
+        session.info.pop('committed_versions', None)
+
+
+def shard_versions(tables):
+    """
+    The committed shard versions of each of `tables`, in order: a tuple of
+    VERSION_SHARDS versions per table. Raises MissingVersionRow when a
+    counter has lost rows, rather than report a version that never moves.
+    """
+    shards = {name: [None] * VERSION_SHARDS for name in tables}
+    for name, shard, version in db.session.execute(
+        select(TableVersion.name, TableVersion.shard, TableVersion.version).where(TableVersion.name.in_(tables))
+    ):
+        if shard < VERSION_SHARDS:
+            shards[name][shard] = version
+    missing = [name for name in tables if None in shards[name]]
+    if missing:
+        raise _missing_rows(missing)
+    return tuple(tuple(shards[name]) for name in tables)
+
+
+def current_versions(tables):
+    """The committed version of each of `tables`, in order"""
+    return tuple(sum(shards) for shards in shard_versions(tables))
+
+
+def list_etag(tables):
+    """ETag for the current request's view of `tables`"""
+    scope = f"{current_role()}:{session.get('user_id')}"
+    key = f"{current_versions(tables)}|{scope}|{request.query_string.decode()}"
+    return hashlib.blake2b(key.encode(), digest_size=12).hexdigest()
+
+
+def matching_etag(etag):
+    """The variant of `etag` the client already holds, if any"""
+    for suffix in ENCODING_SUFFIXES:
+        if request.if_none_match.contains_weak(etag + suffix):
+            return etag + suffix
+    return None
+
+
+def versioned_etag(*tables):
+    """
+    Tag a list view's response with an ETag built from the versions of
+    `tables`, and answer 304 when If-None-Match already holds it.
+    The version is read before the view runs, so a write committed in between
+    can only make the next request refetch, never pin stale data to a new tag.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            etag = list_etag(tables)
+            matched = matching_etag(etag)
+            if matched:
+                response = current_app.response_class(status=304)
+                response.set_etag(matched, weak=True)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                response.set_etag(etag, weak=True)
+            # Let browsers keep the body but revalidate it on every use
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return decorated_function
+    return decorator
@@ -2,7 +2,9 @@ import pytest
 from datetime import datetime, date, timedelta
 from unittest.mock import patch
 from flask import Flask
-from flask_session import Session
+from session_store import init_session
+from compression import init_compression
+from json_provider import init_json
 from db_config import db
 from domain.users.user_model import User
 from domain.tags.tag_model import TagRequest
@@ -12,6 +14,7 @@ import tempfile
 def create_test_app(config=None):
     """Create test Flask app with SQLite in-memory database"""
     app = Flask(__name__)
+    init_json(app)
     
     # Default test configuration
     test_config = {
@@ -35,7 +38,8 @@ def create_test_app(config=None):
     
     # Initialize extensions
     db.init_app(app)
-    Session(app)
+    init_session(app)
+    init_compression(app)
     
     # Import and register routes
     from routes import register_routes
@@ -0,0 +1,161 @@
+import pytest
+
+from domain.email.email_dispatcher import EmailDispatcher
+from domain.email.rate_limiter import TokenBucket
+
+EMAIL_CONTENT = {"subject": "Subject", "text_body": "Text", "html_body": "<p>Html</p>"}
+QUOTA = {'Max24HourSend': 200.0, 'MaxSendRate': 2.0, 'SentLast24Hours': 0.0}
+
+class FakeClock:
+    """Manual clock; sleeping advances it instantly"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+def ok(recipients, email_content):
+    return {"success": True, "message_id": "message-1"}
+
+def error(code, message='error'):
+    return {"success": False, "error": f"{code}: {message}", "error_type": "SESClientError", "error_code": code}
+
+def make_dispatcher(send=ok, quota=QUOTA, **kwargs):
+    clock = FakeClock()
+    dispatcher = EmailDispatcher(send=send, quota=lambda max_age: dict(quota),
+                                 sleep=clock.sleep, clock=clock, **kwargs)
+    return dispatcher, clock
+
+class TestTokenBucket:
+
+    def test_bucket_paces_to_rate(self):
+        """Test: After the initial burst, acquiring waits 1/rate seconds per token"""
+        clock = FakeClock()
+        bucket = TokenBucket(2.0, clock=clock, sleep=clock.sleep)
+
+        for _ in range(6):
+            bucket.acquire()
+
+        # Two tokens available up front, then four more at 2/s
+        assert clock.now == pytest.approx(2.0)
+
+    def test_request_larger_than_capacity_is_not_starved(self):
+        """Test: An email with more recipients than the bucket holds still goes out"""
+        clock = FakeClock()
+        bucket = TokenBucket(1.0, clock=clock, sleep=clock.sleep)
+
+        bucket.acquire(5)
+
+        assert clock.now == 0
+
+class TestEmailDispatcher:
+
+    def test_rate_comes_from_quota_split_across_senders(self, monkeypatch):
+        """Test: MaxSendRate is divided between the processes sending email"""
+        monkeypatch.setenv('EMAIL_SENDERS', '2')
+        dispatcher, clock = make_dispatcher()
+
+        dispatcher.dispatch(['a@example.com'], EMAIL_CONTENT)
+
+        assert dispatcher.bucket.rate == 1.0
+
+    def test_sends_are_paced_per_recipient(self):
+        """Test: Each recipient counts against the send rate"""
+        dispatcher, clock = make_dispatcher()
+        dispatcher.refresh_quota()
+        clock.now += 1  # let the resized bucket fill up
+        start = clock.now
+
+        for _ in range(3):
+            dispatcher.dispatch(['a@example.com', 'b@example.com'], EMAIL_CONTENT)
+
+        # 2 tokens up front, then 4 more recipients at 2/s
+        assert clock.now - start == pytest.approx(2.0)
+        assert dispatcher.stats()['sent'] == 3
+
+    def test_throttling_is_retried_with_jittered_backoff(self):
+        """Test: Throttled sends back off and retry before giving up"""
+        results = [error('Throttling', 'Maximum sending rate exceeded.'), error('Throttling'), ok(None, None)]
+        dispatcher, clock = make_dispatcher(send=lambda recipients, content: results.pop(0))
+
+        result = dispatcher.dispatch(['a@example.com'], EMAIL_CONTENT)
+
+        assert result['success'] is True
+        stats = dispatcher.stats()
+        assert stats['throttled'] == 2
+        assert stats['retried'] == 2
+        backoffs = [s for s in clock.slept if s <= dispatcher.backoff_cap]
+        assert all(0 <= s <= dispatcher.backoff_cap for s in backoffs)
+
+    def test_transient_failure_is_handed_back_as_retryable(self):
+        """Test: Exhausting inline retries marks the result retryable for the outbox"""
+        dispatcher, clock = make_dispatcher(send=lambda recipients, content: error('ServiceUnavailable'))
+
+        result = dispatcher.dispatch(['a@example.com'], EMAIL_CONTENT)
+
+        assert result['success'] is False
+        assert result['retryable'] is True
+        assert dispatcher.stats()['failed'] == 1
+
+    def test_permanent_failure_is_not_retried(self):
+        """Test: Rejected messages are not retried"""
+        calls = []
+
+        def send(recipients, content):
+            calls.append(recipients)
+            return error('MessageRejected')
+
+        dispatcher, clock = make_dispatcher(send=send)
+        result = dispatcher.dispatch(['a@example.com'], EMAIL_CONTENT)
+
+        assert len(calls) == 1
+        assert result['retryable'] is False
+
+    def test_exhausted_daily_quota_defers_without_calling_ses(self):
+        """Test: With no daily quota left the email is deferred instead of sent"""
+        calls = []
+
+        def send(recipients, content):
+            calls.append(recipients)
+            return ok(recipients, content)
+
+        dispatcher, clock = make_dispatcher(send=send, quota={**QUOTA, 'SentLast24Hours': 200.0})
+        result = dispatcher.dispatch(['a@example.com'], EMAIL_CONTENT)
+
+        assert calls == []
+        assert result['deferred'] is True
+        assert result['error_code'] == 'DailyQuotaExceeded'
+        assert dispatcher.stats()['failed'] == 0
+
+    def test_daily_quota_throttle_is_deferred_not_retried(self):
+        """Test: SES reporting the daily quota spent ends the send without inline retries"""
+        calls = []
+
+        def send(recipients, content):
+            calls.append(recipients)
+            return error('DailyQuotaExceeded', 'Daily message quota exceeded.')
+
+        dispatcher, clock = make_dispatcher(send=send)
+        result = dispatcher.dispatch(['a@example.com'], EMAIL_CONTENT)
+
+        assert len(calls) == 1
+        assert result['deferred'] is True
+        assert dispatcher.daily_remaining == 0
+
+    def test_unreachable_quota_keeps_default_rate(self):
+        """Test: If the quota can't be read, sending continues at the conservative default"""
+        clock = FakeClock()
+
+        def quota(max_age):
+            raise RuntimeError('no credentials')
+
+        dispatcher = EmailDispatcher(send=ok, quota=quota, sleep=clock.sleep, clock=clock)
+
+        assert dispatcher.dispatch(['a@example.com'], EMAIL_CONTENT)['success'] is True
+        assert dispatcher.bucket.rate == 1.0
@@ -0,0 +1,206 @@
+import pytest
+from datetime import datetime, timedelta
+
+from db_config import db
+from domain.email.email_model import OutboxEmail
+from domain.email.email_repository import OutboxRepository
+from domain.email.email_service import EmailService, MAX_ATTEMPTS, EXPIRING_QUOTA_DEFERRAL
+from domain.email.email_dispatcher import email_dispatcher
+from domain.email.fake_ses import fake_ses_client
+from domain.email.rate_limiter import TokenBucket
+from domain.email.outbox_worker import OutboxWorker
+from domain.users.user_model import User
+
+@pytest.fixture
+def fake_ses(monkeypatch):
+    monkeypatch.setenv('EMAIL_BACKEND', 'fake')
+    monkeypatch.setenv('SOURCE_EMAIL', 'coordinator@example.com')
+    # Don't actually pause for rate limiting or between the dispatcher's inline retries
+    monkeypatch.setattr(email_dispatcher, '_sleep', lambda seconds: None)
+    monkeypatch.setattr(email_dispatcher, 'refresh_quota', lambda: True)
+    monkeypatch.setattr(email_dispatcher, 'bucket', TokenBucket(1000))
+    # A test spending the daily quota doesn't leave it spent for the next
+    monkeypatch.setattr(email_dispatcher, 'daily_remaining', None)
+    fake_ses_client.reset()
+    yield fake_ses_client
+    fake_ses_client.reset()
+
+def make_due(email):
+    """Pull a scheduled retry forward so the next drain picks it up"""
+    email.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+    db.session.commit()
+
+class TestEmailService:
+
+    def test_queued_email_is_not_sent_until_drained(self, test_db, fake_ses, new_docent_user):
+        """Test: Queueing only writes an outbox row; the worker does the sending"""
+        EmailService.queue_password_reset(new_docent_user, 'https://example.com/reset-password?token=abc')
+        db.session.commit()
+
+        assert fake_ses.sent_messages == []
+
+        assert EmailService.deliver_due_emails() == 1
+
+        assert len(fake_ses.sent_messages) == 1
+        message = fake_ses.sent_messages[0]
+        assert message['Destination']['ToAddresses'] == ['newdocent@example.com']
+        assert 'token=abc' in message['Message']['Body']['Text']['Data']
+
+        email = OutboxEmail.query.one()
+        assert email.status == 'sent'
+        assert email.message_id == message['MessageId']
+
+    def test_uncommitted_email_is_never_sent(self, test_db, fake_ses, new_docent_user):
+        """Test: Rolling back the triggering transaction discards the email"""
+        EmailService.queue_password_reset(new_docent_user, 'https://example.com/reset-password?token=abc')
+        db.session.rollback()
+
+        assert EmailService.deliver_due_emails() == 0
+        assert fake_ses.sent_messages == []
+
+    def test_failed_send_is_retried_with_backoff(self, test_db, fake_ses, new_docent_user):
+        """Test: A failed send is rescheduled and succeeds on a later attempt"""
+        EmailService.queue_password_reset(new_docent_user, 'https://example.com/reset')
+        db.session.commit()
+        # Enough throttles to exhaust the dispatcher's inline retries
+        fake_ses.fail_next(times=email_dispatcher.inline_retries + 1)
+
+        assert EmailService.deliver_due_emails() == 0
+        email = OutboxEmail.query.one()
+        assert email.status == 'pending'
+        assert email.attempts == 1
+        assert 'Throttling' in email.last_error
+        assert email.next_attempt_at > datetime.utcnow()
+
+        # Not due yet, so nothing happens
+        assert EmailService.deliver_due_emails() == 0
+
+        make_due(email)
+        assert EmailService.deliver_due_emails() == 1
+        assert OutboxEmail.query.one().status == 'sent'
+
+    def test_email_is_marked_failed_after_max_attempts(self, test_db, fake_ses, new_docent_user):
+        """Test: The outbox gives up after MAX_ATTEMPTS failed sends"""
+        EmailService.queue_password_reset(new_docent_user, 'https://example.com/reset')
+        db.session.commit()
+        fake_ses.fail_next(times=MAX_ATTEMPTS * (email_dispatcher.inline_retries + 1))
+
+        for _ in range(MAX_ATTEMPTS):
+            make_due(OutboxEmail.query.one())
+            EmailService.deliver_due_emails()
+
+        email = OutboxEmail.query.one()
+        assert email.status == 'failed'
+        assert email.attempts == MAX_ATTEMPTS
+        assert fake_ses.sent_messages == []
+
+    def test_throttled_send_is_retried_inline(self, test_db, fake_ses, new_docent_user):
+        """Test: A single throttle is absorbed by the dispatcher without rescheduling"""
+        EmailService.queue_password_reset(new_docent_user, 'https://example.com/reset')
+        db.session.commit()
+        fake_ses.fail_next(times=1)
+
+        assert EmailService.deliver_due_emails() == 1
+        assert OutboxEmail.query.one().attempts == 1
+
+    def test_permanent_error_is_not_retried(self, test_db, fake_ses, new_docent_user):
+        """Test: Rejected messages fail immediately instead of using up retries"""
+        EmailService.queue_password_reset(new_docent_user, 'https://example.com/reset')
+        db.session.commit()
+        fake_ses.fail_next(code='MessageRejected', message='Email address is not verified.')
+
+        EmailService.deliver_due_emails()
+
+        email = OutboxEmail.query.one()
+        assert email.status == 'failed'
+        assert email.attempts == 1
+
+    def test_quota_deferral_does_not_use_up_attempts(self, test_db, fake_ses, new_docent_user, monkeypatch):
+        """Test: An email held back by the daily quota waits out the window and keeps its attempts"""
+        EmailService.queue_password_reset(new_docent_user, 'https://example.com/reset')
+        db.session.commit()
+        monkeypatch.setattr(email_dispatcher, 'daily_remaining', 0)
+
+        for _ in range(MAX_ATTEMPTS + 1):
+            make_due(OutboxEmail.query.one())
+            EmailService.deliver_due_emails()
+
+        email = OutboxEmail.query.one()
+        assert email.status == 'pending'
+        assert email.attempts == 0
+        assert email.next_attempt_at > datetime.utcnow() + timedelta(hours=23)
+        assert fake_ses.sent_messages == []
+
+    def test_expiring_email_checks_back_sooner(self, test_db, fake_ses, new_docent_user):
+        """Test: A reset email held by the daily quota retries within its token's lifetime"""
+        EmailService.queue_password_reset(new_docent_user, 'https://example.com/reset',
+                                          expires_at=datetime.utcnow() + timedelta(hours=1))
+        db.session.commit()
+        # SES says the quota is spent, as a Throttling error
+        fake_ses.fail_next(message='Daily message quota exceeded.')
+
+        assert EmailService.deliver_due_emails() == 0
+
+        email = OutboxEmail.query.one()
+        assert email.status == 'pending'
+        assert email.attempts == 0
+        assert email.next_attempt_at <= datetime.utcnow() + EXPIRING_QUOTA_DEFERRAL
+        assert fake_ses.sent_messages == []
+
+    def test_expired_email_is_dropped(self, test_db, fake_ses, new_docent_user):
+        """Test: An email past its expiry is marked failed instead of sent"""
+        EmailService.queue_password_reset(new_docent_user, 'https://example.com/reset',
+                                          expires_at=datetime.utcnow() - timedelta(minutes=1))
+        db.session.commit()
+
+        assert EmailService.deliver_due_emails() == 0
+
+        email = OutboxEmail.query.one()
+        assert email.status == 'failed'
+        assert 'Expired' in email.last_error
+        assert fake_ses.sent_messages == []
+
+    def test_expiring_emails_are_claimed_first(self, test_db, fake_ses, new_docent_user):
+        """Test: Reset emails go ahead of mail that doesn't expire"""
+        OutboxRepository.add_email('tag_confirmation', ['a@example.com'],
+                                   {'subject': 'Tag', 'text_body': 'Tag', 'html_body': 'Tag'})
+        EmailService.queue_password_reset(new_docent_user, 'https://example.com/reset',
+                                          expires_at=datetime.utcnow() + timedelta(hours=1))
+        db.session.commit()
+
+        assert [email.kind for email in OutboxRepository.claim_due_emails(2, 120)] == ['password_reset', 'tag_confirmation']
+
+    def test_email_claimed_by_another_worker_is_not_sent_twice(self, test_db, fake_ses, new_docent_user):
+        """Test: When a lease lapses mid-batch and another worker claims the email, this worker skips it"""
+        for _ in range(2):
+            EmailService.queue_password_reset(new_docent_user, 'https://example.com/reset')
+        db.session.commit()
+        first, second = [email.id for email in OutboxEmail.query.order_by(OutboxEmail.id)]
+        sent = []
+
+        def slow_send(recipients, content):
+            # Another worker re-claims the second email while this one is sending
+            db.session.execute(db.update(OutboxEmail).where(OutboxEmail.id == second)
+                               .values(attempts=OutboxEmail.attempts + 1))
+            db.session.commit()
+            sent.append(recipients)
+            return {"success": True, "message_id": "m"}
+
+        assert EmailService.deliver_due_emails(send=slow_send) == 1
+        assert len(sent) == 1
+        assert db.session.get(OutboxEmail, first).status == 'sent'
+        assert db.session.get(OutboxEmail, second).status == 'pending'
+
+    def test_retry_delay_grows_and_is_capped(self):
+        """Test: Backoff doubles per attempt up to an hour"""
+        assert EmailService.retry_delay(1) == timedelta(seconds=30)
+        assert EmailService.retry_delay(2) == timedelta(seconds=60)
+        assert EmailService.retry_delay(20) == timedelta(hours=1)
+
+    def test_worker_drains_outbox(self, app, test_db, fake_ses, new_docent_user):
+        """Test: The background worker delivers queued emails in its own app context"""
+        EmailService.queue_password_reset(new_docent_user, 'https://example.com/reset')
+        db.session.commit()
+
+        assert OutboxWorker(app).drain_once() == 1
+        assert len(fake_ses.sent_messages) == 1
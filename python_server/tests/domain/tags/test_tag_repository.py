@@ -0,0 +1,185 @@
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from sqlalchemy import event
+
+from db_config import db
+from domain.tags.tag_model import TagRequest
+from domain.tags.tag_repository import TagRequestRepository
+from domain.users.user_model import User
+
+
+@contextmanager
+def count_queries():
+    """Count the SQL statements executed against the engine inside the block"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def seed_filled_tag_requests(count, offset=0):
+    """Create `count` filled tag requests, each with its own pair of docents"""
+    for i in range(offset, offset + count):
+        new_docent = User(
+            email=f'new{i}@example.com',
+            first_name='New',
+            last_name=f'Docent{i}',
+            role='new_docent',
+            password='not-a-real-hash'
+        )
+        seasoned_docent = User(
+            email=f'seasoned{i}@example.com',
+            first_name='Seasoned',
+            last_name=f'Docent{i}',
+            role='seasoned_docent',
+            password='not-a-real-hash'
+        )
+        db.session.add_all([new_docent, seasoned_docent])
+        db.session.flush()
+        db.session.add(TagRequest(
+            date=date.today() + timedelta(days=i),
+            time_slot='AM',
+            status='filled',
+            new_docent_id=new_docent.id,
+            seasoned_docent_id=seasoned_docent.id
+        ))
+    db.session.commit()
+    # Start from an empty identity map so lazy loads would have to hit the database
+    db.session.expunge_all()
+
+
+def serialized_query_count(fetch):
+    with count_queries() as statements:
+        [tag.to_dict() for tag in fetch()]
+    db.session.expunge_all()
+    return len(statements)
+
+
+class TestTagRequestRepository:
+
+    def test_get_all_tag_requests_query_count_is_constant(self, test_db):
+        """Test: Listing and serializing tag requests does not issue a query per row"""
+        seed_filled_tag_requests(3)
+        small = serialized_query_count(TagRequestRepository.get_all_tag_requests)
+
+        seed_filled_tag_requests(12, offset=3)
+        large = serialized_query_count(TagRequestRepository.get_all_tag_requests)
+
+        assert small == large
+        # One query for the tag requests plus one per docent relationship
+        assert large <= 3
+
+    def test_get_tag_requests_by_seasoned_docent_query_count_is_constant(self, test_db):
+        """Test: The seasoned docent board loads docents in a bounded number of queries"""
+        seed_filled_tag_requests(2)
+        seasoned_id = User.query.filter_by(email='seasoned0@example.com').first().id
+        small = serialized_query_count(
+            lambda: TagRequestRepository.get_tag_requests_by_seasoned_docent(seasoned_id))
+
+        for tag in TagRequest.query.all():
+            tag.status = 'requested'
+        db.session.commit()
+        db.session.expunge_all()
+        large = serialized_query_count(
+            lambda: TagRequestRepository.get_tag_requests_by_seasoned_docent(seasoned_id))
+
+        assert small == large
+
+    def test_shared_docent_is_loaded_once(self, test_db):
+        """Test: A docent shared by many rows is fetched once and reused"""
+        new_docent = User(
+            email='shared@example.com',
+            first_name='Shared',
+            last_name='Docent',
+            role='new_docent',
+            password='not-a-real-hash'
+        )
+        db.session.add(new_docent)
+        db.session.flush()
+        new_docent_id = new_docent.id
+        for i in range(5):
+            db.session.add(TagRequest(
+                date=date.today() + timedelta(days=i),
+                time_slot='PM',
+                status='requested',
+                new_docent_id=new_docent_id
+            ))
+        db.session.commit()
+        db.session.expunge_all()
+
+        tag_requests = TagRequestRepository.get_tag_requests_by_user(new_docent_id)
+
+        assert len(tag_requests) == 5
+        assert len({id(tag.new_docent) for tag in tag_requests}) == 1
+
+    def test_role_scope_and_date_window_are_applied_together(self, test_db):
+        """Test: Seasoned docents only get open-or-mine requests inside the window"""
+        seed_filled_tag_requests(1)
+        seasoned_id = User.query.filter_by(email='seasoned0@example.com').first().id
+        new_docent_id = User.query.filter_by(email='new0@example.com').first().id
+        today = date.today()
+        for days, status in [(1, 'requested'), (40, 'requested'), (2, 'filled')]:
+            db.session.add(TagRequest(
+                date=today + timedelta(days=days),
+                time_slot='PM',
+                status=status,
+                new_docent_id=new_docent_id
+            ))
+        db.session.commit()
+
+        tag_requests = TagRequestRepository.get_tag_requests_by_seasoned_docent(
+            seasoned_id, today, today + timedelta(days=30))
+
+        # Own filled tag for today and the open request tomorrow; the open request
+        # outside the window and the filled tag that is not ours are excluded
+        assert sorted((tag.date - today).days for tag in tag_requests) == [0, 1]
+
+    def test_only_one_claim_wins(self, test_db):
+        """Test: A second claim on the same request loses even with a stale read"""
+        seed_filled_tag_requests(2)
+        first, second = [u.id for u in User.query.filter_by(role='seasoned_docent').order_by(User.id)]
+        new_docent_id = User.query.filter_by(role='new_docent').first().id
+        tag = TagRequest(
+            date=date.today() + timedelta(days=3),
+            time_slot='AM',
+            status='requested',
+            new_docent_id=new_docent_id
+        )
+        db.session.add(tag)
+        db.session.commit()
+        tag_id = tag.id
+
+        assert TagRequestRepository.claim_tag_request(tag_id, first, date.today()) is True
+        db.session.commit()
+        assert TagRequestRepository.claim_tag_request(tag_id, second, date.today()) is False
+        db.session.commit()
+
+        claimed = db.session.get(TagRequest, tag_id)
+        assert claimed.status == 'filled'
+        assert claimed.seasoned_docent_id == first
+
+    def test_past_request_cannot_be_claimed(self, test_db):
+        """Test: The claim UPDATE does not match requests dated before today"""
+        seed_filled_tag_requests(1)
+        seasoned_id = User.query.filter_by(role='seasoned_docent').first().id
+        new_docent_id = User.query.filter_by(role='new_docent').first().id
+        tag = TagRequest(
+            date=date.today() - timedelta(days=1),
+            time_slot='PM',
+            status='requested',
+            new_docent_id=new_docent_id
+        )
+        db.session.add(tag)
+        db.session.commit()
+
+        assert TagRequestRepository.claim_tag_request(tag.id, seasoned_id, date.today()) is False
+        db.session.commit()
+        assert db.session.get(TagRequest, tag.id).status == 'requested'
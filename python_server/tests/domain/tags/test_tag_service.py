@@ -1,3 +1,4 @@
+from datetime import date
 from unittest.mock import Mock, patch
 
 from domain.tags.tag_service import TagRequestService
@@ -35,7 +36,26 @@ class TestTagRequestService:
 
     @patch.object(TagRequestRepository, 'get_all_tag_requests')
     def test_date_range(self, mock_get_all):
-        pass
+        coordinator_user = Mock()
+        coordinator_user.role = 'coordinator'
+
+        mock_get_all.return_value = ['mocked_tag_request_1']
+        result = TagRequestService.get_tag_requests(
+            coordinator_user, '2025-03-01T08:00:00.000Z', '2025-03-31T08:00:00.000Z')
+
+        assert result == ['mocked_tag_request_1']
+        mock_get_all.assert_called_once_with(date(2025, 3, 1), date(2025, 3, 31), page=None, fields=None)
+
+    @patch.object(TagRequestRepository, 'get_tag_requests_by_seasoned_docent')
+    def test_date_range_is_combined_with_role_scope(self, mock_get_by_seasoned):
+        seasoned_docent_user = Mock()
+        seasoned_docent_user.role = 'seasoned_docent'
+        seasoned_docent_user.id = 7
+
+        mock_get_by_seasoned.return_value = []
+        TagRequestService.get_tag_requests(seasoned_docent_user, '2025-03-01', '2025-03-31')
+
+        mock_get_by_seasoned.assert_called_once_with(7, date(2025, 3, 1), date(2025, 3, 31), page=None, fields=None)
 
 
 
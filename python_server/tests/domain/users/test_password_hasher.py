@@ -0,0 +1,43 @@
+import pytest
+from passlib.hash import pbkdf2_sha256
+
+from domain.users import password_hasher
+
+@pytest.fixture(autouse=True)
+def restore_defaults():
+    yield
+    password_hasher.configure()
+
+class TestPasswordHasher:
+
+    def test_hash_uses_configured_rounds(self):
+        password_hasher.configure(rounds=1000)
+
+        password_hash = password_hasher.hash_password('secret')
+
+        assert password_hash.startswith('$pbkdf2-sha256$1000$')
+        assert password_hasher.verify_password('secret', password_hash)
+        assert not password_hasher.verify_password('wrong', password_hash)
+
+    def test_hash_with_other_rounds_needs_rehash(self):
+        old_hash = pbkdf2_sha256.using(rounds=1000).hash('secret')
+        password_hasher.configure(rounds=2000)
+
+        assert password_hasher.needs_rehash(old_hash)
+        assert not password_hasher.needs_rehash(password_hasher.hash_password('secret'))
+
+    def test_process_pool_produces_compatible_hashes(self):
+        password_hasher.configure(rounds=1000, workers=1)
+
+        password_hash = password_hasher.hash_password('secret')
+
+        assert pbkdf2_sha256.verify('secret', password_hash)
+        assert password_hasher.verify_password('secret', password_hash)
+        assert not password_hasher.verify_password('wrong', password_hash)
+
+    def test_unusable_password_never_verifies(self):
+        unusable = password_hasher.UNUSABLE_PASSWORD
+
+        assert not password_hasher.verify_password('', unusable)
+        assert not password_hasher.verify_password('!', unusable)
+        assert not password_hasher.needs_rehash(unusable)
@@ -73,10 +73,11 @@ class TestUserService:
         mock_get_user_by_email.assert_called_once_with('existing@example.com')
         mock_create_locked_user.assert_not_called()
     
+    @patch('domain.users.user_service.invalidate_cached_roles')
     @patch.object(UserRepository, 'get_user_by_id')
     @patch.object(UserRepository, 'get_user_by_email')
     @patch.object(UserRepository, 'update_user')
-    def test_update_user_details_success(self, mock_update_user, mock_get_by_email, mock_get_by_id):
+    def test_update_user_details_success(self, mock_update_user, mock_get_by_email, mock_get_by_id, mock_invalidate_cached_roles):
         # Setup
         user_id = 1
         
@@ -119,6 +120,7 @@ class TestUserService:
         mock_get_by_id.assert_called_once_with(user_id)
         mock_get_by_email.assert_called_once_with('updated@example.com')
         mock_update_user.assert_called_once()
+        mock_invalidate_cached_roles.assert_called_once_with()
         
         # Verify attributes were set correctly
         assert mock_user.email == 'updated@example.com'
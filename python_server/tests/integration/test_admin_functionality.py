@@ -1,8 +1,13 @@
+import io
+import json
 import pytest
 from datetime import date, timedelta
+from unittest.mock import patch
 from domain.users.user_model import User
+from domain.users.user_repository import UserRepository
 from domain.tags.tag_model import TagRequest
 from db_config import db
+from sqlalchemy import event
 
 class TestAdminFunctionality:
 
@@ -377,6 +382,191 @@ class TestAdminFunctionality:
         assert success1 is not None
         assert success2 is not None
 
+    def test_bulk_create_users_uses_set_based_statements(self, authenticated_coordinator, test_db):
+        """Test: A large import runs a fixed handful of statements, not a few per row"""
+        csv_data = [
+            {
+                'email': f'roster{i}@example.com',
+                'firstName': 'Roster',
+                'lastName': f'User{i}',
+                'phone': '(415) 555-6000',
+                'role': 'new_docent'
+            }
+            for i in range(1200)
+        ]
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith(('SELECT', 'INSERT')):
+                statements.append(statement)
+
+        event.listen(test_db.engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            response = authenticated_coordinator.post('/api/users/csv', json=csv_data)
+        finally:
+            event.remove(test_db.engine, 'before_cursor_execute', before_cursor_execute)
+
+        assert response.status_code == 200
+        assert response.get_json() == {'success': 1200, 'errors': []}
+        assert User.query.filter(User.email.like('roster%')).count() == 1200
+        # Session lookup, three email lookups, three INSERT batches
+        assert len(statements) <= 10
+
+    def test_bulk_created_users_cannot_log_in_until_reset(self, authenticated_coordinator, test_db):
+        """Test: Imported users get an unusable password rather than a random one"""
+        authenticated_coordinator.post('/api/users/csv', json=[{
+            'email': 'imported@example.com',
+            'firstName': 'Imported',
+            'lastName': 'User',
+            'role': 'new_docent'
+        }])
+
+        user = User.query.filter_by(email='imported@example.com').one()
+        assert user.password == '!'
+
+        response = authenticated_coordinator.post('/api/login', json={
+            'email': 'imported@example.com',
+            'password': '!'
+        })
+        assert response.status_code == 401
+
+    def test_bulk_create_users_reports_malformed_values_per_row(self, authenticated_coordinator, test_db):
+        """Test: Unhashable or non-text values fail their own row, and duplicates ignore case and spaces"""
+        rows = [
+            {'email': ['list@example.com'], 'firstName': 'List', 'lastName': 'User', 'role': 'new_docent'},
+            {'email': 'Mixed@Example.com ', 'firstName': 'Mixed', 'lastName': 'User', 'role': 'new_docent'},
+            {'email': 'mixed@example.com', 'firstName': 'Again', 'lastName': 'User', 'role': 'new_docent'},
+            {'email': 'phone@example.com', 'firstName': 'Phone', 'lastName': 'User', 'phone': 4155550100, 'role': 'new_docent'},
+            {'email': 'dict@example.com', 'firstName': {'first': 'x'}, 'lastName': 'User', 'role': 'new_docent'},
+        ]
+
+        response = authenticated_coordinator.post('/api/users/csv', json=rows)
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['success'] == 2
+        assert [(error['line'], error['error']) for error in data['errors']] == [
+            (1, 'Invalid value for email'),
+            (3, 'Email mixed@example.com already registered'),
+            (5, 'Invalid value for firstName'),
+        ]
+        assert User.query.filter_by(email='Mixed@Example.com').one().first_name == 'Mixed'
+        assert User.query.filter_by(email='phone@example.com').one().phone == '4155550100'
+
+    def test_bulk_create_users_rejects_non_list_body(self, authenticated_coordinator, test_db):
+        """Test: The import expects a JSON list of users"""
+        response = authenticated_coordinator.post('/api/users/csv', json={'email': 'x@example.com'})
+
+        assert response.status_code == 400
+
+    def test_bulk_create_users_from_streamed_csv(self, app, authenticated_coordinator, test_db):
+        """Test: A raw CSV upload is imported in chunks with progress streamed back"""
+        app.config['USER_IMPORT_CHUNK_SIZE'] = 2
+        csv_body = (
+            'email,firstName,lastName,phone,role\n'
+            'csv1@example.com,Csv,One,(415) 555-7001,new_docent\n'
+            'csv2@example.com,Csv,Two,,seasoned_docent\n'
+            'csv1@example.com,Csv,Again,,new_docent\n'
+            'csv3@example.com,Csv,Three,,invalid_role\n'
+            '"csv4@example.com","Csv","Four, Jr.",,new_docent\n'
+        )
+
+        response = authenticated_coordinator.post('/api/users/csv', data=csv_body, content_type='text/csv')
+
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert [line['processed'] for line in lines] == [2, 4, 5, 5]
+        assert lines[-1] == {'done': True, 'processed': 5, 'success': 3, 'failed': 2}
+
+        errors = [error for line in lines[:-1] for error in line['errors']]
+        assert [(error['line'], error['email']) for error in errors] == [
+            (4, 'csv1@example.com'),
+            (5, 'csv3@example.com')
+        ]
+        assert 'already registered' in errors[0]['error']
+
+        user = User.query.filter_by(email='csv4@example.com').one()
+        assert user.last_name == 'Four, Jr.'
+        assert User.query.filter_by(email='csv2@example.com').one().phone is None
+
+    def test_bulk_create_users_from_multipart_csv(self, authenticated_coordinator, test_db):
+        """Test: The CSV can also be sent as a multipart file upload"""
+        csv_body = b'\xef\xbb\xbfemail,firstName,lastName,role\r\nfile@example.com,File,Upload,new_docent\r\n'
+
+        response = authenticated_coordinator.post(
+            '/api/users/csv',
+            data={'file': (io.BytesIO(csv_body), 'roster.csv')},
+            content_type='multipart/form-data'
+        )
+
+        assert response.status_code == 200
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert lines[-1]['success'] == 1
+        assert User.query.filter_by(email='file@example.com').one() is not None
+
+    def test_streamed_csv_rejects_case_only_duplicates(self, app, authenticated_coordinator, test_db):
+        """Test: A CSV email repeated with different case fails, even in a later chunk"""
+        app.config['USER_IMPORT_CHUNK_SIZE'] = 1
+        csv_body = (
+            'email,firstName,lastName,role\n'
+            'Case@Example.com,Case,One,new_docent\n'
+            'case@example.COM,Case,Two,new_docent\n'
+        )
+
+        response = authenticated_coordinator.post('/api/users/csv', data=csv_body, content_type='text/csv')
+
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert lines[-1] == {'done': True, 'processed': 2, 'success': 1, 'failed': 1}
+        assert [(error['line'], error['email']) for error in lines[1]['errors']] == [(3, 'case@example.COM')]
+        assert User.query.filter(db.func.lower(User.email) == 'case@example.com').count() == 1
+
+    def test_concurrent_import_conflict_fails_the_batch(self, app, authenticated_coordinator, test_db):
+        """Test: An email registered after the duplicate lookup fails its batch instead of the response"""
+        app.config['USER_IMPORT_CHUNK_SIZE'] = 2
+        csv_body = (
+            'email,firstName,lastName,role\n'
+            'race@example.com,Race,One,new_docent\n'
+            'fresh@example.com,Fresh,One,new_docent\n'
+            'later@example.com,Later,One,new_docent\n'
+        )
+        authenticated_coordinator.post('/api/users/csv', json=[
+            {'email': 'race@example.com', 'firstName': 'Race', 'lastName': 'Winner', 'role': 'new_docent'}
+        ])
+
+        # The other import commits between this import's lookup and its INSERT
+        with patch.object(UserRepository, 'get_existing_emails', return_value=set()):
+            response = authenticated_coordinator.post('/api/users/csv', data=csv_body, content_type='text/csv')
+
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert lines[-1] == {'done': True, 'processed': 3, 'success': 1, 'failed': 2}
+        assert [error['line'] for error in lines[0]['errors']] == [2, 3]
+        assert 'another import' in lines[0]['errors'][0]['error']
+        assert User.query.filter_by(email='race@example.com').one().last_name == 'Winner'
+        assert User.query.filter_by(email='fresh@example.com').count() == 0
+        assert User.query.filter_by(email='later@example.com').count() == 1
+
+    def test_streamed_csv_requires_header_columns(self, authenticated_coordinator, test_db):
+        """Test: A CSV without the required columns is rejected before importing"""
+        response = authenticated_coordinator.post(
+            '/api/users/csv',
+            data='email,name\nx@example.com,X\n',
+            content_type='text/csv'
+        )
+
+        assert response.status_code == 400
+        assert 'firstName' in response.get_json()['error']
+
+    def test_coordinator_can_view_email_stats(self, authenticated_coordinator, test_db):
+        """Test: Coordinator can see outbox queue depth and send counters"""
+        response = authenticated_coordinator.get('/api/email-stats')
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['queueDepth'] == 0
+        for key in ('sent', 'failed', 'deferred', 'throttled', 'retried', 'sendRate', 'maxSendRate'):
+            assert key in data
+
     def test_new_docent_cannot_access_user_management_endpoints(self, authenticated_new_docent):
         """Test: New docent cannot access any user management endpoints"""
         # Test GET /api/users (view all users)
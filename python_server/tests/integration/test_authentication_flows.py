@@ -2,7 +2,9 @@ import pytest
 from datetime import datetime, timedelta
 from unittest.mock import patch
 from domain.users.user_model import User, PasswordResetToken
+from domain.email.email_model import OutboxEmail
 from db_config import db
+from passlib.hash import pbkdf2_sha256
 
 class TestAuthenticationFlows:
 
@@ -127,8 +129,22 @@ class TestAuthenticationFlows:
         user = User.query.filter_by(email='newdocent@example.com').first()
         assert user.failed_login_attempts == 0
 
-    @patch('domain.users.user_service.send_password_reset_email')
-    def test_password_reset_request_existing_user(self, mock_email, test_client, test_db, new_docent_user):
+    def test_login_upgrades_outdated_password_hash(self, test_client, test_db, new_docent_user):
+        """Test: Logging in re-hashes a password stored with outdated parameters"""
+        new_docent_user.password = pbkdf2_sha256.using(rounds=1000).hash('password123')
+        db.session.commit()
+
+        response = test_client.post('/api/login', json={
+            'email': 'newdocent@example.com',
+            'password': 'password123'
+        })
+
+        assert response.status_code == 200
+        user = User.query.filter_by(email='newdocent@example.com').first()
+        assert not user.password_needs_rehash()
+        assert user.verify_password('password123')
+
+    def test_password_reset_request_existing_user(self, test_client, test_db, new_docent_user):
         """Test: Password reset request for existing user"""
         response = test_client.post('/api/request-password-reset', json={
             'email': 'newdocent@example.com'
@@ -144,11 +160,14 @@ class TestAuthenticationFlows:
         assert not token.used
         assert token.expires_at > datetime.utcnow()
 
-        # Verify email was sent
-        mock_email.assert_called_once()
+        # Verify the email was queued with the token's link
+        emails = OutboxEmail.query.all()
+        assert len(emails) == 1
+        assert emails[0].kind == 'password_reset'
+        assert emails[0].get_recipients() == ['newdocent@example.com']
+        assert token.token in emails[0].text_body
 
-    @patch('domain.users.user_service.send_password_reset_email')
-    def test_password_reset_request_nonexistent_user(self, mock_email, test_client, test_db):
+    def test_password_reset_request_nonexistent_user(self, test_client, test_db):
         """Test: Password reset request for non-existent user (should still return success)"""
         response = test_client.post('/api/request-password-reset', json={
             'email': 'nonexistent@example.com'
@@ -159,8 +178,8 @@ class TestAuthenticationFlows:
         data = response.get_json()
         assert data['success'] is True
 
-        # But no email should be sent
-        mock_email.assert_not_called()
+        # But no email should be queued
+        assert OutboxEmail.query.count() == 0
 
     def test_password_reset_with_valid_token(self, test_client, test_db, new_docent_user):
         """Test: Password reset with valid token"""
@@ -0,0 +1,82 @@
+import pytest
+from datetime import date, timedelta
+from domain.tags.tag_model import TagRequest
+
+START = date.today() + timedelta(days=1)
+
+@pytest.fixture
+def tag_requests(test_db, new_docent_user, second_new_docent_user, seasoned_docent_user):
+    day1, day2 = START, START + timedelta(days=1)
+    rows = [
+        (day1, 'AM', 'requested', new_docent_user, None),
+        (day1, 'PM', 'filled', new_docent_user, seasoned_docent_user),
+        (day1, 'AM', 'requested', second_new_docent_user, None),
+        (day2, 'PM', 'filled', second_new_docent_user, seasoned_docent_user),
+        (START + timedelta(days=40), 'AM', 'requested', new_docent_user, None),
+    ]
+    tags = [TagRequest(date=day, time_slot=slot, status=status, new_docent_id=new.id,
+                       seasoned_docent_id=seasoned.id if seasoned else None)
+            for day, slot, status, new, seasoned in rows]
+    test_db.session.add_all(tags)
+    test_db.session.commit()
+    return tags
+
+def calendar(client, start=START, days=30):
+    return client.get(f'/api/tag-requests/calendar?startDate={start.isoformat()}'
+                      f'&endDate={(start + timedelta(days=days)).isoformat()}')
+
+class TestCalendarCounts:
+
+    def test_coordinator_gets_counts_for_the_window(self, authenticated_coordinator, tag_requests):
+        """Test: Counts are grouped by day, slot and status; days outside the window are left out"""
+        response = calendar(authenticated_coordinator)
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['slots'] == ['AM', 'PM'] and data['statuses'] == ['requested', 'filled']
+        assert data['days'] == {
+            START.isoformat(): {'AM': [2, 0], 'PM': [0, 1]},
+            (START + timedelta(days=1)).isoformat(): {'AM': [0, 0], 'PM': [0, 1]},
+        }
+
+    def test_counts_follow_the_role_scope(self, authenticated_new_docent, tag_requests):
+        """Test: A new docent only counts their own requests"""
+        data = calendar(authenticated_new_docent, days=60).get_json()
+
+        assert data['days'] == {
+            START.isoformat(): {'AM': [1, 0], 'PM': [0, 1]},
+            (START + timedelta(days=40)).isoformat(): {'AM': [1, 0], 'PM': [0, 0]},
+        }
+
+    def test_one_query_for_the_counts(self, app, authenticated_coordinator, tag_requests):
+        """Test: The matrix comes from a single GROUP BY over tag_requests"""
+        from sqlalchemy import event
+        from db_config import db
+        statements = []
+        record = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            calendar(authenticated_coordinator)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+
+        tag_queries = [s for s in statements if 'FROM tag_requests' in s]
+        assert len(tag_queries) == 1 and 'GROUP BY' in tag_queries[0]
+
+    @pytest.mark.parametrize('query', [
+        '',
+        'startDate=2025-01-01',
+        'startDate=2025-02-01&endDate=2025-01-01',
+        'startDate=2025-01-01&endDate=2026-06-01',
+    ])
+    def test_window_is_validated(self, authenticated_coordinator, test_db, query):
+        """Test: Missing, reversed or over-long windows are a 400"""
+        assert authenticated_coordinator.get(f'/api/tag-requests/calendar?{query}').status_code == 400
+
+    def test_unchanged_calendar_revalidates_with_304(self, authenticated_coordinator, tag_requests):
+        """Test: The calendar carries a table-version ETag like the lists"""
+        etag = calendar(authenticated_coordinator).headers['ETag']
+
+        url = (f'/api/tag-requests/calendar?startDate={START.isoformat()}'
+               f'&endDate={(START + timedelta(days=30)).isoformat()}')
+        assert authenticated_coordinator.get(url, headers={'If-None-Match': etag}).status_code == 304
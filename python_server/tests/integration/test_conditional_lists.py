@@ -0,0 +1,148 @@
+import gzip
+import pytest
+from datetime import date, timedelta
+from sqlalchemy import delete, event, insert
+from domain.tags.tag_model import TagRequest
+from domain.users.user_model import User
+from db_config import db
+import table_versions
+from table_versions import MissingVersionRow, TableVersion, current_versions
+
+@pytest.fixture
+def tag_request(test_db, new_docent_user):
+    tag = TagRequest(date=date.today() + timedelta(days=3), time_slot='AM',
+                     status='requested', new_docent_id=new_docent_user.id)
+    test_db.session.add(tag)
+    test_db.session.commit()
+    return tag
+
+def revalidate(client, url, etag, **headers):
+    return client.get(url, headers={'If-None-Match': etag, **headers})
+
+class TestConditionalLists:
+
+    def test_unchanged_list_is_not_modified(self, authenticated_coordinator, tag_request):
+        """Test: A matching If-None-Match gets a 304 without querying tag_requests"""
+        first = authenticated_coordinator.get('/api/tag-requests')
+        assert first.status_code == 200
+        assert first.headers['Cache-Control'] == 'private, no-cache'
+
+        statements = []
+        record = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            second = revalidate(authenticated_coordinator, '/api/tag-requests', first.headers['ETag'])
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+
+        assert second.status_code == 304
+        assert second.data == b''
+        assert second.headers['ETag'] == first.headers['ETag']
+        assert not [s for s in statements if 'FROM tag_requests' in s]
+
+    def test_writes_change_the_etag(self, authenticated_new_docent, tag_request):
+        """Test: Creating a tag request makes the old ETag stale"""
+        etag = authenticated_new_docent.get('/api/my-tag-requests').headers['ETag']
+
+        authenticated_new_docent.post('/api/tag-requests', json={
+            'date': (date.today() + timedelta(days=9)).isoformat(),
+            'timeSlot': 'PM'
+        })
+        response = revalidate(authenticated_new_docent, '/api/my-tag-requests', etag)
+
+        assert response.status_code == 200
+        assert len(response.get_json()) == 2
+        assert response.headers['ETag'] != etag
+
+    def test_statement_updates_bump_the_version(self, authenticated_seasoned_docent, tag_request):
+        """Test: Claiming a tag (a bulk UPDATE, not a flush) bumps tag_requests"""
+        before = current_versions(('tag_requests',))
+
+        response = authenticated_seasoned_docent.patch(f'/api/tag-requests/{tag_request.id}', json={'status': 'filled'})
+
+        assert response.status_code == 200
+        assert current_versions(('tag_requests',))[0] == before[0] + 1
+
+    def test_user_changes_invalidate_tag_lists(self, authenticated_coordinator, tag_request, new_docent_user):
+        """Test: Tag lists embed docents, so a user edit changes their ETag"""
+        etag = authenticated_coordinator.get('/api/tag-requests').headers['ETag']
+
+        new_docent_user.phone = '(415) 555-0199'
+        db.session.commit()
+
+        assert revalidate(authenticated_coordinator, '/api/tag-requests', etag).status_code == 200
+
+    def test_bulk_insert_bumps_users(self, test_db):
+        """Test: ORM insert() statements count as writes"""
+        db.session.execute(insert(User), [dict(email='bulk@example.com', first_name='Bulk', last_name='User',
+                                               role='new_docent', password='!')])
+        db.session.commit()
+
+        assert current_versions(('users',)) == (1,)
+
+    def test_rolled_back_writes_do_not_bump(self, test_db, tag_request):
+        """Test: Only committed changes move the version"""
+        before = current_versions(('tag_requests',))
+
+        tag_request.notes = 'never committed'
+        db.session.flush()
+        db.session.rollback()
+
+        assert current_versions(('tag_requests',)) == before
+        assert sum(row.version for row in TableVersion.query.filter_by(name='tag_requests')) == before[0]
+
+    def test_commits_bump_one_shard(self, test_db, tag_request, monkeypatch):
+        """Test: Each commit bumps a single counter row; the version is their sum"""
+        before = current_versions(('tag_requests',))
+        for shard in (2, 5):
+            monkeypatch.setattr(table_versions.random, 'randrange', lambda n, shard=shard: shard)
+            tag_request.notes = f'shard {shard}'
+            db.session.commit()
+
+        shards = {row.shard: row.version for row in TableVersion.query.filter_by(name='tag_requests')}
+        assert len(shards) == table_versions.VERSION_SHARDS
+        assert shards[2] >= 1 and shards[5] >= 1
+        assert current_versions(('tag_requests',)) == (before[0] + 2,)
+
+    def test_missing_counter_rows_are_errors(self, authenticated_coordinator, tag_request, monkeypatch):
+        """Test: A lost counter row fails loudly instead of pinning the ETag"""
+        db.session.execute(delete(TableVersion).where(TableVersion.name == 'tag_requests', TableVersion.shard == 3))
+        db.session.commit()
+
+        with pytest.raises(MissingVersionRow):
+            authenticated_coordinator.get('/api/tag-requests')
+
+        monkeypatch.setattr(table_versions.random, 'randrange', lambda n: 3)
+        tag_request.notes = 'changed'
+        with pytest.raises(MissingVersionRow):
+            db.session.commit()
+        db.session.rollback()
+
+    def test_query_string_and_caller_are_part_of_the_etag(self, app, authenticated_coordinator, tag_request):
+        """Test: Different filters or a different user never share an ETag"""
+        etag = authenticated_coordinator.get('/api/tag-requests').headers['ETag']
+
+        assert revalidate(authenticated_coordinator, '/api/tag-requests?fields=date', etag).status_code == 200
+
+        other = app.test_client()
+        other.post('/api/login', json={'email': 'newdocent@example.com', 'password': 'password123'})
+        assert revalidate(other, '/api/tag-requests', etag).status_code == 200
+
+    def test_compressed_etag_is_accepted(self, app, authenticated_coordinator, tag_request):
+        """Test: The -gzip ETag of a compressed body revalidates too"""
+        app.config['COMPRESS_MIN_SIZE'] = 0
+        first = authenticated_coordinator.get('/api/users', headers={'Accept-Encoding': 'gzip'})
+        assert first.headers['Content-Encoding'] == 'gzip'
+        assert len(gzip.decompress(first.data)) > 0
+
+        second = revalidate(authenticated_coordinator, '/api/users', first.headers['ETag'], **{'Accept-Encoding': 'gzip'})
+
+        assert second.status_code == 304
+        assert second.headers['ETag'] == first.headers['ETag']
+
+    def test_errors_are_not_tagged(self, authenticated_coordinator, test_db):
+        """Test: A 400 carries no ETag"""
+        response = authenticated_coordinator.get('/api/tag-requests?limit=zero')
+
+        assert response.status_code == 400
+        assert 'ETag' not in response.headers
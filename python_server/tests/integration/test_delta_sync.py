@@ -0,0 +1,146 @@
+import pytest
+from datetime import date, datetime, timedelta
+from domain.tags.tag_model import TagRequest, TagRequestTombstone
+from domain.users.user_model import User
+from db_config import db
+
+@pytest.fixture(autouse=True)
+def no_overlap(app):
+    # Cursors normally trail the clock; tests want exact deltas
+    app.config['SYNC_OVERLAP_SECONDS'] = 0
+
+@pytest.fixture
+def tag_requests(test_db, new_docent_user):
+    tags = [
+        TagRequest(date=date.today() + timedelta(days=i + 1), time_slot='AM',
+                   status='requested', new_docent_id=new_docent_user.id)
+        for i in range(3)
+    ]
+    test_db.session.add_all(tags)
+    test_db.session.commit()
+    return tags
+
+def login(app, email):
+    client = app.test_client()
+    client.post('/api/login', json={'email': email, 'password': 'password123'})
+    return client
+
+def sync(client, since, **params):
+    query = '&'.join(f'{key}={value}' for key, value in params.items())
+    response = client.get(f'/api/tag-requests?since={since}' + (f'&{query}' if query else ''))
+    return response
+
+class TestDeltaSync:
+
+    def test_empty_since_returns_everything_and_a_cursor(self, authenticated_coordinator, tag_requests):
+        """Test: since= bootstraps a local copy"""
+        data = sync(authenticated_coordinator, '').get_json()
+
+        assert sorted(item['id'] for item in data['items']) == sorted(tag.id for tag in tag_requests)
+        assert data['deleted'] == []
+        assert datetime.fromisoformat(data['since']) <= datetime.utcnow()
+
+    def test_only_changed_rows_are_returned(self, authenticated_coordinator, tag_requests):
+        """Test: Rows updated after the cursor come back, nothing else"""
+        cursor = sync(authenticated_coordinator, '').get_json()['since']
+
+        tag_requests[1].notes = 'Bring the binder'
+        db.session.commit()
+        data = sync(authenticated_coordinator, cursor).get_json()
+
+        assert [item['id'] for item in data['items']] == [tag_requests[1].id]
+        assert data['items'][0]['notes'] == 'Bring the binder'
+        assert data['deleted'] == []
+        assert sync(authenticated_coordinator, data['since']).get_json()['items'] == []
+
+    def test_deletes_leave_tombstones(self, authenticated_new_docent, tag_requests):
+        """Test: A deleted tag request is reported in `deleted`"""
+        cursor = sync(authenticated_new_docent, '').get_json()['since']
+
+        assert authenticated_new_docent.delete(f'/api/tag-requests/{tag_requests[0].id}').status_code == 200
+        data = sync(authenticated_new_docent, cursor).get_json()
+
+        assert data['deleted'] == [tag_requests[0].id]
+        assert data['items'] == []
+
+    def test_rows_leaving_the_scope_are_dropped(self, authenticated_seasoned_docent, tag_requests, test_db):
+        """Test: An open request filled by someone else disappears from a seasoned docent's copy"""
+        other = User(email='other@example.com', first_name='Other', last_name='Docent',
+                     role='seasoned_docent', password='!')
+        test_db.session.add(other)
+        test_db.session.commit()
+        cursor = sync(authenticated_seasoned_docent, '').get_json()['since']
+
+        tag_requests[2].status = 'filled'
+        tag_requests[2].seasoned_docent_id = other.id
+        test_db.session.commit()
+        data = sync(authenticated_seasoned_docent, cursor).get_json()
+
+        assert data['items'] == []
+        assert data['deleted'] == [tag_requests[2].id]
+
+    def test_tombstones_are_scoped(self, app, authenticated_new_docent, coordinator_user,
+                                   second_new_docent_user, tag_requests):
+        """Test: A deletion is only reported to callers who could see the row"""
+        coordinator = login(app, 'coordinator@example.com')
+        other = login(app, 'newdocent2@example.com')
+        clients = (authenticated_new_docent, coordinator, other)
+        cursors = [sync(client, '').get_json()['since'] for client in clients]
+
+        authenticated_new_docent.delete(f'/api/tag-requests/{tag_requests[0].id}')
+
+        assert [sync(client, cursor).get_json()['deleted'] for client, cursor in zip(clients, cursors)] == [
+            [tag_requests[0].id], [tag_requests[0].id], []
+        ]
+
+    def test_only_rows_the_caller_could_see_are_dropped(self, app, authenticated_seasoned_docent,
+                                                        coordinator_user, tag_requests, test_db):
+        """Test: Changes to rows hidden all along aren't reported; a row that was open is, after any later change"""
+        other = User(email='other@example.com', first_name='Other', last_name='Docent',
+                     role='seasoned_docent', password=User.hash_password('password123'))
+        test_db.session.add(other)
+        test_db.session.flush()
+        tag_requests[0].status = 'filled'
+        tag_requests[0].seasoned_docent_id = other.id
+        test_db.session.commit()
+        coordinator = login(app, 'coordinator@example.com')
+        other_seasoned = login(app, 'other@example.com')
+        cursor = sync(authenticated_seasoned_docent, '').get_json()['since']
+
+        later = (date.today() + timedelta(days=10)).isoformat()
+        # Filled by someone else before the cursor, moved after it
+        coordinator.patch(f'/api/tag-requests/{tag_requests[0].id}', json={'date': later})
+        # Open at the cursor, then claimed by someone else and moved
+        other_seasoned.patch(f'/api/tag-requests/{tag_requests[1].id}', json={'status': 'filled'})
+        coordinator.patch(f'/api/tag-requests/{tag_requests[1].id}', json={'date': later})
+        data = sync(authenticated_seasoned_docent, cursor).get_json()
+
+        assert data['items'] == []
+        assert data['deleted'] == [tag_requests[1].id]
+
+    def test_fields_and_normalized_shape(self, authenticated_coordinator, tag_requests, new_docent_user):
+        """Test: Delta responses honour fields and shape"""
+        data = sync(authenticated_coordinator, '', fields='status,newDocent', shape='normalized').get_json()
+
+        assert {frozenset(item) for item in data['items']} == {frozenset({'id', 'status'})}
+        assert list(data['users']) == [str(new_docent_user.id)]
+
+    def test_expired_cursor_is_gone(self, authenticated_coordinator, tag_requests):
+        """Test: A cursor older than the tombstone retention asks for a full refetch"""
+        old = (datetime.utcnow() - timedelta(days=31)).isoformat()
+
+        assert sync(authenticated_coordinator, old).status_code == 410
+
+    @pytest.mark.parametrize('params', ['since=yesterday', 'since=&limit=10'])
+    def test_invalid_requests(self, authenticated_coordinator, tag_requests, params):
+        """Test: A malformed cursor or since with pagination is a 400"""
+        assert authenticated_coordinator.get(f'/api/tag-requests?{params}').status_code == 400
+
+    def test_old_tombstones_are_pruned(self, authenticated_coordinator, tag_requests, test_db):
+        """Test: Deleting prunes tombstones past SYNC_TOMBSTONE_DAYS"""
+        test_db.session.add(TagRequestTombstone(tag_request_id=9999, left_at=datetime.utcnow() - timedelta(days=40)))
+        test_db.session.commit()
+
+        authenticated_coordinator.delete(f'/api/tag-requests/{tag_requests[0].id}')
+
+        assert [t.tag_request_id for t in TagRequestTombstone.query.all()] == [tag_requests[0].id]
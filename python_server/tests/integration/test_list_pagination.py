@@ -0,0 +1,89 @@
+import pytest
+from datetime import date, timedelta
+from domain.tags.tag_model import TagRequest
+from domain.users.user_model import User
+from db_config import db
+
+def walk_pages(client, url, limit):
+    """Follow `next` cursors until exhausted and return every page"""
+    pages = []
+    response = client.get(f'{url}?limit={limit}')
+    while True:
+        assert response.status_code == 200
+        data = response.get_json()
+        pages.append(data['items'])
+        if not data['next']:
+            return pages
+        response = client.get(f'{url}?limit={limit}&cursor={data["next"]}')
+
+class TestListPagination:
+
+    @pytest.fixture
+    def tag_requests(self, test_db, new_docent_user):
+        # Several requests share a date so the id tiebreaker is exercised
+        tags = []
+        for i in range(7):
+            tags.append(TagRequest(
+                date=date.today() + timedelta(days=i // 2),
+                time_slot='AM' if i % 2 == 0 else 'PM',
+                status='requested',
+                new_docent_id=new_docent_user.id
+            ))
+        test_db.session.add_all(tags)
+        test_db.session.commit()
+        return tags
+
+    def test_unpaginated_response_is_a_plain_list(self, authenticated_coordinator, tag_requests):
+        """Test: Without limit/cursor the endpoint keeps returning a JSON array"""
+        response = authenticated_coordinator.get('/api/tag-requests')
+
+        assert response.status_code == 200
+        assert len(response.get_json()) == 7
+
+    def test_coordinator_pages_through_tag_requests(self, authenticated_coordinator, tag_requests):
+        """Test: Cursor pages cover every tag request once, ordered by date then id"""
+        pages = walk_pages(authenticated_coordinator, '/api/tag-requests', 3)
+
+        assert [len(page) for page in pages] == [3, 3, 1]
+        items = [item for page in pages for item in page]
+        assert [(item['date'], item['id']) for item in items] == \
+            sorted((tag.date.isoformat(), tag.id) for tag in tag_requests)
+
+    def test_new_docent_pages_through_my_tag_requests(self, authenticated_new_docent, tag_requests):
+        """Test: /api/my-tag-requests supports the same cursor pagination"""
+        pages = walk_pages(authenticated_new_docent, '/api/my-tag-requests', 4)
+
+        assert [len(page) for page in pages] == [4, 3]
+
+    def test_coordinator_pages_through_users(self, authenticated_coordinator, test_db):
+        """Test: /api/users pages are ordered by id and end with a null cursor"""
+        for i in range(4):
+            db.session.add(User(
+                email=f'docent{i}@example.com',
+                first_name='Docent',
+                last_name=str(i),
+                role='new_docent',
+                password='not-a-real-hash'
+            ))
+        db.session.commit()
+
+        pages = walk_pages(authenticated_coordinator, '/api/users', 2)
+
+        ids = [user['id'] for page in pages for user in page]
+        assert ids == sorted(ids)
+        assert len(ids) == User.query.count()
+
+    def test_page_size_is_capped(self, app, authenticated_coordinator, tag_requests):
+        """Test: Requested page sizes above PAGE_SIZE_MAX are clamped"""
+        app.config['PAGE_SIZE_MAX'] = 2
+
+        response = authenticated_coordinator.get('/api/tag-requests?limit=1000')
+
+        assert len(response.get_json()['items']) == 2
+
+    def test_invalid_cursor_is_rejected(self, authenticated_coordinator, tag_requests):
+        """Test: A malformed cursor returns 400 instead of a server error"""
+        response = authenticated_coordinator.get('/api/tag-requests?cursor=not-a-cursor')
+
+        assert response.status_code == 400
+        assert 'Invalid cursor' in response.get_json()['error']
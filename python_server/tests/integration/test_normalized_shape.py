@@ -0,0 +1,46 @@
+import pytest
+from datetime import date, timedelta
+from domain.tags.tag_model import TagRequest
+
+class TestNormalizedShape:
+
+    @pytest.fixture
+    def tag_requests(self, test_db, new_docent_user, seasoned_docent_user):
+        tags = [
+            TagRequest(date=date.today() + timedelta(days=i), time_slot='AM',
+                       status='filled' if i % 2 else 'requested',
+                       new_docent_id=new_docent_user.id,
+                       seasoned_docent_id=seasoned_docent_user.id if i % 2 else None)
+            for i in range(6)
+        ]
+        test_db.session.add_all(tags)
+        test_db.session.commit()
+        return tags
+
+    def test_users_are_sent_once(self, authenticated_coordinator, tag_requests, new_docent_user, seasoned_docent_user):
+        """Test: shape=normalized replaces embedded docents with a users map"""
+        embedded = authenticated_coordinator.get('/api/tag-requests').get_json()
+        response = authenticated_coordinator.get('/api/tag-requests?shape=normalized')
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert set(data['users']) == {str(new_docent_user.id), str(seasoned_docent_user.id)}
+        assert data['users'][str(seasoned_docent_user.id)]['role'] == 'seasoned_docent'
+        assert 'next' not in data
+        for row, full in zip(data['items'], embedded):
+            assert 'newDocent' not in row and 'seasonedDocent' not in row
+            assert row == {k: v for k, v in full.items() if k not in ('newDocent', 'seasonedDocent')}
+
+    def test_normalized_pages(self, authenticated_new_docent, tag_requests, new_docent_user):
+        """Test: Paginated normalized responses keep the next cursor"""
+        data = authenticated_new_docent.get('/api/my-tag-requests?shape=normalized&limit=4').get_json()
+
+        assert len(data['items']) == 4
+        assert data['next']
+        assert str(new_docent_user.id) in data['users']
+
+    def test_unknown_shape_is_rejected(self, authenticated_coordinator, tag_requests):
+        """Test: An unsupported shape is a 400 rather than silently ignored"""
+        response = authenticated_coordinator.get('/api/tag-requests?shape=flat')
+
+        assert response.status_code == 400
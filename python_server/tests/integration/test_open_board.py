@@ -0,0 +1,150 @@
+import pytest
+from datetime import date, timedelta
+from sqlalchemy import event, update
+from domain.tags.tag_model import TagRequest
+from domain.tags.tag_repository import TagRequestRepository
+from domain.users.user_model import User
+from db_config import db
+
+DAY = date.today() + timedelta(days=5)
+
+@pytest.fixture
+def rebuilds(monkeypatch):
+    """Counts the times the board is loaded from the database"""
+    calls = []
+    load = TagRequestRepository.get_open_tag_requests
+    monkeypatch.setattr(TagRequestRepository, 'get_open_tag_requests', staticmethod(lambda: calls.append(1) or load()))
+    return calls
+
+@pytest.fixture
+def tag_requests(test_db, new_docent_user, second_new_docent_user, seasoned_docent_user, coordinator_user):
+    other_seasoned = User(email='seasoned2@example.com', first_name='Other', last_name='Seasoned',
+                          role='seasoned_docent', password=User.hash_password('password123'))
+    db.session.add(other_seasoned)
+    db.session.flush()
+    tags = [
+        TagRequest(date=DAY, time_slot='AM', status='requested', new_docent_id=new_docent_user.id),
+        TagRequest(date=DAY, time_slot='PM', status='filled', new_docent_id=new_docent_user.id,
+                   seasoned_docent_id=seasoned_docent_user.id),
+        TagRequest(date=DAY + timedelta(days=1), time_slot='AM', status='filled',
+                   new_docent_id=second_new_docent_user.id, seasoned_docent_id=other_seasoned.id),
+        TagRequest(date=DAY + timedelta(days=40), time_slot='PM', status='requested',
+                   new_docent_id=second_new_docent_user.id),
+    ]
+    db.session.add_all(tags)
+    db.session.commit()
+    return tags
+
+def login(app, email):
+    client = app.test_client()
+    client.post('/api/login', json={'email': email, 'password': 'password123'})
+    return client
+
+def board_ids(client, query=''):
+    response = client.get(f'/api/tag-requests?{query}')
+    assert response.status_code == 200
+    return [tag['id'] for tag in response.get_json()]
+
+class TestOpenRequestBoard:
+
+    @pytest.mark.parametrize('query', [
+        '',
+        f'startDate={DAY.isoformat()}&endDate={(DAY + timedelta(days=30)).isoformat()}',
+        'fields=date,timeSlot,newDocent',
+    ])
+    def test_matches_the_database_listing(self, app, authenticated_seasoned_docent, tag_requests, query):
+        """Test: The board serves the same rows as the SQL query, ordered by date and id"""
+        from_board = authenticated_seasoned_docent.get(f'/api/tag-requests?{query}').get_json()
+        app.config['OPEN_BOARD_CACHE'] = False
+        from_sql = authenticated_seasoned_docent.get(f'/api/tag-requests?{query}').get_json()
+
+        assert from_board == sorted(from_sql, key=lambda tag: tag['id'])
+        # Another docent's filled tag stays out
+        assert tag_requests[0].id in {tag['id'] for tag in from_board}
+        assert tag_requests[2].id not in {tag['id'] for tag in from_board}
+
+    def test_open_requests_are_not_queried_again(self, app, authenticated_seasoned_docent, tag_requests, rebuilds):
+        """Test: After the first load only the docent's own tags are queried"""
+        authenticated_seasoned_docent.get('/api/tag-requests')
+        statements = []
+        record = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            authenticated_seasoned_docent.get('/api/tag-requests')
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+
+        assert len(rebuilds) == 1
+        tag_queries = [s for s in statements if 'FROM tag_requests' in s]
+        assert len(tag_queries) == 1 and ' OR ' not in tag_queries[0]
+
+    def test_local_writes_are_applied_in_place(self, app, authenticated_seasoned_docent, tag_requests,
+                                               coordinator_user, rebuilds):
+        """Test: Creates, coordinator moves, claims and deletes update the board without a reload"""
+        new_docent = login(app, 'newdocent@example.com')
+        coordinator = login(app, 'coordinator@example.com')
+        other_seasoned = login(app, 'seasoned2@example.com')
+        board_ids(authenticated_seasoned_docent)
+
+        created = new_docent.post('/api/tag-requests', json={
+            'date': (DAY + timedelta(days=2)).isoformat(), 'timeSlot': 'PM'
+        }).get_json()
+        assert created['id'] in board_ids(authenticated_seasoned_docent)
+
+        coordinator.patch(f'/api/tag-requests/{created["id"]}', json={'date': (DAY + timedelta(days=60)).isoformat()})
+        window = f'startDate={DAY.isoformat()}&endDate={(DAY + timedelta(days=30)).isoformat()}'
+        assert created['id'] not in board_ids(authenticated_seasoned_docent, window)
+        moved = [tag for tag in authenticated_seasoned_docent.get('/api/tag-requests').get_json() if tag['id'] == created['id']]
+        assert moved[0]['date'] == (DAY + timedelta(days=60)).isoformat()
+        assert moved[0]['newDocent']['email'] == 'newdocent@example.com'
+
+        other_seasoned.patch(f'/api/tag-requests/{tag_requests[0].id}', json={'status': 'filled'})
+        assert tag_requests[0].id not in board_ids(authenticated_seasoned_docent)
+
+        new_docent.delete(f'/api/tag-requests/{created["id"]}')
+        assert board_ids(authenticated_seasoned_docent) == [tag_requests[1].id, tag_requests[3].id]
+        assert len(rebuilds) == 1
+
+    def test_local_writes_are_not_read_back(self, app, authenticated_seasoned_docent, tag_requests, coordinator_user):
+        """Test: Applying a write costs no query beyond the ones the route makes anyway"""
+        coordinator = login(app, 'coordinator@example.com')
+        board_ids(authenticated_seasoned_docent)
+        statements = []
+        record = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            coordinator.patch(f'/api/tag-requests/{tag_requests[0].id}', json={'notes': 'Meet at the gate'})
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+
+        # Only the route's own load of the tag
+        assert len([s for s in statements if s.lstrip().startswith('SELECT') and 'FROM tag_requests' in s]) == 1
+        rows = authenticated_seasoned_docent.get('/api/tag-requests').get_json()
+        assert rows[0]['notes'] == 'Meet at the gate'
+
+    def test_writes_outside_the_board_trigger_a_reload(self, app, authenticated_seasoned_docent, tag_requests, rebuilds):
+        """Test: A write it wasn't told about (another worker, a user change) makes the board reload"""
+        board_ids(authenticated_seasoned_docent)
+
+        db.session.execute(update(TagRequest).where(TagRequest.id == tag_requests[3].id).values(status='filled'))
+        db.session.commit()
+        assert tag_requests[3].id not in board_ids(authenticated_seasoned_docent)
+
+        user = db.session.get(User, tag_requests[0].new_docent_id)
+        user.first_name = 'Renamed'
+        db.session.commit()
+        rows = authenticated_seasoned_docent.get('/api/tag-requests').get_json()
+        assert rows[0]['newDocent']['firstName'] == 'Renamed'
+        assert len(rebuilds) == 3
+
+    def test_rolled_back_writes_leave_the_board_alone(self, app, authenticated_seasoned_docent, tag_requests, rebuilds):
+        """Test: Only committed changes reach the board"""
+        board_ids(authenticated_seasoned_docent)
+
+        tag = db.session.get(TagRequest, tag_requests[0].id)
+        tag.status = 'filled'
+        TagRequestRepository.record_event('updated', tag)
+        db.session.rollback()
+
+        assert tag_requests[0].id in board_ids(authenticated_seasoned_docent)
+        assert len(rebuilds) == 1
@@ -0,0 +1,123 @@
+import pytest
+from datetime import date, timedelta
+from sqlalchemy import event
+from db_config import db
+from domain.tags.tag_model import TagRequest
+from domain.users.user_model import User
+
+@pytest.fixture
+def user_lookups(app, test_db):
+    """Record primary-key lookups of the users table made while the fixture is active"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().startswith('SELECT') and 'FROM users' in statement and 'users.id = ?' in statement:
+            statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    yield statements
+    event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+def login(client, email):
+    response = client.post('/api/login', json={'email': email, 'password': 'password123'})
+    assert response.status_code == 200
+    return client
+
+class TestRequestIdentity:
+
+    def test_role_check_and_handler_share_one_user_lookup(self, authenticated_coordinator, new_docent_user, user_lookups):
+        """Test: role_required and the handler load the current user once per request"""
+        tag_request = TagRequest(
+            date=date.today() + timedelta(days=3),
+            time_slot='AM',
+            status='requested',
+            new_docent_id=new_docent_user.id
+        )
+        db.session.add(tag_request)
+        db.session.commit()
+        tag_id = tag_request.id
+        db.session.expunge_all()
+        del user_lookups[:]
+
+        response = authenticated_coordinator.patch(f'/api/tag-requests/{tag_id}', json={'notes': 'Meet at the gate'})
+
+        assert response.status_code == 200
+        # One lookup for the coordinator, one for the embedded new docent
+        assert len(user_lookups) <= 2
+
+    def test_cached_role_skips_the_user_query(self, app, authenticated_coordinator, user_lookups):
+        """Test: With the session role cache enabled, role checks don't query the user"""
+        app.config['AUTH_ROLE_CACHE_SECONDS'] = 300
+        authenticated_coordinator.get('/api/user')  # populates the cache
+        db.session.expunge_all()
+        del user_lookups[:]
+
+        response = authenticated_coordinator.get('/api/email-stats')
+
+        assert response.status_code == 200
+        assert user_lookups == []
+
+    def test_role_change_invalidates_cached_role(self, app, authenticated_coordinator, seasoned_docent_user):
+        """Test: Demoting a user takes effect on their next request despite the cache"""
+        app.config['AUTH_ROLE_CACHE_SECONDS'] = 300
+        second_coordinator = User(
+            email='coordinator2@example.com',
+            first_name='Second',
+            last_name='Coordinator',
+            role='coordinator',
+            password=User.hash_password('password123')
+        )
+        db.session.add(second_coordinator)
+        db.session.commit()
+        other_client = login(app.test_client(), 'coordinator2@example.com')
+        assert other_client.get('/api/email-stats').status_code == 200
+
+        response = authenticated_coordinator.patch(f'/api/users/{second_coordinator.id}', json={'role': 'seasoned_docent'})
+        assert response.status_code == 200
+
+        assert other_client.get('/api/email-stats').status_code == 403
+
+    def test_deleted_user_session_is_rejected(self, app, authenticated_coordinator, test_db):
+        """Test: A session for a deleted user no longer passes role checks"""
+        app.config['AUTH_ROLE_CACHE_SECONDS'] = 300
+        doomed = User(
+            email='doomed@example.com',
+            first_name='Doomed',
+            last_name='Coordinator',
+            role='coordinator',
+            password=User.hash_password('password123')
+        )
+        db.session.add(doomed)
+        db.session.commit()
+        other_client = login(app.test_client(), 'doomed@example.com')
+        assert other_client.get('/api/email-stats').status_code == 200
+
+        assert authenticated_coordinator.delete(f'/api/users/{doomed.id}').status_code == 200
+
+        assert other_client.get('/api/email-stats').status_code == 403
+
+    def test_role_change_in_another_process_invalidates_cached_role(self, app, authenticated_coordinator):
+        """Test: The role stamp lives in the database, so a change committed elsewhere is seen at once"""
+        from sqlalchemy import update
+        from table_versions import TableVersion
+        app.config['AUTH_ROLE_CACHE_SECONDS'] = 300
+        authenticated_coordinator.get('/api/user')  # populates the cache
+        # Another worker demotes the user: the row and the stamp change, this process's memory doesn't
+        db.session.execute(update(User).where(User.email == 'coordinator@example.com').values(role='seasoned_docent'))
+        db.session.execute(update(TableVersion).where(TableVersion.name == 'user_roles').values(version=TableVersion.version + 1))
+        db.session.commit()
+
+        assert authenticated_coordinator.get('/api/email-stats').status_code == 403
+
+    def test_valid_role_cache_is_not_rewritten(self, app, authenticated_coordinator):
+        """Test: The session entry is only written when missing or stale, not on every request"""
+        app.config['AUTH_ROLE_CACHE_SECONDS'] = 300
+        authenticated_coordinator.get('/api/user')
+        with authenticated_coordinator.session_transaction() as sess:
+            cached_at = sess['role_cache']['cached_at']
+
+        authenticated_coordinator.get('/api/user')
+        authenticated_coordinator.get('/api/email-stats')
+
+        with authenticated_coordinator.session_transaction() as sess:
+            assert sess['role_cache']['cached_at'] == cached_at
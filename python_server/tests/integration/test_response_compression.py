@@ -0,0 +1,62 @@
+import gzip
+import json
+import pytest
+from sqlalchemy import insert
+from db_config import db
+from domain.users.user_model import User
+import compression
+
+@pytest.fixture
+def roster(test_db):
+    db.session.execute(insert(User), [
+        dict(email=f'roster{i}@example.com', first_name='Roster', last_name=f'User{i}',
+             phone='(415) 555-0100', role='new_docent', password='!')
+        for i in range(50)
+    ])
+    db.session.commit()
+
+class TestResponseCompression:
+
+    def test_large_json_is_gzipped(self, authenticated_coordinator, roster):
+        """Test: A large list is gzipped for clients that accept it"""
+        plain = authenticated_coordinator.get('/api/users')
+        response = authenticated_coordinator.get('/api/users', headers={'Accept-Encoding': 'gzip'})
+
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.headers['Vary']
+        assert int(response.headers['Content-Length']) < len(plain.data) / 3
+        assert json.loads(gzip.decompress(response.data)) == plain.get_json()
+
+    def test_brotli_is_preferred_when_available(self, authenticated_coordinator, roster):
+        """Test: br is chosen over gzip when both are accepted"""
+        if compression.brotli is None:
+            pytest.skip('brotli not installed')
+
+        response = authenticated_coordinator.get('/api/users', headers={'Accept-Encoding': 'gzip, br'})
+
+        assert response.headers['Content-Encoding'] == 'br'
+        assert len(json.loads(compression.brotli.decompress(response.data))) == 51
+
+    def test_identity_without_accept_encoding(self, authenticated_coordinator, roster):
+        """Test: Clients that don't ask for compression get plain JSON"""
+        response = authenticated_coordinator.get('/api/users')
+
+        assert 'Content-Encoding' not in response.headers
+        assert len(response.get_json()) == 51
+
+    def test_small_responses_are_not_compressed(self, test_client):
+        """Test: Payloads under COMPRESS_MIN_SIZE go out as is"""
+        response = test_client.get('/api/health', headers={'Accept-Encoding': 'gzip'})
+
+        assert 'Content-Encoding' not in response.headers
+        assert response.get_json()['status'] == 'healthy'
+
+    def test_threshold_and_level_are_configurable(self, app, authenticated_coordinator, test_db):
+        """Test: Lowering the threshold compresses small payloads too"""
+        app.config['COMPRESS_MIN_SIZE'] = 0
+        app.config['COMPRESS_GZIP_LEVEL'] = 1
+
+        response = authenticated_coordinator.get('/api/user', headers={'Accept-Encoding': 'gzip'})
+
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert json.loads(gzip.decompress(response.data))['role'] == 'coordinator'
@@ -0,0 +1,141 @@
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from db_config import db
+from session_store import SessionRecord, prune_expired_sessions
+from tests.conftest import create_test_app
+
+@pytest.fixture(params=['sql', 'cookie'])
+def backend_app(request):
+    app = create_test_app({'SESSION_TYPE': request.param})
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+@pytest.fixture
+def sql_app():
+    app = create_test_app({'SESSION_TYPE': 'sql'})
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+def add_user(role='new_docent'):
+    from domain.users.user_model import User
+    user = User(
+        email='session@example.com',
+        first_name='Session',
+        last_name='User',
+        role=role,
+        password=User.hash_password('password123')
+    )
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+def login(client):
+    response = client.post('/api/login', json={'email': 'session@example.com', 'password': 'password123'})
+    assert response.status_code == 200
+
+class TestSessionBackends:
+
+    def test_login_round_trip(self, backend_app):
+        """Test: Each backend keeps a user logged in across requests until logout"""
+        add_user()
+        client = backend_app.test_client()
+
+        login(client)
+        assert client.get('/api/user').get_json()['email'] == 'session@example.com'
+
+        client.post('/api/logout')
+        assert client.get('/api/user').status_code == 401
+
+    def test_sql_sessions_are_stored_and_removed(self, sql_app):
+        """Test: The SQL backend writes one row per login and deletes it on logout"""
+        add_user()
+        client = sql_app.test_client()
+
+        # Anonymous requests don't create sessions
+        client.get('/api/user')
+        assert SessionRecord.query.count() == 0
+
+        login(client)
+        record = SessionRecord.query.one()
+        assert record.expires_at > datetime.utcnow() + timedelta(days=6)
+
+        client.post('/api/logout')
+        assert SessionRecord.query.count() == 0
+
+    def test_unmodified_sql_session_is_not_rewritten(self, sql_app):
+        """Test: Reading a fresh session costs no session write"""
+        add_user()
+        client = sql_app.test_client()
+        login(client)
+        writes = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if 'sessions' in statement and not statement.lstrip().startswith('SELECT'):
+                writes.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            client.get('/api/user')
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+        assert writes == []
+
+    def test_sql_session_shares_the_request_connection(self, sql_app):
+        """Test: Loading and refreshing the session use the request's connection, not a second one"""
+        add_user()
+        client = sql_app.test_client()
+        login(client)
+        record = SessionRecord.query.one()
+        # Old enough to be rewritten on the next request
+        record.expires_at = datetime.utcnow() + timedelta(days=1)
+        db.session.commit()
+        db.session.close()
+        held = {'now': 0, 'peak': 0}
+
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            held['now'] += 1
+            held['peak'] = max(held['peak'], held['now'])
+
+        def on_checkin(dbapi_connection, connection_record):
+            held['now'] -= 1
+
+        event.listen(db.engine, 'checkout', on_checkout)
+        event.listen(db.engine, 'checkin', on_checkin)
+        try:
+            assert client.get('/api/user').status_code == 200
+        finally:
+            event.remove(db.engine, 'checkout', on_checkout)
+            event.remove(db.engine, 'checkin', on_checkin)
+
+        assert held['peak'] == 1
+        assert SessionRecord.query.one().expires_at > datetime.utcnow() + timedelta(days=6)
+
+    def test_expired_sql_session_is_ignored_and_pruned(self, sql_app):
+        """Test: An expired session row logs the user out and is pruned"""
+        add_user()
+        client = sql_app.test_client()
+        login(client)
+        record = SessionRecord.query.one()
+        record.expires_at = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+
+        assert client.get('/api/user').status_code == 401
+        assert prune_expired_sessions() == 1
+        assert SessionRecord.query.count() == 0
+
+    def test_tampered_sql_session_cookie_is_rejected(self, sql_app):
+        """Test: Only signed session ids are looked up"""
+        add_user()
+        client = sql_app.test_client()
+        login(client)
+        record = SessionRecord.query.one()
+
+        client.set_cookie('session', record.id)
+
+        assert client.get('/api/user').status_code == 401
@@ -0,0 +1,87 @@
+import pytest
+from contextlib import contextmanager
+from datetime import date, timedelta
+from sqlalchemy import event
+from domain.tags.tag_model import TagRequest
+from db_config import db
+
+@contextmanager
+def captured_selects():
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+@pytest.fixture
+def tag_requests(test_db, new_docent_user, seasoned_docent_user):
+    tags = [
+        TagRequest(date=date.today() + timedelta(days=i), time_slot='PM', status='filled',
+                   new_docent_id=new_docent_user.id, seasoned_docent_id=seasoned_docent_user.id,
+                   notes='Meet at the front desk')
+        for i in range(3)
+    ]
+    test_db.session.add_all(tags)
+    test_db.session.commit()
+    return tags
+
+class TestSparseFieldsets:
+
+    def test_only_selected_fields_are_returned(self, authenticated_coordinator, tag_requests):
+        """Test: fields limits each row to the named fields plus id"""
+        response = authenticated_coordinator.get('/api/tag-requests?fields=date,timeSlot,status')
+
+        assert response.status_code == 200
+        rows = response.get_json()
+        assert len(rows) == 3
+        assert all(set(row) == {'id', 'date', 'timeSlot', 'status'} for row in rows)
+        assert rows[0]['timeSlot'] == 'PM'
+
+    def test_unselected_columns_and_docents_are_not_loaded(self, authenticated_coordinator, tag_requests):
+        """Test: The fieldset is pushed down into the SELECT column list"""
+        with captured_selects() as statements:
+            authenticated_coordinator.get('/api/tag-requests?fields=date,status')
+
+        tag_selects = [s for s in statements if 'FROM tag_requests' in s]
+        assert len(tag_selects) == 1
+        assert 'notes' not in tag_selects[0] and 'created_at' not in tag_selects[0]
+        # Only the current user lookup touches the users table
+        assert len([s for s in statements if 'FROM users' in s]) <= 1
+
+    def test_selected_docents_are_embedded(self, authenticated_coordinator, tag_requests, seasoned_docent_user):
+        """Test: Naming a relationship embeds that docent only"""
+        rows = authenticated_coordinator.get('/api/tag-requests?fields=date,seasonedDocent').get_json()
+
+        assert rows[0]['seasonedDocent']['id'] == seasoned_docent_user.id
+        assert 'newDocent' not in rows[0] and 'seasonedDocentId' not in rows[0]
+
+    def test_fields_with_pagination_and_normalized_shape(self, authenticated_coordinator, tag_requests, new_docent_user):
+        """Test: Sparse fieldsets combine with cursors and shape=normalized"""
+        first = authenticated_coordinator.get(
+            '/api/tag-requests?fields=status,newDocent&shape=normalized&limit=2').get_json()
+        second = authenticated_coordinator.get(
+            f'/api/tag-requests?fields=status,newDocent&shape=normalized&limit=2&cursor={first["next"]}').get_json()
+
+        assert [set(row) for row in first['items']] == [{'id', 'status'}] * 2
+        assert list(first['users']) == [str(new_docent_user.id)]
+        assert len(second['items']) == 1 and second['next'] is None
+
+    def test_user_fields(self, authenticated_coordinator, coordinator_user):
+        """Test: /api/users honours fields without reading the other columns"""
+        with captured_selects() as statements:
+            response = authenticated_coordinator.get('/api/users?fields=firstName,lastName')
+
+        assert response.get_json() == [{'id': coordinator_user.id, 'firstName': coordinator_user.first_name,
+                                        'lastName': coordinator_user.last_name}]
+        assert 'password' not in statements[-1]
+
+    @pytest.mark.parametrize('fields', ['', 'date,password', 'newDocent.email'])
+    def test_invalid_fields_are_rejected(self, authenticated_coordinator, tag_requests, fields):
+        """Test: Empty or unknown field names are a 400"""
+        response = authenticated_coordinator.get(f'/api/tag-requests?fields={fields}')
+
+        assert response.status_code == 400
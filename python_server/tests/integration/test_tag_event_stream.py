@@ -0,0 +1,186 @@
+import pytest
+from datetime import date, timedelta
+from domain.tags import tag_events
+from domain.tags.tag_events import TagEventBus
+from domain.tags.tag_model import TagRequest, TagRequestEvent
+from domain.users.user_model import User
+from db_config import db
+
+@pytest.fixture(autouse=True)
+def bus(app, monkeypatch):
+    # A fresh bus per test; the module-level one outlives each test's database
+    bus = TagEventBus()
+    monkeypatch.setattr(tag_events, 'tag_event_bus', bus)
+    # Streams end right after the replayed backlog unless a test says otherwise
+    app.config['SSE_MAX_SECONDS'] = 0
+    return bus
+
+@pytest.fixture
+def open_request(authenticated_new_docent):
+    response = authenticated_new_docent.post('/api/tag-requests', json={
+        'date': (date.today() + timedelta(days=5)).isoformat(),
+        'timeSlot': 'AM'
+    })
+    assert response.status_code == 201
+    return response.get_json()
+
+def login(app, email):
+    client = app.test_client()
+    client.post('/api/login', json={'email': email, 'password': 'password123'})
+    return client
+
+def parse(body):
+    """SSE text -> [(event, data)] for the non-comment messages"""
+    events = []
+    for block in body.strip().split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.split('\n') if not line.startswith(':') and ': ' in line)
+        if 'event' in fields:
+            events.append((fields['event'], fields['data']))
+    return events
+
+class TestTagEventStream:
+
+    def test_reconnect_replays_missed_events(self, app, open_request, coordinator_user):
+        """Test: Last-Event-ID replays the events after it"""
+        response = login(app, 'coordinator@example.com').get('/api/tag-requests/stream', headers={'Last-Event-ID': '0'})
+
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+        assert response.headers['Cache-Control'] == 'no-cache'
+        events = parse(response.get_data(as_text=True))
+        assert [kind for kind, _ in events] == ['created']
+        assert f'"id":{open_request["id"]}' in events[0][1]
+
+    def test_events_are_scoped_to_the_caller(self, app, open_request, second_new_docent_user, seasoned_docent_user):
+        """Test: Other new docents don't see the request; seasoned docents do"""
+        other = login(app, second_new_docent_user.email).get('/api/tag-requests/stream?lastEventId=0')
+        seasoned = login(app, 'seasoned@example.com').get('/api/tag-requests/stream?lastEventId=0')
+
+        assert parse(other.get_data(as_text=True)) == []
+        assert [kind for kind, _ in parse(seasoned.get_data(as_text=True))] == ['created']
+
+    def test_live_events_are_fanned_out(self, app, bus, open_request, seasoned_docent_user, test_db):
+        """Test: A claim reaches the claimer and coordinators, and is a removal for other seasoned docents"""
+        other = User(email='other@example.com', first_name='Other', last_name='Docent',
+                     role='seasoned_docent', password='!')
+        test_db.session.add(other)
+        test_db.session.commit()
+        coordinator_sub = bus.subscribe(1000, 'coordinator', max_streams=8)
+        claimer_sub = bus.subscribe(seasoned_docent_user.id, 'seasoned_docent', max_streams=8)
+        other_sub = bus.subscribe(other.id, 'seasoned_docent', max_streams=8)
+
+        response = login(app, 'seasoned@example.com').patch(f'/api/tag-requests/{open_request["id"]}', json={'status': 'filled'})
+        assert response.status_code == 200
+        assert bus.poll_once(app) == 1
+
+        assert parse(coordinator_sub.queue.get_nowait()[1])[0][0] == 'claimed'
+        assert parse(claimer_sub.queue.get_nowait()[1])[0][0] == 'claimed'
+        assert parse(other_sub.queue.get_nowait()[1]) == [('removed', f'{{"id":{open_request["id"]}}}')]
+        assert bus.poll_once(app) == 0
+
+    def test_removed_only_when_the_request_leaves_the_view(self, app, bus, open_request, seasoned_docent_user,
+                                                            coordinator_user, test_db):
+        """Test: Later changes to a request someone else filled send other seasoned docents nothing"""
+        other = User(email='other@example.com', first_name='Other', last_name='Docent',
+                     role='seasoned_docent', password='!')
+        test_db.session.add(other)
+        test_db.session.commit()
+        login(app, 'seasoned@example.com').patch(f'/api/tag-requests/{open_request["id"]}', json={'status': 'filled'})
+        bus.poll_once(app)
+        other_sub = bus.subscribe(other.id, 'seasoned_docent', max_streams=8)
+        claimer_sub = bus.subscribe(seasoned_docent_user.id, 'seasoned_docent', max_streams=8)
+        coordinator = login(app, 'coordinator@example.com')
+
+        coordinator.patch(f'/api/tag-requests/{open_request["id"]}', json={'notes': 'Meet at the gate'})
+        assert bus.poll_once(app) == 1
+        coordinator.patch(f'/api/tag-requests/{open_request["id"]}', json={'seasonedDocentId': other.id})
+        assert bus.poll_once(app) == 1
+
+        assert parse(claimer_sub.queue.get_nowait()[1])[0][0] == 'updated'
+        assert parse(claimer_sub.queue.get_nowait()[1]) == [('removed', f'{{"id":{open_request["id"]}}}')]
+        # Nothing for the notes change; the reassignment brings it into view
+        assert parse(other_sub.queue.get_nowait()[1])[0][0] == 'updated'
+        assert other_sub.queue.empty()
+
+    @pytest.mark.parametrize('replayed', [False, True])
+    def test_batched_events_are_scoped_by_the_current_row(self, app, bus, new_docent_user, seasoned_docent_user,
+                                                          test_db, replayed):
+        """Test: A create polled or replayed with its claim never shows other seasoned docents the filled row"""
+        other = User(email='other@example.com', first_name='Other', last_name='Docent',
+                     role='seasoned_docent', password=User.hash_password('password123'))
+        test_db.session.add(other)
+        test_db.session.commit()
+        other_sub = bus.subscribe(other.id, 'seasoned_docent', max_streams=8)
+        created = login(app, 'newdocent@example.com').post('/api/tag-requests', json={
+            'date': (date.today() + timedelta(days=5)).isoformat(), 'timeSlot': 'AM'
+        }).get_json()
+        login(app, 'seasoned@example.com').patch(f'/api/tag-requests/{created["id"]}', json={'status': 'filled'})
+
+        if replayed:
+            body = login(app, 'other@example.com').get('/api/tag-requests/stream?lastEventId=0').get_data(as_text=True)
+            events = parse(body)
+        else:
+            assert bus.poll_once(app) == 2
+            events = [parse(message)[0] for _, message in list(other_sub.queue.queue)]
+
+        assert [kind for kind, _ in events] == ['removed', 'removed']
+        assert 'seasoned@example.com' not in ''.join(data for _, data in events)
+
+    def test_failed_replay_releases_the_stream(self, app, bus, coordinator_user, monkeypatch):
+        """Test: A replay that raises doesn't leave its subscription behind"""
+        def fail(*args):
+            raise RuntimeError('database unavailable')
+        monkeypatch.setattr(bus, 'replay', fail)
+
+        with pytest.raises(RuntimeError):
+            login(app, 'coordinator@example.com').get('/api/tag-requests/stream', headers={'Last-Event-ID': '0'})
+
+        assert bus._subscriptions == set()
+
+    def test_deletes_are_streamed(self, app, bus, authenticated_new_docent, open_request, new_docent_user):
+        """Test: Deleting a request sends a deleted event with its id"""
+        subscription = bus.subscribe(new_docent_user.id, 'new_docent', max_streams=8)
+
+        authenticated_new_docent.delete(f'/api/tag-requests/{open_request["id"]}')
+        bus.poll_once(app)
+
+        assert parse(subscription.queue.get_nowait()[1]) == [('deleted', f'{{"id":{open_request["id"]}}}')]
+
+    def test_pruned_history_asks_for_a_reset(self, app, open_request, coordinator_user):
+        """Test: When missed events were pruned the client is told to refetch"""
+        TagRequestEvent.query.delete()
+        db.session.add(TagRequestEvent(id=50, tag_request_id=open_request['id'], kind='updated',
+                                       new_docent_id=open_request['newDocentId'], status='requested'))
+        db.session.commit()
+
+        response = login(app, 'coordinator@example.com').get('/api/tag-requests/stream', headers={'Last-Event-ID': '3'})
+
+        assert [kind for kind, _ in parse(response.get_data(as_text=True))] == ['reset']
+
+    def test_idle_streams_send_heartbeats(self, app, authenticated_coordinator):
+        """Test: Comments keep an idle stream open through proxies"""
+        app.config['SSE_MAX_SECONDS'] = 0.05
+        app.config['SSE_HEARTBEAT_SECONDS'] = 0.01
+
+        body = authenticated_coordinator.get('/api/tag-requests/stream', headers={'Accept-Encoding': 'gzip'})
+
+        assert 'Content-Encoding' not in body.headers
+        assert ': keepalive' in body.get_data(as_text=True)
+
+    def test_stream_limit(self, app, authenticated_coordinator):
+        """Test: Past SSE_MAX_STREAMS the stream is refused with a 503"""
+        app.config['SSE_MAX_STREAMS'] = 0
+
+        assert authenticated_coordinator.get('/api/tag-requests/stream').status_code == 503
+
+    def test_gaps_hold_back_the_floor_until_they_time_out(self, bus, monkeypatch):
+        """Test: An id missing from the sequence is waited for, then skipped"""
+        bus._floor = 10
+        bus._seen = {12, 13}
+
+        bus._advance_floor()
+        assert bus._floor == 10
+
+        monkeypatch.setattr(tag_events, 'GAP_TIMEOUT', 0)
+        bus._advance_floor()
+        assert bus._floor == 13 and bus._seen == set()
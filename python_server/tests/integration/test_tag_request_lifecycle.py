@@ -4,7 +4,7 @@ from unittest.mock import patch, MagicMock
 from domain.tags.tag_model import TagRequest
 from domain.users.user_model import User
 from db_config import db
-from utils import send_email_confirmation
+from domain.email.email_model import OutboxEmail
 
 class TestTagRequestLifecycle:
     
@@ -114,8 +114,7 @@ class TestTagRequestLifecycle:
         assert data_sorted[1]['date'] == future_date_2.isoformat()
         assert data_sorted[1]['newDocentId'] == second_new_docent_user.id
 
-    @patch('routes.send_email_confirmation')
-    def test_seasoned_docent_accepts_request_triggers_email(self, mock_email, authenticated_seasoned_docent, test_db, new_docent_user, seasoned_docent_user):
+    def test_seasoned_docent_accepts_request_triggers_email(self, authenticated_seasoned_docent, test_db, new_docent_user, seasoned_docent_user):
         """Test: Accepting request changes status and triggers email"""
         future_date = date.today() + timedelta(days=7)
         
@@ -138,10 +137,42 @@ class TestTagRequestLifecycle:
         assert data['status'] == 'filled'
         assert data['seasonedDocentId'] == seasoned_docent_user.id
         
-        # Verify email was triggered
-        mock_email.assert_called_once()
-        call_args = mock_email.call_args[0]
-        assert tag_request in call_args
+        # Verify the confirmation email was queued for both docents
+        emails = OutboxEmail.query.all()
+        assert len(emails) == 1
+        assert emails[0].kind == 'tag_confirmation'
+        assert emails[0].status == 'pending'
+        assert sorted(emails[0].get_recipients()) == sorted([new_docent_user.email, seasoned_docent_user.email])
+
+    def test_already_filled_request_cannot_be_claimed(self, authenticated_seasoned_docent, test_db, new_docent_user, seasoned_docent_user):
+        """Test: Claiming a request someone else already filled fails without sending email"""
+        other_seasoned = User(
+            email='other-seasoned@example.com',
+            first_name='Other',
+            last_name='Seasoned',
+            role='seasoned_docent',
+            password=User.hash_password('password123')
+        )
+        test_db.session.add(other_seasoned)
+        test_db.session.flush()
+        tag_request = TagRequest(
+            date=date.today() + timedelta(days=7),
+            time_slot='AM',
+            status='filled',
+            new_docent_id=new_docent_user.id,
+            seasoned_docent_id=other_seasoned.id
+        )
+        test_db.session.add(tag_request)
+        test_db.session.commit()
+
+        response = authenticated_seasoned_docent.patch(f'/api/tag-requests/{tag_request.id}', json={
+            'status': 'filled'
+        })
+
+        assert response.status_code == 400
+        assert 'no longer available' in response.get_json()['error']
+        assert OutboxEmail.query.count() == 0
+        assert TagRequest.query.get(tag_request.id).seasoned_docent_id == other_seasoned.id
 
     def test_new_docent_cancels_own_unfilled_request(self, authenticated_new_docent, test_db, new_docent_user):
         """Test: New docent can cancel their own unfilled request"""
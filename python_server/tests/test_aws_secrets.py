@@ -0,0 +1,72 @@
+import json
+import sqlite3
+import pytest
+from unittest.mock import MagicMock
+from sqlalchemy import create_engine, text
+
+import aws_secrets
+
+SECRET_ARN = 'arn:aws:secretsmanager:us-west-2:123456789012:secret:db'
+
+@pytest.fixture
+def secrets_client(monkeypatch):
+    """Replace the Secrets Manager client with a mock returning the given passwords in turn"""
+    client = MagicMock()
+    monkeypatch.setattr(aws_secrets, '_secrets_client', lambda: client)
+    aws_secrets.invalidate_secret(SECRET_ARN)
+
+    def returns(*passwords):
+        client.get_secret_value.side_effect = [
+            {'SecretString': json.dumps({'username': 'app', 'password': password})} for password in passwords
+        ]
+
+    client.returns = returns
+    yield client
+    aws_secrets.invalidate_secret(SECRET_ARN)
+
+class TestSecrets:
+
+    def test_secret_is_cached_until_ttl(self, secrets_client, monkeypatch):
+        """Test: The secret is fetched once and again only after the TTL"""
+        secrets_client.returns('first', 'second')
+        now = [1000.0]
+        monkeypatch.setattr(aws_secrets.time, 'monotonic', lambda: now[0])
+
+        assert aws_secrets.get_secret(SECRET_ARN, ttl=300)['password'] == 'first'
+        now[0] += 299
+        assert aws_secrets.get_secret(SECRET_ARN, ttl=300)['password'] == 'first'
+        assert secrets_client.get_secret_value.call_count == 1
+
+        now[0] += 1
+        assert aws_secrets.get_secret(SECRET_ARN, ttl=300)['password'] == 'second'
+        assert secrets_client.get_secret_value.call_count == 2
+
+    def test_nothing_is_fetched_until_a_connection_is_opened(self, secrets_client):
+        """Test: Attaching the credentials to an engine makes no AWS call"""
+        secrets_client.returns('secret')
+        engine = create_engine('sqlite://')
+
+        aws_secrets.use_secret_credentials(engine, SECRET_ARN)
+
+        secrets_client.get_secret_value.assert_not_called()
+
+    def test_rotated_password_is_refetched_on_connect(self, secrets_client):
+        """Test: A rejected cached password invalidates the secret and retries once"""
+        secrets_client.returns('stale', 'rotated')
+        engine = create_engine('sqlite://')
+        attempts = []
+
+        def connect(*cargs, **cparams):
+            attempts.append(cparams['password'])
+            if cparams['password'] == 'stale':
+                raise sqlite3.OperationalError('password authentication failed')
+            return sqlite3.connect(':memory:')
+
+        engine.dialect.connect = connect
+        aws_secrets.use_secret_credentials(engine, SECRET_ARN)
+
+        with engine.connect() as conn:
+            assert conn.execute(text('SELECT 1')).scalar() == 1
+
+        assert attempts == ['stale', 'rotated']
+        assert aws_secrets.get_secret(SECRET_ARN)['password'] == 'rotated'
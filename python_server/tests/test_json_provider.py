@@ -0,0 +1,53 @@
+import json
+import uuid
+import pytest
+from datetime import date, datetime
+from decimal import Decimal
+from flask import Flask
+
+import json_provider
+from json_provider import init_json
+
+@pytest.fixture(params=['orjson', 'stdlib'])
+def app(request, monkeypatch):
+    if request.param == 'stdlib':
+        monkeypatch.setattr(json_provider, 'orjson', None)
+    elif json_provider.orjson is None:
+        pytest.skip('orjson not installed')
+    app = Flask(__name__)
+    init_json(app)
+    return app
+
+class TestFastJSONProvider:
+
+    def test_dates_are_iso_8601(self, app):
+        """Test: date and datetime serialize as ISO 8601 with either encoder"""
+        payload = {'date': date(2025, 7, 4), 'at': datetime(2025, 7, 4, 9, 30, 15, 120000)}
+
+        assert json.loads(app.json.dumps(payload)) == {'date': '2025-07-04', 'at': '2025-07-04T09:30:15.120000'}
+
+    def test_response_matches_stdlib_json(self, app):
+        """Test: jsonify output parses to the same value, with sorted keys"""
+        payload = [{'b': 1, 'a': None, 'nested': {'z': [1, 2], 'y': 'é'}}]
+
+        with app.test_request_context():
+            response = app.json.response(payload)
+
+        body = response.get_data(as_text=True)
+        assert response.mimetype == 'application/json'
+        assert json.loads(body) == payload
+        assert body.index('"a"') < body.index('"b"')
+
+    def test_flask_default_types_still_supported(self, app):
+        """Test: Decimal and UUID fall back to Flask's conversions"""
+        value = uuid.UUID('12345678-1234-5678-1234-567812345678')
+
+        assert json.loads(app.json.dumps({'price': Decimal('1.50'), 'id': value})) == {
+            'price': '1.50',
+            'id': str(value)
+        }
+
+    def test_unknown_types_raise(self, app):
+        """Test: Unserializable objects are an error, not silently dropped"""
+        with pytest.raises(TypeError):
+            app.json.dumps({'value': object()})
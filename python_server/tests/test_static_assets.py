@@ -0,0 +1,94 @@
+import gzip
+import pytest
+from flask import Flask
+
+from precompress_assets import precompress
+from static_assets import init_static, IMMUTABLE_MAX_AGE
+
+BUNDLE = b'console.log("docent dispatch");\n' * 100
+
+@pytest.fixture
+def static_root(tmp_path):
+    (tmp_path / 'assets').mkdir()
+    (tmp_path / 'assets' / 'index-3f2a9c.js').write_bytes(BUNDLE)
+    (tmp_path / 'index.html').write_text('<!doctype html><div id="root"></div>')
+    (tmp_path / 'favicon.ico').write_bytes(b'\x00\x00\x01\x00')
+    precompress(str(tmp_path))
+    return tmp_path
+
+@pytest.fixture
+def client(static_root):
+    app = Flask(__name__, static_folder=None)
+
+    @app.route('/api/health')
+    def health():
+        return 'ok'
+
+    init_static(app, str(static_root))
+    return app.test_client()
+
+class TestStaticAssets:
+
+    def test_hashed_assets_are_immutable(self, client):
+        """Test: Bundles under assets/ are cacheable for a year without revalidation"""
+        response = client.get('/assets/index-3f2a9c.js')
+
+        assert response.status_code == 200
+        assert response.data == BUNDLE
+        assert response.mimetype in ('text/javascript', 'application/javascript')
+        assert response.cache_control.max_age == IMMUTABLE_MAX_AGE
+        assert response.cache_control.immutable
+        assert response.cache_control.public
+        assert response.headers['ETag']
+
+    def test_etag_revalidation_returns_304(self, client):
+        """Test: A matching If-None-Match gets an empty 304"""
+        etag = client.get('/index.html').headers['ETag']
+
+        response = client.get('/index.html', headers={'If-None-Match': etag})
+
+        assert response.status_code == 304
+        assert response.data == b''
+
+    def test_precompressed_variant_is_preferred(self, client, static_root):
+        """Test: Clients accepting gzip get the .gz file with its own ETag"""
+        plain = client.get('/assets/index-3f2a9c.js')
+        response = client.get('/assets/index-3f2a9c.js', headers={'Accept-Encoding': 'gzip'})
+
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.headers['Vary']
+        assert gzip.decompress(response.data) == BUNDLE
+        assert response.headers['ETag'] != plain.headers['ETag']
+
+    def test_brotli_is_preferred_over_gzip(self, client, static_root):
+        """Test: br wins when the client accepts both and the .br file exists"""
+        if not (static_root / 'assets' / 'index-3f2a9c.js.br').exists():
+            pytest.skip('brotli not installed')
+
+        response = client.get('/assets/index-3f2a9c.js', headers={'Accept-Encoding': 'gzip, br'})
+
+        assert response.headers['Content-Encoding'] == 'br'
+
+    def test_client_routes_fall_back_to_index(self, client):
+        """Test: Unknown non-asset paths get the app shell, revalidated by ETag"""
+        response = client.get('/coordinator/users')
+
+        assert response.status_code == 200
+        assert b'<div id="root">' in response.data
+        assert response.cache_control.no_cache
+
+    def test_missing_bundle_is_not_found(self, client):
+        """Test: A stale bundle URL 404s instead of returning HTML"""
+        assert client.get('/assets/index-old.js').status_code == 404
+
+    def test_files_are_not_probed_per_request(self, client, static_root):
+        """Test: The manifest is built at startup; later files are not picked up"""
+        (static_root / 'late.txt').write_text('added after startup')
+
+        response = client.get('/late.txt')
+
+        assert b'<div id="root">' in response.data
+
+    def test_api_routes_are_not_shadowed(self, client):
+        """Test: Registered routes still win over the catch-all"""
+        assert client.get('/api/health').data == b'ok'
@@ -0,0 +1,73 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from botocore.exceptions import ClientError
+
+import utils
+from domain.email.fake_ses import fake_ses_client
+
+EMAIL_CONTENT = {"subject": "Subject", "text_body": "Text", "html_body": "<p>Html</p>"}
+
+@pytest.fixture
+def mock_boto3(monkeypatch):
+    """Replace boto3 with a mock whose sessions hand out one mock SES client"""
+    monkeypatch.delenv('EMAIL_BACKEND', raising=False)
+    monkeypatch.setenv('SOURCE_EMAIL', 'coordinator@example.com')
+    utils.reset_ses_client()
+    with patch('utils.boto3') as boto3:
+        ses_client = boto3.Session.return_value.client.return_value
+        ses_client.send_email.return_value = {'MessageId': 'message-1'}
+        ses_client.get_send_quota.return_value = {'Max24HourSend': 200.0, 'MaxSendRate': 1.0}
+        yield boto3
+    utils.reset_ses_client()
+
+class TestSESClient:
+
+    def test_client_is_created_once_and_reused(self, mock_boto3):
+        """Test: Sending several emails builds one session and client, and makes one API call each"""
+        for _ in range(3):
+            assert utils.send_email(['a@example.com'], EMAIL_CONTENT)['success'] is True
+
+        ses_client = mock_boto3.Session.return_value.client.return_value
+        assert mock_boto3.Session.call_count == 1
+        assert mock_boto3.Session.return_value.client.call_count == 1
+        assert ses_client.send_email.call_count == 3
+        ses_client.get_send_quota.assert_not_called()
+
+    def test_expired_credentials_rebuild_the_client(self, mock_boto3):
+        """Test: An expired-token error drops the cached client so the next send starts fresh"""
+        ses_client = mock_boto3.Session.return_value.client.return_value
+        ses_client.send_email.side_effect = [
+            ClientError({'Error': {'Code': 'ExpiredToken', 'Message': 'expired'}}, 'SendEmail'),
+            {'MessageId': 'message-2'}
+        ]
+
+        assert utils.send_email(['a@example.com'], EMAIL_CONTENT)['success'] is False
+        assert utils.send_email(['a@example.com'], EMAIL_CONTENT)['success'] is True
+        assert mock_boto3.Session.call_count == 2
+
+    def test_missing_credentials_are_reported(self, mock_boto3):
+        """Test: No resolvable credentials is reported without raising"""
+        mock_boto3.Session.return_value.get_credentials.return_value = None
+
+        result = utils.send_email(['a@example.com'], EMAIL_CONTENT)
+
+        assert result['success'] is False
+        assert result['error_type'] == 'NoCredentialsError'
+
+    def test_send_quota_is_cached(self, mock_boto3):
+        """Test: The quota probe only calls SES again once the cached value is stale"""
+        ses_client = mock_boto3.Session.return_value.client.return_value
+
+        utils.get_send_quota()
+        utils.get_send_quota()
+        assert ses_client.get_send_quota.call_count == 1
+
+        utils.get_send_quota(max_age=0)
+        assert ses_client.get_send_quota.call_count == 2
+
+    def test_fake_backend_bypasses_boto3(self, mock_boto3, monkeypatch):
+        """Test: EMAIL_BACKEND=fake uses the in-memory client"""
+        monkeypatch.setenv('EMAIL_BACKEND', 'fake')
+
+        assert utils.get_ses_client() is fake_ses_client
+        mock_boto3.Session.assert_not_called()
@@ -1,9 +1,10 @@
 from datetime import datetime
-import boto3
-from botocore.exceptions import ClientError, NoCredentialsError, PartialCredentialsError, ProfileNotFound
+import threading
+import time
 import os
 from dotenv import load_dotenv
 import logging
+from domain.email.fake_ses import fake_ses_client
 
 # Load environment variables from .env file
 load_dotenv()
@@ -14,7 +15,29 @@ AWS_PROFILE = os.getenv('AWS_PROFILE', 'default')
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def debug_aws_credentials():
+SES_REGION = 'us-west-2'
+# Re-read the send quota at most this often (seconds)
+SEND_QUOTA_MAX_AGE = 300
+
+# boto3 takes a noticeable share of start-up time, so it is imported on first
+# use (see _boto3) rather than by every process that imports this module
+boto3 = None
+
+# Process-wide SES client, created on first use. boto3 clients are thread-safe
+# and keep a pool of HTTPS connections, so one client serves every worker thread.
+_ses_client = None
+_ses_client_lock = threading.Lock()
+_send_quota = None
+_send_quota_checked_at = 0.0
+
+# Error codes meaning the cached client's credentials are no longer valid
+EXPIRED_CREDENTIAL_CODES = {'ExpiredToken', 'ExpiredTokenException', 'RequestExpired', 'InvalidClientTokenId'}
+# SES reports a spent daily quota as a Throttling error with this message;
+# send_email returns it under its own code, so callers don't read messages
+DAILY_QUOTA_EXCEEDED = 'DailyQuotaExceeded'
+DAILY_QUOTA_MESSAGE = 'Daily message quota exceeded'
+
+def debug_aws_credentials(session):
     """Debug AWS credential configuration"""
     logger.info("=== AWS Credentials Debug Info ===")
     
@@ -26,49 +49,98 @@ def debug_aws_credentials():
     logger.info(f"SOURCE_EMAIL env var: {os.getenv('SOURCE_EMAIL', 'Not set')}")
     
     # Check boto3 session
-    try:
-        session = boto3.Session(profile_name=AWS_PROFILE if AWS_PROFILE != 'default' else None)
-        credentials = session.get_credentials()
-        if credentials:
-            logger.info(f"Boto3 credentials found - Access Key: {credentials.access_key[:8]}...")
-            logger.info(f"Session region: {session.region_name}")
-        else:
-            logger.error("No boto3 credentials found")
-    except ProfileNotFound as e:
-        logger.error(f"AWS Profile not found: {e}")
-    except Exception as e:
-        logger.error(f"Error checking boto3 session: {e}")
-
+    credentials = session.get_credentials()
+    if credentials:
+        logger.info(f"Boto3 credentials found - Access Key: {credentials.access_key[:8]}...")
+        logger.info(f"Session region: {session.region_name}")
+    else:
+        logger.error("No boto3 credentials found")
+    return credentials
+
+
+def _boto3():
+    global boto3
+    if boto3 is None:
+        import boto3 as module
+        boto3 = module
+    return boto3
+
+
+def _create_ses_client():
+    from botocore.config import Config
+    from botocore.exceptions import NoCredentialsError
+
+    logger.info("Creating SES client...")
+
+    # Use profile if specified and not default
+    session_kwargs = {}
+    if AWS_PROFILE and AWS_PROFILE != 'default':
+        session_kwargs['profile_name'] = AWS_PROFILE
+
+    session = _boto3().Session(**session_kwargs)
+
+    # Resolve credentials once. Temporary credentials (instance role, SSO) come
+    # back as RefreshableCredentials, which botocore renews before they expire.
+    if debug_aws_credentials(session) is None:
+        raise NoCredentialsError()
+
+    return session.client('ses', region_name=SES_REGION, config=Config(
+        max_pool_connections=10,
+        # EmailDispatcher retries throttles itself, pacing them through its
+        # token bucket; botocore retrying underneath would multiply the calls
+        retries={'total_max_attempts': 1, 'mode': 'standard'}
+    ))
+
+
+def get_ses_client():
+    """Return the shared SES client, or the offline fake when EMAIL_BACKEND=fake"""
+    global _ses_client
+    if os.getenv('EMAIL_BACKEND') == 'fake':
+        return fake_ses_client
+
+    if _ses_client is None:
+        with _ses_client_lock:
+            if _ses_client is None:
+                _ses_client = _create_ses_client()
+    return _ses_client
+
+
+def reset_ses_client():
+    """Drop the shared client so the next send resolves credentials again"""
+    global _ses_client, _send_quota, _send_quota_checked_at
+    with _ses_client_lock:
+        _ses_client = None
+        _send_quota = None
+        _send_quota_checked_at = 0.0
+
+
+def get_send_quota(max_age=SEND_QUOTA_MAX_AGE):
+    """
+    Return SES's send quota, re-reading it at most every `max_age` seconds.
+    This is the health probe for SES credentials; it is kept off the send path.
+    """
+    global _send_quota, _send_quota_checked_at
+    if _send_quota is None or time.monotonic() - _send_quota_checked_at >= max_age:
+        logger.info("Checking SES send quota...")
+        _send_quota = get_ses_client().get_send_quota()
+        _send_quota_checked_at = time.monotonic()
+        logger.info(f"SES send quota check successful: {_send_quota['Max24HourSend']} emails/24h")
+    return _send_quota
+
+
+def send_email(recipients, email_content):
+    """
+    Send an already formatted email (see the format_* helpers) through SES.
+    Returns a result dict rather than raising, so callers can decide whether to retry.
+    """
+    from botocore.exceptions import ClientError, NoCredentialsError, PartialCredentialsError, ProfileNotFound
 
-def send_password_reset_email(user, reset_link):
-    logger.info(f"Sending password reset email to {user.email}")
-    
-    # Debug credentials before attempting to send
-    debug_aws_credentials()
-
-    email_content = format_password_reset_email(user, reset_link)
     subject = email_content["subject"]
     text_body = email_content["text_body"]
     html_body = email_content["html_body"]
 
-    recipients = [user.email]
-    
     try:
-        # Create an SES client with explicit session handling
-        logger.info("Creating SES client...")
-        
-        # Use profile if specified and not default
-        session_kwargs = {}
-        if AWS_PROFILE and AWS_PROFILE != 'default':
-            session_kwargs['profile_name'] = AWS_PROFILE
-            
-        session = boto3.Session(**session_kwargs)
-        ses_client = session.client('ses', region_name='us-west-2')
-        
-        # Test credentials by getting send quota (lightweight operation)
-        logger.info("Testing SES credentials...")
-        send_quota = ses_client.get_send_quota()
-        logger.info(f"SES send quota check successful: {send_quota['Max24HourSend']} emails/24h")
+        ses_client = get_ses_client()
         
     except NoCredentialsError as e:
         error_msg = f"AWS credentials not found: {str(e)}"
@@ -90,7 +162,7 @@ def send_password_reset_email(user, reset_link):
         error_code = e.response['Error']['Code']
         error_msg = e.response['Error']['Message']
         logger.error(f"AWS Client Error during setup - Code: {error_code}, Message: {error_msg}")
-        return {"success": False, "error": f"{error_code}: {error_msg}", "error_type": "ClientError"}
+        return {"success": False, "error": f"{error_code}: {error_msg}", "error_type": "ClientError", "error_code": error_code}
         
     except Exception as e:
         error_msg = f"Unexpected error during SES client setup: {str(e)}"
@@ -135,15 +207,25 @@ def send_password_reset_email(user, reset_link):
     except ClientError as e:
         error_code = e.response['Error']['Code']
         error_msg = e.response['Error']['Message']
+        if error_code in EXPIRED_CREDENTIAL_CODES:
+            # Static credentials can't refresh themselves; rebuild the client next time
+            reset_ses_client()
+        if error_code == 'Throttling' and error_msg.startswith(DAILY_QUOTA_MESSAGE):
+            error_code = DAILY_QUOTA_EXCEEDED
         logger.error(f"SES Client Error - Code: {error_code}, Message: {error_msg}")
         logger.error(f"Full error response: {e.response}")
-        return {"success": False, "error": f"{error_code}: {error_msg}", "error_type": "SESClientError"}
+        return {"success": False, "error": f"{error_code}: {error_msg}", "error_type": "SESClientError", "error_code": error_code}
         
     except Exception as e:
         error_msg = f"Unexpected error sending email: {str(e)}"
         logger.error(error_msg, exc_info=True)
         return {"success": False, "error": error_msg, "error_type": "UnexpectedError"}
 
+
+def password_reset_recipients(user):
+    return [user.email]
+
+
 def format_password_reset_email(user, reset_link):
     subject = "SF Zoo Docent Tagging - Password Reset Request"
     text_body = f"""
@@ -189,6 +271,7 @@ SF Zoo Docent Tagging Coordinator
         "text_body": text_body,
         "html_body": html_body
     }
+
 def format_tag_scheduling_email(tag):
     """Format email for tag request notification"""
     new_docent_name = f"{tag.new_docent.first_name} {tag.new_docent.last_name}"
@@ -268,111 +351,9 @@ SF Zoo Docent Program Coordinator
         "html_body": html_body
     }
 
-def send_email_confirmation(tag):
-    logger.info(f"Sending email confirmation for tag {tag.id}")
-    
-    # Debug credentials before attempting to send
-    debug_aws_credentials()
-    
-    email_content = format_tag_scheduling_email(tag)
-    subject = email_content["subject"]
-    text_body = email_content["text_body"]
-    html_body = email_content["html_body"]
-
-    recipients = [
+def tag_scheduling_recipients(tag):
+    return [
         tag.seasoned_docent.email,
         tag.new_docent.email,
         #TODO: Add coordinator to email
     ]
-    
-    try:
-        # Create an SES client with explicit session handling
-        logger.info("Creating SES client...")
-        
-        # Use profile if specified and not default
-        session_kwargs = {}
-        if AWS_PROFILE and AWS_PROFILE != 'default':
-            session_kwargs['profile_name'] = AWS_PROFILE
-            
-        session = boto3.Session(**session_kwargs)
-        ses_client = session.client('ses', region_name='us-west-2')
-        
-        # Test credentials by getting send quota (lightweight operation)
-        logger.info("Testing SES credentials...")
-        send_quota = ses_client.get_send_quota()
-        logger.info(f"SES send quota check successful: {send_quota['Max24HourSend']} emails/24h")
-        
-    except NoCredentialsError as e:
-        error_msg = f"AWS credentials not found: {str(e)}"
-        logger.error(error_msg)
-        logger.error("Ensure AWS credentials are configured via environment variables, AWS profile, or IAM role")
-        return {"success": False, "error": error_msg, "error_type": "NoCredentialsError"}
-        
-    except PartialCredentialsError as e:
-        error_msg = f"Incomplete AWS credentials: {str(e)}"
-        logger.error(error_msg)
-        return {"success": False, "error": error_msg, "error_type": "PartialCredentialsError"}
-        
-    except ProfileNotFound as e:
-        error_msg = f"AWS profile '{AWS_PROFILE}' not found: {str(e)}"
-        logger.error(error_msg)
-        return {"success": False, "error": error_msg, "error_type": "ProfileNotFound"}
-        
-    except ClientError as e:
-        error_code = e.response['Error']['Code']
-        error_msg = e.response['Error']['Message']
-        logger.error(f"AWS Client Error during setup - Code: {error_code}, Message: {error_msg}")
-        return {"success": False, "error": f"{error_code}: {error_msg}", "error_type": "ClientError"}
-        
-    except Exception as e:
-        error_msg = f"Unexpected error during SES client setup: {str(e)}"
-        logger.error(error_msg, exc_info=True)
-        return {"success": False, "error": error_msg, "error_type": "UnexpectedError"}
-    
-    # Prepare email message
-    email_message = {
-        'Subject': {
-            'Data': subject,
-            'Charset': 'UTF-8'
-        },
-        'Body': {
-            'Text': {
-                'Data': text_body,
-                'Charset': 'UTF-8'
-            },
-            'Html': {
-                'Data': html_body,
-                'Charset': 'UTF-8'
-            }
-        }
-    }
-    
-    try:
-        # Send the email
-        logger.info(f"Sending email to {recipients}")
-        source_email = os.getenv('SOURCE_EMAIL')
-        if not source_email:
-            raise ValueError("SOURCE_EMAIL environment variable not set")
-            
-        response = ses_client.send_email(
-            Source=source_email,
-            Destination={
-                'ToAddresses': recipients
-            },
-            Message=email_message
-        )
-        logger.info(f"Email sent successfully - Message ID: {response['MessageId']}")
-        return {"success": True, "message_id": response['MessageId']}
-        
-    except ClientError as e:
-        error_code = e.response['Error']['Code']
-        error_msg = e.response['Error']['Message']
-        logger.error(f"SES Client Error - Code: {error_code}, Message: {error_msg}")
-        logger.error(f"Full error response: {e.response}")
-        return {"success": False, "error": f"{error_code}: {error_msg}", "error_type": "SESClientError"}
-        
-    except Exception as e:
-        error_msg = f"Unexpected error sending email: {str(e)}"
-        logger.error(error_msg, exc_info=True)
-        return {"success": False, "error": error_msg, "error_type": "UnexpectedError"}
-
@@ -79,6 +79,61 @@ export interface UpdateTagRequest {
   updatedAt?: string;
 }
 
+// === Pagination Types ===
+// Returned by list endpoints when called with `limit` or `cursor`
+export interface Page<T> {
+  items: T[];
+  next: string | null;  // Opaque cursor for the next page, null on the last page
+}
+
+// === Sparse Fieldset Types ===
+// List endpoints called with `fields=a,b` return only those fields plus id,
+// e.g. SparseTagRequest<'date' | 'timeSlot' | 'status'>
+export type Sparse<T extends { id: number }, K extends keyof T> = Pick<T, 'id' | K>;
+export type SparseTagRequest<K extends keyof TagRequest> = Sparse<TagRequest, K>;
+
+// === Normalized List Types ===
+// Returned by /api/tag-requests and /api/my-tag-requests with `shape=normalized`:
+// rows carry docent ids only, and each docent appears once in `users`
+export type NormalizedTagRequest = Omit<TagRequest, 'newDocent' | 'seasonedDocent'>;
+
+export interface NormalizedTagRequests {
+  items: NormalizedTagRequest[];
+  users: Record<number, User>;  // Keyed by user id (string keys on the wire)
+  next?: string | null;  // Present when paginated, as in Page<T>
+}
+
+// === Delta Sync Types ===
+// Returned by /api/tag-requests?since=<cursor> (an empty since= starts from scratch).
+// Apply `deleted` before upserting `items`, then send `since` on the next sync.
+export interface TagRequestChanges {
+  items: TagRequest[];
+  deleted: number[];
+  since: string;  // Opaque cursor (an ISO timestamp)
+  users?: Record<number, User>;  // With shape=normalized
+}
+
+// Returned by /api/tag-requests/calendar?startDate=&endDate=. Only days with
+// tag requests appear; each slot holds one count per entry of `statuses`.
+export interface TagRequestCalendar {
+  startDate: string;
+  endDate: string;
+  slots: string[];     // ["AM", "PM"]
+  statuses: string[];  // ["requested", "filled"]
+  days: Record<string, Record<string, number[]>>;
+}
+
+// === Live Update Types ===
+// Server-Sent Events from /api/tag-requests/stream, keyed by event name
+export interface TagRequestStreamEvents {
+  created: { id: number; tagRequest: TagRequest };
+  claimed: { id: number; tagRequest: TagRequest };
+  updated: { id: number; tagRequest: TagRequest };
+  deleted: { id: number };
+  removed: { id: number };  // No longer visible to this user
+  reset: {};                // Missed events are gone; refetch the list
+}
+
 // === CSV Upload Types ===
 export interface CSVUser {
   email: string;
@@ -7,6 +7,7 @@ pkill -f "python run_python_server.py" || true
 # Build the frontend
 echo "Building frontend..."
 npm run build
+python python_server/precompress_assets.py
 
 # Start the Python server
 echo "Starting Python Flask server..."
@@ -1,9 +1,12 @@
 #!/bin/bash
 
-# Kill any existing Python processes using port 5001
+# Kill any existing server processes
 echo "Checking for existing Python processes..."
 pkill -f "python run_python_server.py" || true
+pkill -f "gunicorn -c gunicorn.conf.py wsgi:app" || true
 
-# Start the Python server
-echo "Starting Python Flask server..."
-python run_python_server.py 
\ No newline at end of file
+# Start the production server (workers, threads, keep-alive and timeouts come
+# from the GUNICORN_* environment variables, see python_server/gunicorn.conf.py)
+echo "Starting gunicorn..."
+cd python_server
+exec gunicorn -c gunicorn.conf.py wsgi:app